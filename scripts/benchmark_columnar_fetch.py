@@ -0,0 +1,98 @@
+"""对比 query() 的 DictCursor 行字典构造方式与按列 (columnar) 构造方式的耗时、峰值内存和结果常驻内存。
+
+不需要连接 Doris: 脚本按 PyMySQL 游标返回的形式构造元组行和 cursor.description，
+DictCursor 路径为每行额外生成一个字典，再由 pd.DataFrame 推断列类型。
+
+用法:
+    python scripts/benchmark_columnar_fetch.py --rows 1000000
+"""
+import argparse
+import datetime
+import gc
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+from pymysql.constants import FIELD_TYPE
+
+from src.tools.doris_columnar import rows_to_frame
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+
+def build_rows(rows: int):
+    """构造包含整数、可空整数、浮点、日期时间、低基数和高基数字符串的结果集"""
+    rng = np.random.default_rng(42)
+    cities = [f"city_{i}" for i in range(50)]
+    base = datetime.datetime(2024, 1, 1)
+    ids = rng.integers(0, 1 << 40, rows).tolist()
+    amounts = rng.random(rows).tolist()
+    nullable = [None if v < 10 else int(v) for v in rng.integers(0, 100, rows)]
+    city = [cities[i] for i in rng.integers(0, len(cities), rows)]
+    status = [("paid", "pending", "refunded")[i] for i in rng.integers(0, 3, rows)]
+    order_no = [f"ORD{v:012d}" for v in rng.integers(0, 10 ** 12, rows)]
+    created = [base + datetime.timedelta(seconds=int(s)) for s in rng.integers(0, 365 * 86400, rows)]
+    description = [
+        ("id", FIELD_TYPE.LONGLONG), ("amount", FIELD_TYPE.DOUBLE), ("quantity", FIELD_TYPE.LONG),
+        ("city", FIELD_TYPE.VAR_STRING), ("status", FIELD_TYPE.VAR_STRING),
+        ("order_no", FIELD_TYPE.VAR_STRING), ("created_at", FIELD_TYPE.DATETIME),
+    ]
+    description = [(name, code, None, None, None, None, True) for name, code in description]
+    data = list(zip(ids, amounts, nullable, city, status, order_no, created))
+    return data, description
+
+
+def dict_path(rows, description):
+    # DictCursor: 每行一个 {列名: 值} 字典
+    names = [desc[0] for desc in description]
+    return pd.DataFrame([dict(zip(names, row)) for row in rows])
+
+
+def columnar_path(rows, description):
+    return rows_to_frame(rows, description)
+
+
+def run(name: str, build, rows, description):
+    # 计时与内存分开测量: tracemalloc 会显著拖慢 Python 层的分配
+    gc.collect()
+    start = time.perf_counter()
+    df = build(rows, description)
+    elapsed = time.perf_counter() - start
+    resident = int(df.memory_usage(deep=True).sum())
+    del df
+
+    gc.collect()
+    arrow_before = pa.total_allocated_bytes() if pa is not None else 0
+    tracemalloc.start()
+    df = build(rows, description)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    # Arrow 缓冲区不经过 tracemalloc，单独统计
+    arrow_bytes = (pa.total_allocated_bytes() - arrow_before) if pa is not None else 0
+    print(
+        f"{name:<10} {elapsed:8.2f}s  peak {(peak + arrow_bytes) / 2 ** 20:9.1f} MB"
+        f"  resident {resident / 2 ** 20:9.1f} MB"
+    )
+    print("           dtypes: " + ", ".join(f"{col}={dtype}" for col, dtype in df.dtypes.items()))
+    return elapsed, resident
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    rows, description = build_rows(args.rows)
+    print(f"Result: {args.rows} rows x {len(description)} columns")
+
+    dict_time, dict_resident = run("dict", dict_path, rows, description)
+    columnar_time, columnar_resident = run("columnar", columnar_path, rows, description)
+    print(f"speedup: {dict_time / columnar_time:.1f}x, resident memory: {columnar_resident / dict_resident:.0%} of dict path")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,22 @@
-from typing import Any, Dict, List, Optional, Union
+import asyncio
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+import numpy as np
 import pandas as pd
-import os
 import time
 import csv
+import threading
+import json
+import math
+import re
+import uuid
+from functools import partial
 
 try:
     import pymysql
-    from pymysql.cursors import DictCursor
+    from pymysql.constants import FIELD_TYPE
+    from pymysql.cursors import Cursor, DictCursor, SSCursor
 except ImportError:
     raise ImportError(
         "`pymysql` not installed. Please install using `pip install pymysql`."
@@ -15,6 +25,56 @@ except ImportError:
 from agno.tools import Toolkit
 from agno.utils.log import log_debug, log_info
 
+from src.tools.doris_buffer import GROUP_COMMIT_MODES, PartialWriteError, WriteBuffer
+from src.tools.doris_export import infer_export_format, write_chunks
+from src.tools.doris_cancel import CancelToken, classify_error, format_limit_error
+from src.tools.doris_cache import QueryResultCache, is_cacheable
+from src.tools.doris_catalog import CATALOG_COLUMNS_SQL, CATALOG_TABLES_SQL, MetadataCatalog, TableInfo, format_size
+from src.tools.doris_columnar import rows_to_frame
+from src.tools.doris_dictionary import DataDictionaryIndex
+from src.tools.doris_guard import CostGuard, GuardDecision
+from src.tools.doris_merge import (
+    HASH_LOOKUP_BATCH,
+    ROW_HASHES_DDL,
+    ROW_HASHES_TABLE,
+    WATERMARKS_DDL,
+    WATERMARKS_TABLE,
+    changed_rows,
+    format_watermark,
+    row_hashes,
+    rows_since,
+    unique_key_columns,
+)
+from src.tools.doris_partition import (
+    PARTITION_UNITS,
+    add_partition_statements,
+    auto_partition_column,
+    detect_partition_unit,
+    partition_clause,
+    partition_periods,
+    range_partition_column,
+)
+from src.tools.doris_pool import DorisConnectionPool
+from src.tools.doris_render import ResultRenderer, ResultStore
+from src.tools.doris_rows import iter_row_batches, partition_frame, to_db_value
+from src.tools.doris_router import Frontend, FrontendRouter, FrontendSpec, is_connection_failure, parse_frontends
+from src.tools.doris_sampling import (
+    format_estimate,
+    hash_sample_sql,
+    is_histogram_unsupported,
+    mean_margin,
+    parse_histogram,
+    scaled_count,
+    simple_scan_table,
+    split_table_name,
+    tablesample_clause,
+    tablesample_sql,
+)
+from src.tools.doris_schema import coerce_to_types, infer_schema
+from src.tools.doris_singleflight import SingleFlight
+from src.tools.doris_sql import DDL, analyze_sql, qualify_table
+from src.tools.doris_stream_load import DorisStreamLoader, StreamLoadError
+
 
 class DorisTools(Toolkit):
     """A simple toolkit to connect to Apache Doris database with basic Data Dictionary support.
@@ -30,18 +90,125 @@ class DorisTools(Toolkit):
         user: str = "root",
         password: str = "",
         database: str = "",
-        read_only: bool = False
+        read_only: bool = False,
+        pool_min_size: int = 1,
+        pool_max_size: int = 8,
+        pool_idle_timeout: float = 300.0,
+        pool_max_lifetime: float = 3600.0,
+        pool_health_check_after: float = 30.0,
+        pool_acquire_timeout: float = 30.0,
+        http_port: Optional[int] = None,
+        stream_load_format: str = "json",
+        stream_load_chunk_rows: int = 100000,
+        fetch_chunk_rows: int = 50000,
+        enable_result_cache: bool = False,
+        result_cache_max_bytes: int = 64 * 1024 * 1024,
+        result_cache_ttl: float = 300.0,
+        dictionary_refresh_interval: Optional[float] = 300.0,
+        insert_max_rows_per_statement: int = 1000,
+        insert_max_statement_bytes: int = 1024000,
+        render_max_rows: int = 50,
+        render_max_chars: int = 8000,
+        render_max_column_chars: int = 100,
+        retained_results: int = 16,
+        retained_results_max_bytes: int = 256 * 1024 * 1024,
+        fetch_mode: str = "dict",
+        catalog_refresh_interval: Optional[float] = 300.0,
+        coalesce_concurrent_reads: bool = True,
+        query_timeout: Optional[int] = None,
+        exec_mem_limit: Optional[int] = None,
+        cost_guard_max_scan_rows: Optional[int] = None,
+        cost_guard_max_tablets: Optional[int] = None,
+        cost_guard_action: str = "limit",
+        cost_guard_limit: int = 1000,
+        frontends: Optional[List[FrontendSpec]] = None,
+        frontend_routing: str = "least_outstanding",
+        frontend_backoff_max: float = 30.0,
+        frontend_health_check_interval: Optional[float] = 5.0,
+        connect_timeout: float = 10.0,
+        write_buffer_max_rows: Optional[int] = None,
+        write_buffer_max_delay: float = 1.0,
+        group_commit: Optional[str] = None
     ):
         """Initialize the DorisTools.
         
         Args:
-            host: Doris server host
-            port: Doris server port (MySQL protocol)
+            host: Doris server host. With frontends, the initial write master until
+                SHOW FRONTENDS reports the actual one
+            port: Doris server port (MySQL protocol), also the default port of frontends
             user: Username for authentication
             password: Password for authentication
             database: Default database to connect to
             read_only: If True, write operations will be disabled
+            pool_min_size: Idle connections kept open even when unused
+            pool_max_size: Maximum number of concurrent connections to Doris
+            pool_idle_timeout: Seconds before a surplus idle connection is closed
+            pool_max_lifetime: Seconds before a connection is recycled
+            pool_health_check_after: Idle seconds after which a connection is pinged before reuse
+            pool_acquire_timeout: Seconds to wait for a free connection
+            http_port: FE HTTP port (usually 8030), the same on every FE. Enables Stream Load in save() when set;
+                loads go to the FEs in write order and fail over like writes
+            stream_load_format: Stream Load wire format ('json' or 'csv')
+            stream_load_chunk_rows: Rows sent per Stream Load request
+            fetch_chunk_rows: Rows per DataFrame chunk when streaming results (iter_query)
+            enable_result_cache: If True, cache SELECT results over user tables in process
+                (SHOW, DESC and information_schema reads always go to Doris)
+            result_cache_max_bytes: Size bound of the result cache (estimated bytes)
+            result_cache_ttl: Seconds a cached result stays valid
+            dictionary_refresh_interval: Seconds before the in-memory data dictionary is
+                reloaded from Doris. None or 0 reloads only on refresh_dictionary().
+            insert_max_rows_per_statement: Row budget of one multi-row INSERT statement
+            insert_max_statement_bytes: Byte budget of one multi-row INSERT statement,
+                keep below the FE's max_allowed_packet
+            render_max_rows: Rows shown at most in text tool output (head and tail preview)
+            render_max_chars: Character budget of a table in text tool output
+            render_max_column_chars: Cell values longer than this are truncated in text output
+            retained_results: Truncated results kept in memory for fetch_result_page
+            retained_results_max_bytes: Memory bound of the retained results
+            fetch_mode: 'dict' builds query() DataFrames from DictCursor rows. 'columnar'
+                fetches tuples and builds typed columns from the cursor metadata, with
+                low-cardinality strings as categoricals and other strings Arrow-backed (plain
+                objects without pyarrow); this uses much less memory for large or long-lived results
+            catalog_refresh_interval: Seconds before the schema and statistics catalog used by
+                show_tables, describe_table and describe_all is reloaded from information_schema.
+                None or 0 reloads only after DDL or refresh_catalog().
+            coalesce_concurrent_reads: If True, identical reads that run at the same time
+                (same database and normalized SQL) execute once and share the result
+            query_timeout: Default Doris query_timeout in seconds for every session. Calls can
+                lower or raise it with their timeout argument.
+            exec_mem_limit: Doris exec_mem_limit in bytes for every session
+            cost_guard_max_scan_rows: Reject or limit SELECTs whose EXPLAIN estimates more
+                scanned rows than this. The guard is off unless a budget is set.
+            cost_guard_max_tablets: Reject or limit SELECTs that read more tablets than this
+            cost_guard_action: 'limit' appends LIMIT cost_guard_limit to over-budget queries
+                whose plan streams rows; 'reject' refuses them. Over-budget aggregations,
+                sorts and joins are always rejected, since a LIMIT doesn't shorten their scan.
+            cost_guard_limit: Row limit appended by the 'limit' action
+            frontends: Further FE endpoints as 'host[:port]', (host, port[, weight]) or
+                {'host', 'port', 'weight'}. Reads are balanced across all FEs, writes and DDL
+                go to the master, and each FE gets its own pool of pool_max_size connections.
+            frontend_routing: Read routing, 'least_outstanding' (fewest statements in flight
+                per weight) or 'round_robin' (smooth weighted round-robin)
+            frontend_backoff_max: Upper bound in seconds of the exponential backoff an
+                unreachable FE is kept out of rotation for
+            frontend_health_check_interval: Seconds between reconnect probes of FEs that are down
+            connect_timeout: Seconds to wait for a connection to an FE before failing over
+            write_buffer_max_rows: Enables write-behind buffering of insert_data. Rows are
+                coalesced per table and written with multi-row INSERTs once this many are
+                pending, the oldest is write_buffer_max_delay seconds old, a statement reads
+                or changes the table, or close() is called. None writes every call at once.
+            write_buffer_max_delay: Seconds buffered rows may wait before they are written
+            group_commit: Doris group commit mode of insert_data writes ('async_mode',
+                'sync_mode' or 'off_mode'). The FE merges concurrent small INSERTs into one
+                transaction; with 'async_mode' rows become visible shortly after the call
+                returns. save() never uses group commit.
         """
+        if fetch_mode not in ("dict", "columnar"):
+            raise ValueError(f"Invalid fetch_mode: {fetch_mode}. Must be one of: 'dict', 'columnar'.")
+        if group_commit is not None and group_commit not in GROUP_COMMIT_MODES:
+            raise ValueError(
+                f"Invalid group_commit: {group_commit}. Must be one of: {', '.join(GROUP_COMMIT_MODES)}."
+            )
         super().__init__(name="doris_tools")
         self.host = host
         self.port = port
@@ -49,18 +216,98 @@ class DorisTools(Toolkit):
         self.password = password
         self.database = database
         self.read_only = read_only
-        self._connection = None
+        self.query_timeout = query_timeout
+        self.exec_mem_limit = exec_mem_limit
+        self.connect_timeout = connect_timeout
+        pool_factory = lambda frontend: DorisConnectionPool(
+            connect=partial(self._connect, frontend),
+            min_size=pool_min_size,
+            max_size=pool_max_size,
+            idle_timeout=pool_idle_timeout,
+            max_lifetime=pool_max_lifetime,
+            health_check_after=pool_health_check_after,
+            acquire_timeout=pool_acquire_timeout,
+        )
+        self._router = FrontendRouter(
+            parse_frontends([(host, port)] + list(frontends or []), default_port=port),
+            pool_factory=pool_factory,
+            probe=lambda frontend: self._connect(frontend).close(),
+            policy=frontend_routing,
+            backoff_max=frontend_backoff_max,
+            health_check_interval=frontend_health_check_interval,
+            locate_master=self._locate_master,
+        )
+        self.http_port = http_port
+        self.stream_load_chunk_rows = stream_load_chunk_rows
+        self.fetch_chunk_rows = fetch_chunk_rows
+        self.fetch_mode = fetch_mode
+        self._result_cache = None
+        self._singleflight = SingleFlight() if coalesce_concurrent_reads else None
+        self._cost_guard = None
+        if cost_guard_max_scan_rows is not None or cost_guard_max_tablets is not None:
+            self._cost_guard = CostGuard(
+                max_scan_rows=cost_guard_max_scan_rows,
+                max_tablets=cost_guard_max_tablets,
+                action=cost_guard_action,
+                limit=cost_guard_limit,
+            )
+        if enable_result_cache:
+            self._result_cache = QueryResultCache(max_bytes=result_cache_max_bytes, ttl=result_cache_ttl)
+        self.dictionary_refresh_interval = dictionary_refresh_interval
+        self.insert_max_rows_per_statement = insert_max_rows_per_statement
+        self.insert_max_statement_bytes = insert_max_statement_bytes
+        self.group_commit = None if group_commit == "off_mode" else group_commit
+        self._write_buffer = None
+        if write_buffer_max_rows is not None and not read_only:
+            self._write_buffer = WriteBuffer(
+                write=self._write_buffered,
+                max_rows=write_buffer_max_rows,
+                max_delay=write_buffer_max_delay,
+                retryable=is_connection_failure,
+            )
+        self._dictionary = DataDictionaryIndex()
+        self._renderer = ResultRenderer(
+            max_rows=render_max_rows,
+            max_chars=render_max_chars,
+            max_column_chars=render_max_column_chars,
+        )
+        self._result_store = ResultStore(max_results=retained_results, max_bytes=retained_results_max_bytes)
+        self._dictionary_lock = threading.Lock()
+        self.catalog_refresh_interval = catalog_refresh_interval
+        self._catalog = MetadataCatalog()
+        self._catalog_lock = threading.Lock()
+        self._analysis_executor: Optional[ThreadPoolExecutor] = None
+        # Job id -> (future, submission time), oldest first
+        self._analysis_jobs: Dict[str, Tuple[Future, float]] = {}
+        self._analysis_lock = threading.Lock()
+        self._stream_loader = None
+        if http_port is not None:
+            self._stream_loader = DorisStreamLoader(
+                host=host,
+                http_port=http_port,
+                user=user,
+                password=password,
+                database=database,
+                data_format=stream_load_format,
+                # Loads follow writes to the master and fail over with them
+                frontend_hosts=lambda: [frontend.host for frontend in self._router.write_frontends()],
+            )
         
         # Register tools
         self.register(self.query)
         self.register(self.show_tables)
         self.register(self.describe_table)
+        self.register(self.describe_all)
         self.register(self.analyze_data)
+        self.register(self.get_analysis_result)
         self.register(self.export_to_csv)
+        self.register(self.export_data)
         self.register(self.search_dictionary)
+        self.register(self.fetch_result_page)
         
         if not read_only:
             self.register(self.insert_data)
+            self.register(self.flush_writes)
             self.register(self.update_data)
             self.register(self.execute_sql)
             self.register(self.save)
@@ -68,152 +315,622 @@ class DorisTools(Toolkit):
         # Ensure data dictionary table exists
         self._ensure_data_dictionary_exists()
 
-    @property
-    def connection(self) -> pymysql.connections.Connection:
-        """Get or create the PyMySQL connection."""
-        if self._connection is None:
-            self._connection = pymysql.connect(
-                host=self.host,
-                port=self.port,
-                user=self.user,
-                password=self.password,
-                database=self.database,
-                cursorclass=DictCursor,
-                charset='utf8mb4'
-            )
-            
-            # Set session to read-only if specified
-            if self.read_only:
-                cursor = self._connection.cursor()
-                cursor.execute("SET SESSION TRANSACTION READ ONLY;")
-                cursor.close()
+    def _connect(self, frontend: Optional[Frontend] = None) -> pymysql.connections.Connection:
+        """Create a new PyMySQL connection to an FE (default: host) for its pool."""
+        connection = pymysql.connect(
+            host=frontend.host if frontend is not None else self.host,
+            port=frontend.port if frontend is not None else self.port,
+            user=self.user,
+            password=self.password,
+            database=self.database,
+            cursorclass=DictCursor,
+            charset='utf8mb4',
+            connect_timeout=self.connect_timeout
+        )
+        
+        # Set session to read-only if specified
+        if self.read_only:
+            cursor = connection.cursor()
+            cursor.execute("SET SESSION TRANSACTION READ ONLY;")
+            cursor.close()
+        
+        # Resource limits enforced by the FE for every statement of the session
+        if self.query_timeout is not None or self.exec_mem_limit is not None:
+            cursor = connection.cursor()
+            if self.query_timeout is not None:
+                cursor.execute("SET query_timeout = %s", (int(self.query_timeout),))
+            if self.exec_mem_limit is not None:
+                cursor.execute("SET exec_mem_limit = %s", (int(self.exec_mem_limit),))
+            cursor.close()
                 
-        return self._connection
+        return connection
+
+    def _locate_master(self) -> Optional[tuple]:
+        """Return (host, query port) of the master FE from SHOW FRONTENDS, None if not listed."""
+        with self._cursor(read=True) as cursor:
+            cursor.execute("SHOW FRONTENDS")
+            for row in cursor.fetchall():
+                if str(row.get('IsMaster', '')).lower() == 'true':
+                    return row['Host'], int(row['QueryPort'])
+        return None
+
+    @contextmanager
+    def _cursor(self, cursor_class: Optional[type] = None,
+                timeout: Optional[float] = None,
+                cancel_token: Optional[CancelToken] = None,
+                read: bool = False) -> Iterator[pymysql.cursors.Cursor]:
+        """Check a connection out of the pool and yield a cursor on it.
+        
+        The cursor is closed and the connection returned to the pool when the
+        block exits. Use ``cursor.connection.commit()`` to commit writes.
+        
+        Args:
+            cursor_class: Cursor class to use instead of the connection's DictCursor
+            timeout: query_timeout in seconds for statements run in the block
+            cancel_token: Token whose cancel() kills the statement running in the block
+            read: If True the block only reads and may run on any FE, otherwise it runs on the master
+        """
+        with self._router.connection(read=read) as connection:
+            cursor = connection.cursor(cursor_class)
+            try:
+                with self._query_limits(cursor, timeout, cancel_token):
+                    yield cursor
+            finally:
+                cursor.close()
+
+    # Seconds past query_timeout after which the statement is killed from a side
+    # connection, in case the FE has not stopped it by itself
+    KILL_GRACE_SECONDS = 5.0
+
+    @contextmanager
+    def _query_limits(self, cursor, timeout: Optional[float], cancel_token: Optional[CancelToken]) -> Iterator[None]:
+        """Apply a per-call query_timeout and make the connection's statement killable."""
+        if timeout is None and cancel_token is None:
+            yield
+            return
+        
+        connection = cursor.connection
+        previous_timeout = None
+        if timeout is not None:
+            previous_timeout = self.query_timeout
+            if previous_timeout is None:
+                cursor.execute("SELECT @@query_timeout AS `query_timeout`")
+                row = cursor.fetchone()
+                previous_timeout = row['query_timeout'] if isinstance(row, dict) else row[0]
+            cursor.execute("SET query_timeout = %s", (max(1, math.ceil(timeout)),))
+        
+        # Connection ids are per FE, so KILL must go to the FE running the statement
+        thread_id = connection.thread_id()
+        frontend = Frontend(connection.host, connection.port)
+        unregister = cancel_token.register(lambda: self._kill_query(thread_id, frontend)) if cancel_token else None
+        watchdog = None
+        if timeout is not None:
+            watchdog = threading.Timer(timeout + self.KILL_GRACE_SECONDS, self._kill_query, (thread_id, frontend))
+            watchdog.daemon = True
+            watchdog.start()
+        try:
+            yield
+        finally:
+            if watchdog is not None:
+                watchdog.cancel()
+            if unregister is not None:
+                unregister()
+            if previous_timeout is not None and connection.open:
+                try:
+                    cursor.execute("SET query_timeout = %s", (int(previous_timeout),))
+                except Exception as e:
+                    # Don't hand a connection with the wrong timeout back to the pool
+                    log_debug(f"Could not restore query_timeout, dropping connection: {str(e)}")
+                    connection.close()
 
-    def _ensure_connection(self):
-        """Ensure the connection is active and reconnect if needed."""
+    def _kill_query(self, thread_id: int, frontend: Optional[Frontend] = None) -> None:
+        """Issue KILL QUERY for a connection's running statement from a side connection to its FE."""
         try:
-            self.connection.ping(reconnect=True)
-        except:
-            self._connection = None
-            self.connection  # This will recreate the connection
+            connection = self._connect(frontend)
+            try:
+                cursor = connection.cursor()
+                cursor.execute(f"KILL QUERY {int(thread_id)}")
+                cursor.close()
+            finally:
+                connection.close()
+            log_info(f"Killed query on connection {thread_id}")
+        except Exception as e:
+            log_debug(f"KILL QUERY {thread_id} failed: {str(e)}")
+
+    def _query_error(self, error: Exception, timeout: Optional[float] = None,
+                     cancel_token: Optional[CancelToken] = None, prefix: str = "Query error") -> str:
+        """Turn an exception into the agent-facing error message.
+        
+        Timeouts, memory limit and cancellation errors get a structured message
+        saying what to change before retrying.
+        """
+        kind = classify_error(error)
+        if cancel_token is not None and cancel_token.cancelled:
+            kind = 'cancelled'
+        elif kind == 'cancelled' and timeout is not None:
+            # The watchdog killed a statement that outlived its timeout
+            kind = 'timeout'
+        if kind is not None:
+            error_msg = format_limit_error(kind, timeout=timeout or self.query_timeout, detail=str(error))
+        else:
+            error_msg = f"{prefix}: {str(error)}"
+        log_debug(error_msg)
+        return error_msg
+
+    def pool_stats(self) -> Dict[str, Any]:
+        """Return connection pool counters (size, idle, in use, waits), summed over all FEs."""
+        totals: Dict[str, Any] = {}
+        for frontend in self._router.frontends:
+            for name, value in frontend.pool.stats().items():
+                totals[name] = totals.get(name, 0) + value
+        return totals
+
+    def frontend_stats(self) -> Dict[str, Any]:
+        """Return read/write routing counters, failovers and the health and pool of every FE."""
+        return self._router.stats()
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """Return result cache counters (hits, misses, evictions, bytes), or {} if disabled."""
+        return self._result_cache.stats() if self._result_cache is not None else {}
+
+    def _render(self, df: pd.DataFrame) -> str:
+        """Render a DataFrame for tool output within the configured row and character budgets."""
+        return self._renderer.render(df, store=self._result_store)
+
+    def fetch_result_page(self, result_id: str, offset: int = 0, limit: Optional[int] = None) -> str:
+        """Read more rows of a result whose tool output was truncated.
+        
+        Args:
+            result_id: Id named in the truncated output's footer
+            offset: Index of the first row to return
+            limit: Number of rows to return (defaults to the output row budget)
+            
+        Returns:
+            The requested rows, rendered within the same budgets
+        """
+        df = self._result_store.get(result_id)
+        if df is None:
+            return f"Unknown or expired result: {result_id}. Re-run the query."
+        if offset < 0 or offset >= len(df):
+            return f"Offset {offset} is out of range. The result has {len(df)} rows."
+        limit = limit or self._renderer.max_rows
+        page = df.iloc[offset:offset + limit]
+        return self._renderer.render(page, result_id=result_id, offset=offset, total_rows=len(df))
+
+    def _invalidate_tables(self, *tables: str) -> None:
+        """Drop cached results that read any of the given tables."""
+        if self._result_cache is not None:
+            self._result_cache.invalidate_tables(qualify_table(table, self.database) for table in tables)
+
+    def _flush_buffered(self, sql: Optional[str] = None, table: Optional[str] = None) -> None:
+        """Write the buffered rows of the tables a statement reads or changes.
+        
+        Keeps insert_data buffering invisible to the agent: a later read sees
+        the rows, and a later update or DDL applies after them. Statements
+        whose tables can't be determined flush every table.
+        """
+        if self._write_buffer is None or not self._write_buffer.pending_rows():
+            return
+        pending = self._write_buffer.pending_tables()
+        if table is not None:
+            tables = [table]
+        else:
+            referenced = analyze_sql(sql).qualified_tables(self.database)
+            tables = [name for name in pending if qualify_table(name, self.database) in referenced] if referenced else pending
+        for name in tables:
+            try:
+                self._write_buffer.flush(name)
+            except Exception as e:
+                # Reported by the next insert_data or flush_writes
+                log_debug(f"Buffered write to {name} failed: {str(e)}")
+
+    def _invalidate_for_statement(self, sql: str) -> None:
+        """Drop cached results affected by a write or DDL statement."""
+        info = analyze_sql(sql)
+        if DDL in info.statement_kinds:
+            self._catalog.invalidate()
+        if self._result_cache is None:
+            return
+        tables = info.qualified_tables(self.database)
+        if tables:
+            self._result_cache.invalidate_tables(tables)
+        else:
+            # Unknown target, e.g. a USE or SET statement: be conservative.
+            self._result_cache.clear()
     
+    # UNIQUE KEY model: re-inserting a (table_name, column_name) replaces the
+    # previous row, so the dictionary can be upserted with one multi-row INSERT.
+    DATA_DICTIONARY_DDL = """
+    CREATE TABLE IF NOT EXISTS `{name}` (
+        `table_name` VARCHAR(255) NOT NULL COMMENT '表名',
+        `column_name` VARCHAR(255) NOT NULL COMMENT '列名（表名为表记录，列名为空为表描述）',
+        `description` TEXT COMMENT '描述信息',
+        `updated_at` DATETIME COMMENT '更新时间'
+    ) ENGINE=OLAP
+    UNIQUE KEY(`table_name`, `column_name`)
+    DISTRIBUTED BY HASH(`table_name`) BUCKETS 1
+    PROPERTIES('replication_num' = '1', 'enable_unique_key_merge_on_write' = 'true');
+    """
+
     def _ensure_data_dictionary_exists(self):
-        """Ensure data dictionary table exists."""
+        """Ensure data dictionary table exists and uses the UNIQUE KEY model."""
         if self.read_only:
             log_info("In read-only mode. Cannot create data dictionary table if it doesn't exist.")
             return
         
         try:
-            self._ensure_connection()
-            cursor = self.connection.cursor()
-            
-            # Create a simple data dictionary table
-            cursor.execute("""
-            CREATE TABLE IF NOT EXISTS `data_dictionary` (
-                `table_name` VARCHAR(255) NOT NULL COMMENT '表名',
-                `column_name` VARCHAR(255) NOT NULL COMMENT '列名（表名为表记录，列名为空为表描述）',
-                `description` TEXT COMMENT '描述信息',
-                `updated_at` DATETIME COMMENT '更新时间'
-            ) ENGINE=OLAP
-            DUPLICATE KEY(`table_name`, `column_name`)
-            DISTRIBUTED BY HASH(`table_name`) BUCKETS 1
-            PROPERTIES('replication_num' = '1');
-            """)
+            with self._cursor() as cursor:
+                # Create a simple data dictionary table
+                cursor.execute(self.DATA_DICTIONARY_DDL.format(name='data_dictionary'))
             
-            cursor.close()
+            self._migrate_data_dictionary()
             log_info("Data dictionary initialized")
         except Exception as e:
             log_debug(f"Error ensuring data dictionary exists: {str(e)}")
 
-    def query(self, sql: str, as_pandas: bool = True) -> Union[str, pd.DataFrame]:
+    def _migrate_data_dictionary(self) -> bool:
+        """Convert a DUPLICATE KEY data_dictionary from older versions to UNIQUE KEY.
+        
+        Rows are copied into a staging table keeping the latest description per
+        (table_name, column_name), then swapped in atomically.
+        
+        Returns:
+            True if a migration was performed
+        """
+        with self._cursor() as cursor:
+            cursor.execute("SHOW CREATE TABLE `data_dictionary`")
+            row = cursor.fetchone()
+            create_stmt = (row.get('Create Table') or '') if row else ''
+            if 'DUPLICATE KEY' not in create_stmt.upper():
+                return False
+            
+            log_info("Migrating data_dictionary from DUPLICATE KEY to UNIQUE KEY model")
+            cursor.execute("DROP TABLE IF EXISTS `data_dictionary_migration`")
+            cursor.execute(self.DATA_DICTIONARY_DDL.format(name='data_dictionary_migration'))
+            cursor.execute("""
+            INSERT INTO `data_dictionary_migration` (table_name, column_name, description, updated_at)
+            SELECT table_name, column_name, max_by(description, updated_at), max(updated_at)
+            FROM `data_dictionary`
+            GROUP BY table_name, column_name
+            """)
+            cursor.execute(
+                "ALTER TABLE `data_dictionary` REPLACE WITH TABLE `data_dictionary_migration` "
+                "PROPERTIES('swap' = 'false')"
+            )
+            cursor.connection.commit()
+        
+        self._invalidate_tables('data_dictionary')
+        self.refresh_dictionary()
+        return True
+
+    def query(self, sql: str, as_pandas: bool = True,
+              timeout: Optional[float] = None) -> Union[str, pd.DataFrame]:
         """Execute a query and return the results.
         
         Args:
             sql: SQL query to execute
-            as_pandas: If True, return a pandas DataFrame (when returning to the agent, will be converted to string)
+            as_pandas: If True, return a pandas DataFrame (when returning to the agent, will be converted to string).
+                       If False, return a bounded text preview; truncated results can be paged with fetch_result_page
+            timeout: Seconds the statement may run before Doris stops it. Defaults to query_timeout.
             
         Returns:
             Query results as a string or DataFrame
         """
+        return self._query(sql, as_pandas, timeout)
+
+    def _query(self, sql: str, as_pandas: bool = True,
+               timeout: Optional[float] = None,
+               cancel_token: Optional[CancelToken] = None) -> Union[str, pd.DataFrame]:
+        """query() with a cancel_token another thread can use to kill the running statement.
+        
+        Kept out of the registered tool, whose arguments come from the model.
+        Calls with a token are not coalesced with identical concurrent reads.
+        """
         log_info(f"Executing query: {sql}")
-        self._ensure_connection()
+        
+        if analyze_sql(sql).changes_session:
+            # Every call may run on a different pooled connection, so the change would stick to one of them
+            return ("Error: SET, USE and SWITCH statements are not supported, since statements run on pooled "
+                    "connections and the change would only apply to one of them. Use a SET_VAR hint "
+                    "(SELECT /*+ SET_VAR(query_timeout = 60) */ ...), the timeout argument or "
+                    "database-qualified table names instead.")
         
         try:
-            cursor = self.connection.cursor()
-            cursor.execute(sql)
-            
-            if sql.strip().upper().startswith(('SELECT', 'SHOW', 'DESC', 'EXPLAIN')):
-                result = cursor.fetchall()
-                cursor.close()
-                
-                if not result:
-                    return "Query executed successfully, but returned no data."
+            if analyze_sql(sql).is_read:
+                decision = self._check_cost(sql)
+                if decision is not None:
+                    if decision.action == 'reject':
+                        return decision.message()
+                    sql = decision.sql
                 
-                if as_pandas:
-                    df = pd.DataFrame(result)
-                    return df if not isinstance(df, str) else "Empty result"
+                execute = lambda: self._execute_read(sql, timeout, cancel_token)
+                if self._singleflight is not None and cancel_token is None:
+                    result = self._singleflight.do(self._read_key(sql, timeout), execute)
                 else:
-                    # Format as string
-                    if result:
-                        # Get column names from first row
-                        columns = list(result[0].keys())
-                        header = ", ".join(columns)
-                        rows = []
-                        for row in result:
-                            row_values = [str(row.get(col, '')) for col in columns]
-                            rows.append(", ".join(row_values))
-                        return header + "\n" + "\n".join(rows)
-                    return "No data returned"
-            else:
+                    result = execute()
+                return self._format_read(result, as_pandas, decision)
+            
+            self._flush_buffered(sql)
+            with self._cursor(timeout=timeout, cancel_token=cancel_token) as cursor:
+                cursor.execute(sql)
                 affected_rows = cursor.rowcount
-                cursor.close()
-                self.connection.commit()
-                return f"Query executed successfully. Affected rows: {affected_rows}"
+                cursor.connection.commit()
+            self._invalidate_for_statement(sql)
+            return f"Query executed successfully. Affected rows: {affected_rows}"
         except Exception as e:
-            error_msg = f"Query error: {str(e)}"
-            log_debug(error_msg)
-            return error_msg
+            return self._query_error(e, timeout, cancel_token)
 
-    def show_tables(self) -> str:
-        """Show all tables with their descriptions from the data dictionary.
+    async def aquery(self, sql: str, as_pandas: bool = True,
+                     timeout: Optional[float] = None,
+                     cancel_token: Optional[CancelToken] = None) -> Union[str, pd.DataFrame]:
+        """Async variant of query() for asyncio callers.
+        
+        The blocking database call runs in the event loop's default executor.
+        Identical reads in flight from threads or other coroutines are shared.
+        With a cancel_token, cancelling the awaiting task (e.g. when an SSE
+        client disconnects) also kills the statement in Doris.
+        """
+        loop = asyncio.get_running_loop()
+        if not analyze_sql(sql).is_read or self._singleflight is None or cancel_token is not None:
+            try:
+                return await loop.run_in_executor(None, self._query, sql, as_pandas, timeout, cancel_token)
+            except asyncio.CancelledError:
+                if cancel_token is not None:
+                    cancel_token.cancel()
+                raise
+        
+        log_info(f"Executing query: {sql}")
+        try:
+            decision = await loop.run_in_executor(None, self._check_cost, sql)
+            if decision is not None:
+                if decision.action == 'reject':
+                    return decision.message()
+                sql = decision.sql
+            result = await self._singleflight.do_async(
+                self._read_key(sql, timeout), lambda: self._execute_read(sql, timeout)
+            )
+            return self._format_read(result, as_pandas, decision)
+        except Exception as e:
+            return self._query_error(e, timeout)
+
+    def _read_key(self, sql: str, timeout: Optional[float] = None) -> tuple:
+        """Key under which identical concurrent reads are coalesced."""
+        return (self.database, self.fetch_mode, timeout, analyze_sql(sql).normalized)
+
+    def _execute_read(self, sql: str, timeout: Optional[float] = None,
+                      cancel_token: Optional[CancelToken] = None) -> Any:
+        """Run a read statement, going through the result cache when enabled.
         
         Returns:
-            List of tables with descriptions
+            List of row dicts, a DataFrame in columnar fetch mode, or None for no rows
         """
+        self._flush_buffered(sql)
+        cacheable = self._result_cache is not None and is_cacheable(sql, self.database)
+        
+        result = self._result_cache.get(self.database, sql) if cacheable else None
+        if result is not None:
+            log_debug("Result cache hit")
+            return result
+        
+        generation = self._result_cache.generation if cacheable else None
+        cursor_class = None if self.fetch_mode == 'dict' else Cursor
+        with self._cursor(cursor_class, timeout=timeout, cancel_token=cancel_token, read=True) as cursor:
+            cursor.execute(sql)
+            if self.fetch_mode == 'columnar':
+                rows = cursor.fetchall()
+                result = rows_to_frame(rows, cursor.description) if rows else None
+            else:
+                result = cursor.fetchall()
+        
+        if cacheable:
+            self._result_cache.put(self.database, sql, result, generation=generation)
+        return result
+
+    def _format_read(self, result: Any, as_pandas: bool,
+                     decision: Optional[GuardDecision] = None) -> Union[str, pd.DataFrame]:
+        note = decision.message() if decision is not None else ""
+        if result is None or len(result) == 0:
+            message = "Query executed successfully, but returned no data."
+            return f"{note}\n{message}" if note else message
+        
+        if isinstance(result, pd.DataFrame):
+            # Shallow copy so callers can't alter a cached or shared frame in place
+            df = result.copy(deep=False)
+        else:
+            df = pd.DataFrame(result)
+        if as_pandas:
+            if note:
+                df.attrs['cost_guard'] = note
+            return df
+        # Bounded preview; the full result is retained for fetch_result_page
+        text = self._render(df)
+        return f"{note}\n{text}" if note else text
+
+    def _check_cost(self, sql: str) -> Optional[GuardDecision]:
+        """Run the EXPLAIN cost guard on a SELECT; None if the guard is off or doesn't apply."""
+        if self._cost_guard is None or not analyze_sql(sql).is_query:
+            return None
+        
+        def explain(statement: str) -> List[str]:
+            with self._cursor(Cursor, read=True) as cursor:
+                cursor.execute(f"EXPLAIN {statement}")
+                return [str(row[0]) for row in cursor.fetchall()]
+        
         try:
-            # First check if the data dictionary table exists
-            self._ensure_connection()
-            cursor = self.connection.cursor()
+            decision = self._cost_guard.check(sql, explain)
+        except Exception as e:
+            # A statement EXPLAIN can't plan fails the same way when executed
+            log_debug(f"Cost guard EXPLAIN failed, running unchecked: {str(e)}")
+            return None
+        if decision.action != 'allow':
+            log_info(f"Cost guard {decision.action}: {decision.reason}")
+        return decision
+
+    def cost_guard_stats(self) -> Dict[str, Any]:
+        """Return cost guard counters (checks, EXPLAINs run, allowed, limited, rejected), or {} if disabled."""
+        return self._cost_guard.stats() if self._cost_guard is not None else {}
+
+    def singleflight_stats(self) -> Dict[str, Any]:
+        """Return counters of coalesced concurrent reads (executions, coalesced), or {} if disabled."""
+        return self._singleflight.stats() if self._singleflight is not None else {}
+
+    def iter_query(self, sql: str, chunk_size: Optional[int] = None,
+                   timeout: Optional[float] = None,
+                   cancel_token: Optional[CancelToken] = None) -> Iterator[pd.DataFrame]:
+        """Execute a query and yield the results as DataFrame chunks.
+        
+        Rows are read from an unbuffered server-side cursor, so at most one
+        chunk is held in memory at a time. The connection stays checked out
+        until the generator is exhausted or closed.
+        
+        Args:
+            sql: SQL query to execute
+            chunk_size: Rows per chunk. Defaults to fetch_chunk_rows.
+            timeout: Seconds the statement may run before Doris stops it
+            cancel_token: CancelToken another thread can use to kill the statement
             
+        Yields:
+            DataFrames with the query's columns and at most chunk_size rows, with
+            cursor.description in attrs['description']
+        """
+        chunk_size = chunk_size or self.fetch_chunk_rows
+        log_info(f"Streaming query: {sql}")
+        self._flush_buffered(sql)
+        
+        with self._router.connection(read=True) as connection:
+            cursor = connection.cursor(SSCursor)
+            with self._query_limits(cursor, timeout, cancel_token):
+                try:
+                    cursor.execute(sql)
+                    if cursor.description is None:
+                        return
+                    columns = [desc[0] for desc in cursor.description]
+                    
+                    while True:
+                        rows = cursor.fetchmany(chunk_size)
+                        if not rows:
+                            break
+                        if self.fetch_mode == 'columnar':
+                            # Categories would differ from chunk to chunk, so chunks keep plain strings
+                            chunk = rows_to_frame(rows, cursor.description, categorical_max_ratio=None)
+                        else:
+                            chunk = pd.DataFrame.from_records(rows, columns=columns)
+                        # Column types for writers that need them up front (Parquet export)
+                        chunk.attrs['description'] = cursor.description
+                        yield chunk
+                except GeneratorExit:
+                    # Closing an unbuffered cursor drains the remaining rows; drop
+                    # the connection instead so an early stop stays cheap.
+                    connection.close()
+                    raise
+            cursor.close()
+
+    def _get_dictionary(self) -> Optional[DataDictionaryIndex]:
+        """Return the in-memory data dictionary, loading or refreshing it when stale.
+        
+        Returns:
+            The dictionary index, or None if the data_dictionary table can't be read
+        """
+        if not self._dictionary.is_stale(self.dictionary_refresh_interval):
+            return self._dictionary
+        
+        with self._dictionary_lock:
+            # Another thread may have refreshed it while we waited
+            if not self._dictionary.is_stale(self.dictionary_refresh_interval):
+                return self._dictionary
             try:
-                cursor.execute("SELECT 1 FROM data_dictionary LIMIT 1")
-                dict_exists = True
-            except:
-                dict_exists = False
+                with self._cursor(read=True) as cursor:
+                    cursor.execute("SELECT table_name, column_name, description FROM data_dictionary")
+                    rows = cursor.fetchall()
+            except Exception as e:
+                log_debug(f"Error loading data dictionary: {str(e)}")
+                return self._dictionary if self._dictionary.loaded else None
+            
+            self._dictionary.load(
+                (row['table_name'], row['column_name'], row['description']) for row in rows
+            )
+            log_debug(f"Loaded {len(rows)} data dictionary entries")
+            return self._dictionary
+
+    def refresh_dictionary(self) -> None:
+        """Force the in-memory data dictionary to reload on next use."""
+        with self._dictionary_lock:
+            self._dictionary.loaded_at = None
+
+    def _get_catalog(self) -> Optional[MetadataCatalog]:
+        """Return the schema and statistics catalog, loading or refreshing it when stale.
+        
+        Returns:
+            The catalog, or None if information_schema can't be read
+        """
+        if not self._catalog.is_stale(self.catalog_refresh_interval):
+            return self._catalog
+        
+        with self._catalog_lock:
+            if not self._catalog.is_stale(self.catalog_refresh_interval):
+                return self._catalog
+            try:
+                with self._cursor(read=True) as cursor:
+                    cursor.execute(CATALOG_TABLES_SQL, (self.database,))
+                    tables = cursor.fetchall()
+                    cursor.execute(CATALOG_COLUMNS_SQL, (self.database,))
+                    columns = cursor.fetchall()
+            except Exception as e:
+                log_debug(f"Error loading metadata catalog: {str(e)}")
+                return self._catalog if self._catalog.loaded else None
+            
+            self._catalog.load(tables, columns)
+            log_debug(f"Loaded metadata catalog: {len(tables)} tables, {len(columns)} columns")
+            return self._catalog
+
+    def refresh_catalog(self) -> None:
+        """Force the metadata catalog to reload on next use."""
+        with self._catalog_lock:
+            self._catalog.invalidate()
+
+    # Tables maintained by DorisTools itself, hidden from show_tables and describe_all
+    INTERNAL_TABLES = {'data_dictionary', 'data_dictionary_migration', WATERMARKS_TABLE, ROW_HASHES_TABLE}
+
+    def show_tables(self) -> str:
+        """Show all tables with their descriptions, row counts, sizes and last update time.
+        
+        Returns:
+            List of tables with descriptions and statistics
+        """
+        try:
+            dictionary = self._get_dictionary()
+            catalog = self._get_catalog()
+            if catalog is not None:
+                rows = []
+                for info in catalog.tables():
+                    if info.name in self.INTERNAL_TABLES or self.STAGING_MARKER in info.name:
+                        continue
+                    description = dictionary.table_description(info.name) if dictionary else None
+                    rows.append((
+                        info.name,
+                        description or info.comment or '',
+                        info.rows if info.rows is not None else '',
+                        format_size(info.data_length),
+                        info.update_time or '',
+                    ))
+                if rows:
+                    result = pd.DataFrame(rows, columns=['表名', '表描述', '行数(估计)', '数据大小', '更新时间'])
+                    return self._render(result)
             
             # If data dictionary exists and has data, use it
-            if dict_exists:
-                # Query to get tables and their descriptions
-                query = """
-                SELECT 
-                    d1.table_name as '表名', 
-                    d1.description as '表描述'
-                FROM data_dictionary d1
-                WHERE d1.column_name = ''
-                ORDER BY d1.table_name
-                """
-                result = self.query(query, as_pandas=True)
+            if dictionary is not None:
+                tables = dictionary.tables()
                 
                 # If we got results from the data dictionary
-                if isinstance(result, pd.DataFrame) and not result.empty:
-                    return result.to_string(index=False)
+                if tables:
+                    result = pd.DataFrame(tables, columns=['表名', '表描述'])
+                    return self._render(result)
             
             # Fallback to standard SHOW TABLES if dictionary is empty or doesn't exist
-            log_info("Data dictionary empty or not found. Using standard SHOW TABLES.")
+            log_info("Metadata catalog and data dictionary unavailable. Using standard SHOW TABLES.")
             result = self.query("SHOW TABLES", as_pandas=True)
             if isinstance(result, pd.DataFrame):
-                return result.to_string(index=False)
+                return self._render(result)
             return result
             
         except Exception as e:
@@ -231,33 +948,19 @@ class DorisTools(Toolkit):
             Enhanced table description with column descriptions from data dictionary
         """
         try:
-            # First get the standard table structure
+            catalog = self._get_catalog()
+            info = catalog.table(table) if catalog is not None else None
+            if info is not None and info.columns:
+                return self._describe_from_catalog(info, self._get_dictionary())
+            
+            # Not in the catalog (another database, or created since the last load)
             std_desc = self.query(f"DESC `{table}`", as_pandas=True)
             
             # Try to get table and column descriptions from data dictionary
             try:
-                # Get table description
-                table_query = f"""
-                SELECT description 
-                FROM data_dictionary 
-                WHERE table_name = '{table}' AND column_name = ''
-                """
-                table_desc_result = self.query(table_query, as_pandas=True)
-                table_description = table_desc_result.iloc[0]['description'] if isinstance(table_desc_result, pd.DataFrame) and not table_desc_result.empty else None
-                
-                # Get column descriptions
-                columns_query = f"""
-                SELECT column_name, description 
-                FROM data_dictionary 
-                WHERE table_name = '{table}' AND column_name != ''
-                """
-                columns_desc_result = self.query(columns_query, as_pandas=True)
-                
-                # Create a dictionary of column descriptions
-                column_descriptions = {}
-                if isinstance(columns_desc_result, pd.DataFrame) and not columns_desc_result.empty:
-                    for _, row in columns_desc_result.iterrows():
-                        column_descriptions[row['column_name']] = row['description']
+                dictionary = self._get_dictionary()
+                table_description = dictionary.table_description(table) if dictionary else None
+                column_descriptions = dictionary.column_descriptions(table) if dictionary else {}
                 
                 # If we found data in the dictionary, use it to enhance output
                 if table_description or column_descriptions:
@@ -274,26 +977,14 @@ class DorisTools(Toolkit):
                     
                     if isinstance(std_desc, pd.DataFrame) and not std_desc.empty:
                         # Create a new DataFrame with combined info
-                        data = []
-                        for _, row in std_desc.iterrows():
-                            field_name = row['Field']
-                            data_type = row['Type']
-                            is_nullable = row['Null']
-                            is_key = row['Key']
-                            
-                            # Get description from dictionary
-                            description = column_descriptions.get(field_name, '')
-                            
-                            data.append({
-                                '字段名': field_name,
-                                '类型': data_type,
-                                '可为空': is_nullable,
-                                '主键': is_key,
-                                '描述': description
-                            })
-                        
-                        combined_df = pd.DataFrame(data)
-                        output.append(combined_df.to_string(index=False))
+                        combined_df = pd.DataFrame({
+                            '字段名': std_desc['Field'],
+                            '类型': std_desc['Type'],
+                            '可为空': std_desc['Null'],
+                            '主键': std_desc['Key'],
+                            '描述': std_desc['Field'].map(lambda field: column_descriptions.get(field, '')),
+                        })
+                        output.append(self._render(combined_df))
                     
                     return "\n".join(output)
             except Exception as e:
@@ -302,7 +993,7 @@ class DorisTools(Toolkit):
             
             # Fallback to standard DESC if dictionary lookup fails
             if isinstance(std_desc, pd.DataFrame):
-                return std_desc.to_string(index=False)
+                return self._render(std_desc)
             return str(std_desc)
             
         except Exception as e:
@@ -310,54 +1001,461 @@ class DorisTools(Toolkit):
             log_debug(error_msg)
             return error_msg
 
-    def analyze_data(self, sql: str) -> str:
+    def describe_all(self) -> str:
+        """Describe every table in the database at once: columns, types, descriptions and statistics.
+        
+        Prefer this over calling describe_table for each table when exploring the schema.
+        
+        Returns:
+            Descriptions of all tables
+        """
+        try:
+            catalog = self._get_catalog()
+            if catalog is None:
+                return "Metadata catalog unavailable. Use show_tables and describe_table instead."
+            
+            dictionary = self._get_dictionary()
+            sections = [
+                self._describe_from_catalog(info, dictionary)
+                for info in catalog.tables()
+                if info.name not in self.INTERNAL_TABLES and self.STAGING_MARKER not in info.name
+            ]
+            if not sections:
+                return f"No tables found in database '{self.database}'."
+            return "\n\n".join(sections)
+        except Exception as e:
+            error_msg = f"Error describing tables: {str(e)}"
+            log_debug(error_msg)
+            return error_msg
+
+    def _describe_from_catalog(self, info: TableInfo, dictionary: Optional[DataDictionaryIndex]) -> str:
+        """Format one catalog table the way describe_table does."""
+        table_description = (dictionary.table_description(info.name) if dictionary else None) or info.comment
+        column_descriptions = dictionary.column_descriptions(info.name) if dictionary else {}
+        
+        output = [f"=== 表信息: {info.name} ==="]
+        if table_description:
+            output.append(f"描述: {table_description}")
+        stats = []
+        if info.rows is not None:
+            stats.append(f"行数(估计): {info.rows}")
+        if info.data_length is not None:
+            stats.append(f"数据大小: {format_size(info.data_length)}")
+        if info.update_time:
+            stats.append(f"更新时间: {info.update_time}")
+        if stats:
+            output.append(", ".join(stats))
+        
+        output.append("\n=== 字段信息 ===")
+        columns_df = pd.DataFrame({
+            '字段名': [column['name'] for column in info.columns],
+            '类型': [column['type'] for column in info.columns],
+            '可为空': [column['nullable'] for column in info.columns],
+            '主键': [column['key'] or '' for column in info.columns],
+            '描述': [column_descriptions.get(column['name']) or column['comment'] or '' for column in info.columns],
+        })
+        output.append(self._render(columns_df))
+        return "\n".join(output)
+
+    # MySQL protocol type codes that analyze_data treats as numeric
+    NUMERIC_FIELD_TYPES = {
+        FIELD_TYPE.DECIMAL, FIELD_TYPE.NEWDECIMAL, FIELD_TYPE.TINY, FIELD_TYPE.SHORT,
+        FIELD_TYPE.LONG, FIELD_TYPE.LONGLONG, FIELD_TYPE.INT24, FIELD_TYPE.FLOAT, FIELD_TYPE.DOUBLE,
+    }
+
+    def analyze_data(self, sql: str, mode: str = 'pushdown',
+                     sample_fraction: Optional[float] = None,
+                     sample_rows: Optional[int] = None,
+                     progressive: bool = False,
+                     timeout: Optional[float] = None) -> str:
         """Analyze data using a SQL query and provide statistics.
         
         Args:
             sql: SQL query to execute
+            mode: 'pushdown' computes the statistics inside Doris with one aggregate
+                  query and only fetches the summary row (distinct counts and most
+                  common values are approximate). 'local' streams the full result
+                  and computes exact statistics in pandas. 'sample' aggregates a
+                  sample only and reports estimates with error bounds, quantiles
+                  and histograms; use it first on very large tables.
+            sample_fraction: Fraction of rows to sample in 'sample' mode (default 0.01)
+            sample_rows: Row budget of the sample in 'sample' mode, instead of sample_fraction
+            progressive: In 'sample' mode, also start the full pushdown analysis in the
+                         background. The result includes a job id for get_analysis_result.
+            timeout: Seconds each statement may run before Doris stops it. Defaults to query_timeout.
             
         Returns:
             Data analysis results
         """
+        if mode not in ('pushdown', 'local', 'sample'):
+            return f"Invalid value for mode: {mode}. Must be one of: 'pushdown', 'local', 'sample'."
+        if sample_fraction is not None and not 0 < sample_fraction <= 1:
+            return f"Invalid value for sample_fraction: {sample_fraction}. Must be in (0, 1]."
+        if sample_rows is not None and sample_rows <= 0:
+            return f"Invalid value for sample_rows: {sample_rows}. Must be positive."
+        
+        is_select = analyze_sql(sql).is_query
+        self._flush_buffered(sql)
+        
+        if mode == 'sample' and is_select:
+            try:
+                result = self._analyze_sample(sql, sample_fraction, sample_rows, timeout)
+            except Exception as e:
+                return self._query_error(e, timeout, prefix="Analysis error")
+            if progressive:
+                job_id = self._submit_analysis(sql, timeout)
+                result += (
+                    f"\n\nExact statistics are being computed in the background (job {job_id}). "
+                    f"Call get_analysis_result with this job id to fetch them."
+                )
+            return result
+        
+        if mode in ('pushdown', 'sample') and is_select:
+            try:
+                return self._analyze_pushdown(sql, timeout)
+            except Exception as e:
+                if classify_error(e) is not None:
+                    # Streaming the same result locally would only take longer
+                    return self._query_error(e, timeout, prefix="Analysis error")
+                log_debug(f"Aggregate pushdown failed, analyzing locally: {str(e)}")
+        
+        return self._analyze_local(sql, timeout)
+
+    def get_analysis_result(self, job_id: str) -> str:
+        """Fetch the refined statistics of a progressive analyze_data call.
+        
+        Args:
+            job_id: Job id returned by analyze_data(progressive=True)
+            
+        Returns:
+            The exact statistics, or a status message if the job is still running
+        """
+        with self._analysis_lock:
+            job = self._analysis_jobs.get(job_id)
+            if job is None:
+                return f"Unknown or expired analysis job: {job_id}"
+            future = job[0]
+            if not future.done():
+                return f"Analysis job {job_id} is still running. Try again later."
+            del self._analysis_jobs[job_id]
+        
         try:
-            # Execute the query
-            result = self.query(sql, as_pandas=True)
+            return future.result()
+        except Exception as e:
+            return f"Analysis error: {str(e)}"
+
+    def _submit_analysis(self, sql: str, timeout: Optional[float] = None) -> str:
+        """Run the full pushdown analysis of sql in the background and return its job id."""
+        with self._analysis_lock:
+            if self._analysis_executor is None:
+                self._analysis_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="doris-analyze")
+            self._expire_analysis_jobs()
+            job_id = uuid.uuid4().hex[:12]
+            future = self._analysis_executor.submit(self.analyze_data, sql, 'pushdown', timeout=timeout)
+            self._analysis_jobs[job_id] = (future, time.monotonic())
+        return job_id
+
+    def _expire_analysis_jobs(self) -> None:
+        """Drop results nobody fetched within ANALYSIS_JOB_TTL, and the oldest jobs beyond MAX_ANALYSIS_JOBS.
+        
+        Must be called with the analysis lock held. Dropped jobs that haven't
+        started yet are cancelled.
+        """
+        now = time.monotonic()
+        for job_id, (future, submitted_at) in list(self._analysis_jobs.items()):
+            if future.done() and now - submitted_at > self.ANALYSIS_JOB_TTL:
+                del self._analysis_jobs[job_id]
+        while len(self._analysis_jobs) >= self.MAX_ANALYSIS_JOBS:
+            job_id = next(iter(self._analysis_jobs))
+            future, _ = self._analysis_jobs.pop(job_id)
+            future.cancel()
+            log_debug(f"Dropped analysis job {job_id}: more than {self.MAX_ANALYSIS_JOBS} jobs kept")
+
+    @staticmethod
+    def _result_schema(cursor, subquery: str) -> List[tuple]:
+        """Return (name, type_code) of the columns sql produces without fetching any rows."""
+        cursor.execute(f"SELECT * FROM ({subquery}) AS __analyze LIMIT 0")
+        return [(desc[0], desc[1]) for desc in cursor.description or []]
+
+    # Seed of TABLESAMPLE, so repeated sampled analyses read the same tablets
+    SAMPLE_SEED = 42
+    SAMPLE_QUANTILES = (0.25, 0.5, 0.75)
+    # Progressive analysis results are kept this long for get_analysis_result
+    ANALYSIS_JOB_TTL = 3600.0
+    MAX_ANALYSIS_JOBS = 32
+    SAMPLE_HISTOGRAM_BUCKETS = 10
+
+    def _analyze_sample(self, sql: str, fraction: Optional[float], rows: Optional[int],
+                        timeout: Optional[float] = None) -> str:
+        """Compute estimated analyze_data statistics from a sample of the result.
+        
+        A plain single-table scan is sampled with TABLESAMPLE, which only reads
+        the sampled tablets; the effective fraction is measured against the
+        table's row count. Other statements are sampled by hashing result rows.
+        """
+        subquery = sql.strip().rstrip(';')
+        if fraction is None and rows is None:
+            fraction = 0.01
+        
+        with self._cursor(timeout=timeout, read=True) as cursor:
+            schema = self._result_schema(cursor, subquery)
+            if not schema:
+                return "No data to analyze."
+            
+            source, fraction, method = None, fraction, None
+            scan = simple_scan_table(subquery)
+            if scan is not None:
+                table_rows = self._table_row_count(cursor, scan[0])
+                if table_rows:
+                    target = rows if rows is not None else math.ceil(fraction * table_rows)
+                    if target >= table_rows:
+                        source, fraction, method = subquery, 1.0, "full scan (sample covers the table)"
+                    else:
+                        cursor.execute(
+                            f"SELECT COUNT(*) AS `n` FROM {scan[0]} {tablesample_clause(target, self.SAMPLE_SEED)}"
+                        )
+                        sampled = cursor.fetchone()['n']
+                        source = tablesample_sql(subquery, target, self.SAMPLE_SEED)
+                        fraction = min(1.0, sampled / table_rows) if sampled else target / table_rows
+                        method = f"TABLESAMPLE of {sampled} of ~{table_rows} table rows"
             
-            if not isinstance(result, pd.DataFrame) or result.empty:
+            if source is None:
+                if fraction is None:
+                    # A row budget needs the result size to derive the fraction
+                    cursor.execute(f"SELECT COUNT(*) AS `n` FROM ({subquery}) AS __analyze")
+                    total = cursor.fetchone()['n']
+                    fraction = min(1.0, rows / total) if total else 1.0
+                if fraction >= 1:
+                    source, method = subquery, "full scan (sample covers the result)"
+                else:
+                    source = hash_sample_sql(subquery, [name for name, _ in schema], fraction)
+                    method = "row hash sample"
+            
+            summary = self._sample_summary(cursor, source, schema)
+        
+        sample_count = summary['__rows']
+        if not sample_count:
+            return "No rows in the sample. Increase sample_fraction or sample_rows."
+        
+        row_estimate, row_margin = scaled_count(sample_count, fraction)
+        stats = []
+        stats.append(f"Sampling: {method}, fraction {fraction:.4%}, {sample_count} sampled rows")
+        stats.append(f"Rows (estimated): {format_estimate(row_estimate, row_margin)}")
+        stats.append(f"Columns: {', '.join(name for name, _ in schema)}")
+        
+        numeric = [(i, name) for i, (name, type_code) in enumerate(schema) if type_code in self.NUMERIC_FIELD_TYPES]
+        non_numeric = [(i, name) for i, (name, type_code) in enumerate(schema) if type_code not in self.NUMERIC_FIELD_TYPES]
+        
+        if numeric:
+            stats.append("\nNumeric Column Statistics (estimated):")
+            for i, name in numeric:
+                nulls = summary[f'c{i}_nulls'] or 0
+                mean = summary[f'c{i}_mean']
+                margin = mean_margin(summary[f'c{i}_std'], sample_count - nulls, fraction)
+                stats.append(f"\n{name}:")
+                stats.append(f"  Min (sample): {summary[f'c{i}_min']}")
+                stats.append(f"  Max (sample): {summary[f'c{i}_max']}")
+                stats.append(f"  Mean: {mean}" + (f" (±{margin:.6g}, 95% CI)" if margin and mean is not None else ""))
+                quantiles = ", ".join(
+                    f"p{int(q * 100)}={summary[f'c{i}_q{j}']}" for j, q in enumerate(self.SAMPLE_QUANTILES)
+                )
+                stats.append(f"  Quantiles (approximate): {quantiles}")
+                stats.append(f"  Null count: {format_estimate(*scaled_count(nulls, fraction))}")
+                buckets = parse_histogram(summary.get(f'c{i}_hist'))
+                if buckets:
+                    stats.append("  Histogram (estimated rows per bucket):")
+                    for bucket in buckets:
+                        estimate, _ = scaled_count(bucket.get('count', 0), fraction)
+                        stats.append(f"    [{bucket.get('lower')}, {bucket.get('upper')}]: {estimate:.0f}")
+        
+        if non_numeric:
+            stats.append("\nNon-numeric Column Statistics (estimated):")
+            for i, name in non_numeric:
+                top = summary[f'c{i}_top']
+                top_values = list(json.loads(top)) if top else []
+                distinct = summary[f'c{i}_distinct']
+                stats.append(f"\n{name}:")
+                if fraction >= 1:
+                    stats.append(f"  Unique values (HLL): {distinct}")
+                else:
+                    stats.append(f"  Unique values (HLL): at least {distinct} (distinct values in the sample)")
+                stats.append(f"  Most common: {', '.join(top_values) if top_values else 'N/A'}")
+                stats.append(f"  Null count: {format_estimate(*scaled_count(summary[f'c{i}_nulls'] or 0, fraction))}")
+        
+        return "\n".join(stats)
+
+    def _sample_summary(self, cursor, source: str, schema: List[tuple]) -> Dict[str, Any]:
+        """Run the sampled aggregate query, retrying without histograms if HISTOGRAM() is unsupported."""
+        def select_items(with_histogram: bool) -> List[str]:
+            items = ["COUNT(*) AS `__rows`"]
+            for i, (name, type_code) in enumerate(schema):
+                col = "`" + name.replace("`", "``") + "`"
+                items.append(f"SUM(CASE WHEN {col} IS NULL THEN 1 ELSE 0 END) AS `c{i}_nulls`")
+                if type_code in self.NUMERIC_FIELD_TYPES:
+                    items.append(f"MIN({col}) AS `c{i}_min`")
+                    items.append(f"MAX({col}) AS `c{i}_max`")
+                    items.append(f"AVG({col}) AS `c{i}_mean`")
+                    items.append(f"STDDEV_SAMP({col}) AS `c{i}_std`")
+                    for j, q in enumerate(self.SAMPLE_QUANTILES):
+                        items.append(f"PERCENTILE_APPROX(CAST({col} AS DOUBLE), {q}) AS `c{i}_q{j}`")
+                    if with_histogram:
+                        items.append(f"HISTOGRAM({col}, {self.SAMPLE_HISTOGRAM_BUCKETS}) AS `c{i}_hist`")
+                else:
+                    items.append(f"APPROX_COUNT_DISTINCT({col}) AS `c{i}_distinct`")
+                    items.append(f"TOPN(CAST({col} AS STRING), 3) AS `c{i}_top`")
+            return items
+        
+        try:
+            cursor.execute(f"SELECT {', '.join(select_items(True))} FROM ({source}) AS __analyze")
+        except pymysql.err.MySQLError as e:
+            if not is_histogram_unsupported(e):
+                raise
+            log_debug(f"HISTOGRAM() is not supported, retrying the sampled aggregate without: {str(e)}")
+            cursor.execute(f"SELECT {', '.join(select_items(False))} FROM ({source}) AS __analyze")
+        return cursor.fetchone()
+
+    def _table_row_count(self, cursor, table: str) -> Optional[int]:
+        """Approximate row count of a table from information_schema, or None if unknown."""
+        database, name = split_table_name(table)
+        cursor.execute(
+            "SELECT TABLE_ROWS FROM information_schema.tables WHERE TABLE_SCHEMA = %s AND TABLE_NAME = %s",
+            (database or self.database, name),
+        )
+        row = cursor.fetchone()
+        return int(row['TABLE_ROWS']) if row and row.get('TABLE_ROWS') else None
+
+    def _analyze_pushdown(self, sql: str, timeout: Optional[float] = None) -> str:
+        """Compute analyze_data statistics with a single aggregate query wrapped around sql."""
+        subquery = sql.strip().rstrip(';')
+        
+        with self._cursor(timeout=timeout, read=True) as cursor:
+            # Read the result schema without fetching any rows
+            schema = self._result_schema(cursor, subquery)
+            if not schema:
+                return "No data to analyze."
+            
+            select_items = ["COUNT(*) AS `__rows`"]
+            for i, (name, type_code) in enumerate(schema):
+                col = "`" + name.replace("`", "``") + "`"
+                select_items.append(f"SUM(CASE WHEN {col} IS NULL THEN 1 ELSE 0 END) AS `c{i}_nulls`")
+                if type_code in self.NUMERIC_FIELD_TYPES:
+                    select_items.append(f"MIN({col}) AS `c{i}_min`")
+                    select_items.append(f"MAX({col}) AS `c{i}_max`")
+                    select_items.append(f"AVG({col}) AS `c{i}_mean`")
+                else:
+                    select_items.append(f"APPROX_COUNT_DISTINCT({col}) AS `c{i}_distinct`")
+                    select_items.append(f"TOPN(CAST({col} AS STRING), 1) AS `c{i}_top`")
+            
+            cursor.execute(f"SELECT {', '.join(select_items)} FROM ({subquery}) AS __analyze")
+            summary = cursor.fetchone()
+        
+        total_rows = summary['__rows']
+        if not total_rows:
+            return "No data to analyze."
+        
+        # Generate basic statistics
+        stats = []
+        stats.append(f"Rows: {total_rows}")
+        stats.append(f"Columns: {', '.join(name for name, _ in schema)}")
+        
+        numeric = [(i, name) for i, (name, type_code) in enumerate(schema) if type_code in self.NUMERIC_FIELD_TYPES]
+        non_numeric = [(i, name) for i, (name, type_code) in enumerate(schema) if type_code not in self.NUMERIC_FIELD_TYPES]
+        
+        # Analyze numeric columns
+        if numeric:
+            stats.append("\nNumeric Column Statistics:")
+            for i, name in numeric:
+                stats.append(f"\n{name}:")
+                stats.append(f"  Min: {summary[f'c{i}_min']}")
+                stats.append(f"  Max: {summary[f'c{i}_max']}")
+                stats.append(f"  Mean: {summary[f'c{i}_mean']}")
+                stats.append(f"  Null count: {summary[f'c{i}_nulls']}")
+        
+        # Analyze non-numeric columns
+        if non_numeric:
+            stats.append("\nNon-numeric Column Statistics (approximate):")
+            for i, name in non_numeric:
+                # TOPN returns a JSON object of value -> count, most frequent first
+                top = summary[f'c{i}_top']
+                top_value = next(iter(json.loads(top)), 'N/A') if top else 'N/A'
+                stats.append(f"\n{name}:")
+                stats.append(f"  Unique values: {summary[f'c{i}_distinct']}")
+                stats.append(f"  Most common: {top_value}")
+                stats.append(f"  Null count: {summary[f'c{i}_nulls']}")
+        
+        return "\n".join(stats)
+
+    def _analyze_local(self, sql: str, timeout: Optional[float] = None) -> str:
+        """Compute exact analyze_data statistics by streaming the result through pandas."""
+        try:
+            # Stream the result and fold each chunk into running statistics
+            total_rows = 0
+            columns: List[str] = []
+            numeric_stats: Dict[str, Dict[str, Any]] = {}
+            value_counts: Dict[str, pd.Series] = {}
+            null_counts: Dict[str, int] = {}
+            
+            for chunk in self.iter_query(sql, timeout=timeout):
+                if not columns:
+                    columns = list(chunk.columns)
+                    for col in chunk.select_dtypes(include=['number']).columns:
+                        numeric_stats[col] = {'min': None, 'max': None, 'sum': 0.0, 'count': 0}
+                total_rows += len(chunk)
+                
+                for col in columns:
+                    values = chunk[col]
+                    null_counts[col] = null_counts.get(col, 0) + int(values.isna().sum())
+                    
+                    if col in numeric_stats:
+                        values = pd.to_numeric(values, errors='coerce').dropna()
+                        if values.empty:
+                            continue
+                        acc = numeric_stats[col]
+                        chunk_min, chunk_max = values.min(), values.max()
+                        acc['min'] = chunk_min if acc['min'] is None else min(acc['min'], chunk_min)
+                        acc['max'] = chunk_max if acc['max'] is None else max(acc['max'], chunk_max)
+                        acc['sum'] += values.sum()
+                        acc['count'] += len(values)
+                    else:
+                        counts = values.value_counts()
+                        if col in value_counts:
+                            counts = value_counts[col].add(counts, fill_value=0)
+                        value_counts[col] = counts
+            
+            if total_rows == 0:
                 return "No data to analyze."
             
             # Generate basic statistics
             stats = []
-            stats.append(f"Rows: {len(result)}")
-            stats.append(f"Columns: {', '.join(result.columns)}")
+            stats.append(f"Rows: {total_rows}")
+            stats.append(f"Columns: {', '.join(columns)}")
             
             # Analyze numeric columns
-            numeric_cols = result.select_dtypes(include=['number']).columns
-            if len(numeric_cols) > 0:
+            if numeric_stats:
                 stats.append("\nNumeric Column Statistics:")
-                for col in numeric_cols:
+                for col, acc in numeric_stats.items():
+                    mean = acc['sum'] / acc['count'] if acc['count'] else float('nan')
                     stats.append(f"\n{col}:")
-                    stats.append(f"  Min: {result[col].min()}")
-                    stats.append(f"  Max: {result[col].max()}")
-                    stats.append(f"  Mean: {result[col].mean()}")
-                    stats.append(f"  Null count: {result[col].isna().sum()}")
+                    stats.append(f"  Min: {acc['min'] if acc['min'] is not None else float('nan')}")
+                    stats.append(f"  Max: {acc['max'] if acc['max'] is not None else float('nan')}")
+                    stats.append(f"  Mean: {mean}")
+                    stats.append(f"  Null count: {null_counts[col]}")
             
             # Analyze non-numeric columns
-            non_numeric_cols = result.select_dtypes(exclude=['number']).columns
-            if len(non_numeric_cols) > 0:
+            non_numeric_cols = [col for col in columns if col not in numeric_stats]
+            if non_numeric_cols:
                 stats.append("\nNon-numeric Column Statistics:")
                 for col in non_numeric_cols:
+                    counts = value_counts.get(col, pd.Series(dtype='int64'))
                     stats.append(f"\n{col}:")
-                    stats.append(f"  Unique values: {result[col].nunique()}")
-                    top_value = result[col].value_counts().index[0] if not result[col].value_counts().empty else 'N/A'
+                    stats.append(f"  Unique values: {len(counts)}")
+                    top_value = counts.idxmax() if not counts.empty else 'N/A'
                     stats.append(f"  Most common: {top_value}")
-                    stats.append(f"  Null count: {result[col].isna().sum()}")
+                    stats.append(f"  Null count: {null_counts[col]}")
             
             return "\n".join(stats)
         except Exception as e:
-            error_msg = f"Analysis error: {str(e)}"
-            log_debug(error_msg)
-            return error_msg
+            return self._query_error(e, timeout, prefix="Analysis error")
 
     def export_to_csv(self, sql: str, file_path: str) -> str:
         """Export query results to a CSV file.
@@ -369,20 +1467,47 @@ class DorisTools(Toolkit):
         Returns:
             Status message
         """
-        try:
-            # Execute the query
-            result = self.query(sql, as_pandas=True)
+        return self.export_data(sql, file_path, file_format='csv')
+
+    def export_data(self, sql: str, file_path: str, 
+                    file_format: Optional[str] = None,
+                    partition_by: Optional[str] = None) -> str:
+        """Export query results to disk in chunks, without loading the full result into memory.
+        
+        Args:
+            sql: SQL query to execute
+            file_path: Path of the output file, or output directory when partition_by is set
+            file_format: 'csv', 'csv.gz' or 'parquet' (needs pyarrow). Inferred from the file extension if not provided.
+            partition_by: Optional column to split the output by, written Hive-style as
+                          {file_path}/{column}={value}/part-00000.{ext}
             
-            if not isinstance(result, pd.DataFrame) or result.empty:
-                return "No data to export."
+        Returns:
+            Status message with rows, bytes and throughput
+        """
+        try:
+            file_format = file_format or infer_export_format(file_path)
+            start = time.monotonic()
             
-            # Create directory if it doesn't exist
-            os.makedirs(os.path.dirname(os.path.abspath(file_path)), exist_ok=True)
+            result = write_chunks(
+                self.iter_query(sql),
+                file_path=file_path,
+                file_format=file_format,
+                partition_by=partition_by,
+            )
+            elapsed = max(time.monotonic() - start, 1e-6)
             
-            # Save to CSV
-            result.to_csv(file_path, index=False)
+            if result['rows'] == 0:
+                return "No data to export."
             
-            return f"Successfully exported {len(result)} rows to {file_path}"
+            size_mb = result['bytes'] / (1024 * 1024)
+            message = [
+                f"Successfully exported {result['rows']} rows to {file_path} ({file_format})",
+                f"Bytes written: {result['bytes']} ({size_mb:.2f} MB) in {len(result['files'])} file(s)",
+                f"Elapsed: {elapsed:.2f}s, throughput: {result['rows'] / elapsed:.0f} rows/s, {size_mb / elapsed:.2f} MB/s",
+            ]
+            if partition_by:
+                message.append(f"Partitions by '{partition_by}': {len(result['files'])}")
+            return "\n".join(message)
         except Exception as e:
             error_msg = f"Export error: {str(e)}"
             log_debug(error_msg)
@@ -398,23 +1523,15 @@ class DorisTools(Toolkit):
             Search results formatted as a string
         """
         try:
-            search_query = f"""
-            SELECT 
-                table_name as '表名',
-                CASE WHEN column_name = '' THEN '(表)' ELSE column_name END as '字段名',
-                description as '描述'
-            FROM data_dictionary
-            WHERE 
-                table_name LIKE '%{search_term}%' OR
-                column_name LIKE '%{search_term}%' OR
-                description LIKE '%{search_term}%'
-            ORDER BY table_name, column_name
-            """
-            
-            result = self.query(search_query, as_pandas=True)
-            
-            if isinstance(result, pd.DataFrame) and not result.empty:
-                return result.to_string(index=False)
+            dictionary = self._get_dictionary()
+            matches = dictionary.search(search_term) if dictionary is not None else []
+            
+            if matches:
+                result = pd.DataFrame(
+                    [(table, column or '(表)', description) for table, column, description in matches],
+                    columns=['表名', '字段名', '描述'],
+                )
+                return self._render(result)
             else:
                 return f"No matches found for '{search_term}'"
             
@@ -423,12 +1540,20 @@ class DorisTools(Toolkit):
             log_debug(error_msg)
             return error_msg
 
-    def insert_data(self, table: str, data: Union[Dict[str, Any], List[Dict[str, Any]]]) -> str:
+    def insert_data(self, table: str, data: Union[Dict[str, Any], List[Dict[str, Any]]],
+                    durable: bool = False) -> str:
         """Insert data into a table.
         
+        With write buffering enabled, small inserts are queued and written to
+        Doris in batches, within write_buffer_max_delay seconds; reads of the
+        table write them first, so they always see them (with group_commit
+        'async_mode', once Doris commits the group).
+        
         Args:
             table: Table name
             data: Dictionary or list of dictionaries with column:value pairs
+            durable: Write the rows now, after any rows buffered for the table, and
+                     return only once they are committed and visible
             
         Returns:
             Status message
@@ -436,36 +1561,148 @@ class DorisTools(Toolkit):
         if self.read_only:
             return "Cannot insert data in read-only mode."
         
-        self._ensure_connection()
-        
         try:
             # Check if data is a list or single dictionary
             if not isinstance(data, list):
                 data = [data]
             
-            cursor = self.connection.cursor()
-            insert_count = 0
-            
-            for row_data in data:
-                columns = list(row_data.keys())
-                placeholders = ', '.join(['%s'] * len(columns))
-                column_str = ', '.join([f"`{col}`" for col in columns])
-                
-                values = [row_data[col] for col in columns]
-                
-                sql = f"INSERT INTO `{table}` ({column_str}) VALUES ({placeholders})"
-                cursor.execute(sql, values)
-                insert_count += 1
+            message = []
+            if self._write_buffer is not None:
+                previous_error = self._write_buffer.take_error(table)
+                if previous_error:
+                    message.append(f"Warning: an earlier buffered insert into {table} failed, {previous_error}")
+                if not durable:
+                    pending = self._write_buffer.add(table, data)
+                    if pending:
+                        message.append(
+                            f"Buffered {len(data)} rows for {table} ({pending} pending). They are written within "
+                            f"{self._write_buffer.max_delay:g}s or before the table is read; "
+                            f"use durable=True or flush_writes to write them now."
+                        )
+                    else:
+                        message.append(f"Successfully inserted {len(data)} rows into {table}")
+                    return "\n".join(message)
+                # Rows buffered earlier go first
+                self._write_buffer.flush(table)
             
-            self.connection.commit()
-            cursor.close()
+            # Sync mode still merges concurrent writes but only returns once they are visible
+            group_commit = 'sync_mode' if durable and self.group_commit == 'async_mode' else self.group_commit
+            insert_count, group_counts = self._insert_rows(table, data, group_commit)
             
-            return f"Successfully inserted {insert_count} rows into {table}"
+            message.append(f"Successfully inserted {insert_count} rows into {table}")
+            if group_commit == 'async_mode':
+                message.append("Rows become visible once Doris commits the group (usually within seconds).")
+            if len(group_counts) > 1:
+                message.append("Rows per column group:")
+                message.extend(f"  ({column_str}): {count}" for column_str, count in group_counts)
+            return "\n".join(message)
         except Exception as e:
             error_msg = f"Insert error: {str(e)}"
             log_debug(error_msg)
             return error_msg
 
+    def _write_buffered(self, table: str, rows: List[Dict[str, Any]]) -> int:
+        """Write rows of the insert buffer; failures after the first INSERT raise PartialWriteError."""
+        started = threading.Event()
+        try:
+            return self._insert_rows(table, rows, self.group_commit, started=started)[0]
+        except Exception as e:
+            if started.is_set():
+                raise PartialWriteError(f"{str(e)} (earlier INSERTs of the batch may be committed)") from e
+            raise
+
+    def _insert_rows(self, table: str, data: List[Dict[str, Any]],
+                     group_commit: Optional[str] = None, started: Optional[threading.Event] = None) -> tuple:
+        """Insert row dicts with multi-row INSERTs.
+        
+        Doris commits every INSERT statement on its own, so a failure can leave
+        the statements before it written.
+        
+        Args:
+            table: Target table
+            data: Rows as column:value dicts
+            group_commit: Doris group commit mode for the statements
+            started: Set just before the first INSERT is sent
+        
+        Returns:
+            Number of rows inserted, and (columns, rows) per column group
+        """
+        # Group rows by column set so each group shares one INSERT template.
+        # Key order of the first row in a group decides the column order.
+        groups: Dict[frozenset, Dict[str, Any]] = {}
+        for row_data in data:
+            signature = frozenset(row_data.keys())
+            group = groups.get(signature)
+            if group is None:
+                group = groups[signature] = {'columns': list(row_data.keys()), 'rows': []}
+            group['rows'].append(tuple(to_db_value(row_data[col]) for col in group['columns']))
+        
+        insert_count = 0
+        group_counts = []
+        
+        with self._cursor() as cursor:
+            # executemany rewrites INSERT ... VALUES into multi-row statements
+            # of at most max_stmt_length bytes
+            cursor.max_stmt_length = self.insert_max_statement_bytes
+            if group_commit is not None:
+                cursor.execute(f"SET group_commit = {group_commit}")
+            try:
+                for group in groups.values():
+                    columns = group['columns']
+                    placeholders = ', '.join(['%s'] * len(columns))
+                    column_str = ', '.join([f"`{col}`" for col in columns])
+                    sql = f"INSERT INTO `{table}` ({column_str}) VALUES ({placeholders})"
+                    
+                    rows = group['rows']
+                    for i in range(0, len(rows), self.insert_max_rows_per_statement):
+                        if started is not None:
+                            started.set()
+                        cursor.executemany(sql, rows[i:i + self.insert_max_rows_per_statement])
+                    insert_count += len(rows)
+                    group_counts.append((column_str, len(rows)))
+                
+                cursor.connection.commit()
+            finally:
+                if group_commit is not None:
+                    # Pooled connections are shared with save(), whose loads must commit synchronously
+                    try:
+                        cursor.execute("SET group_commit = off_mode")
+                    except Exception as e:
+                        # Keep the INSERT's error; a connection still in group commit mode must not be reused
+                        log_debug(f"Could not reset group_commit, dropping connection: {str(e)}")
+                        if cursor.connection.open:
+                            cursor.connection.close()
+        self._invalidate_tables(table)
+        return insert_count, group_counts
+
+    def flush_writes(self) -> str:
+        """Write all rows buffered by insert_data now and wait until they are committed.
+        
+        Returns:
+            Status message
+        """
+        if self._write_buffer is None:
+            return "Write buffering is disabled; every insert is written immediately."
+        
+        written = 0
+        for table in self._write_buffer.pending_tables():
+            try:
+                written += self._write_buffer.flush(table)
+            except Exception as e:
+                log_debug(f"Buffered write to {table} failed: {str(e)}")
+        
+        message = [f"Wrote {written} buffered rows"]
+        for table, error in self._write_buffer.take_errors().items():
+            message.append(f"Error: {table}: {error}")
+        for table in self._write_buffer.pending_tables():
+            message.append(f"Error: {self._write_buffer.pending_rows(table)} rows for {table} are still pending "
+                           f"and will be retried, Doris is unreachable")
+        return "\n".join(message)
+
+    def write_buffer_stats(self) -> Dict[str, Any]:
+        """Return pending rows per table and write counters of the insert buffer, or {} if disabled."""
+        return self._write_buffer.stats() if self._write_buffer is not None else {}
+
     def update_data(self, table: str, set_values: Dict[str, Any], where_clause: str) -> str:
         """Update data in a table.
         
@@ -480,11 +1717,8 @@ class DorisTools(Toolkit):
         if self.read_only:
             return "Cannot update data in read-only mode."
         
-        self._ensure_connection()
-        
+        self._flush_buffered(table=table)
         try:
-            cursor = self.connection.cursor()
-            
             # Generate SET clause and values
             set_parts = []
             values = []
@@ -497,11 +1731,12 @@ class DorisTools(Toolkit):
             
             # Construct and execute UPDATE statement
             sql = f"UPDATE `{table}` SET {set_clause} WHERE {where_clause}"
-            cursor.execute(sql, values)
-            
-            affected_rows = cursor.rowcount
-            self.connection.commit()
-            cursor.close()
+            with self._cursor() as cursor:
+                cursor.execute(sql, values)
+                
+                affected_rows = cursor.rowcount
+                cursor.connection.commit()
+            self._invalidate_tables(table)
             
             return f"Successfully updated {affected_rows} rows in {table}"
         except Exception as e:
@@ -512,13 +1747,16 @@ class DorisTools(Toolkit):
     def execute_sql(self, sql: str) -> str:
         """Execute a SQL statement with no return value.
         
+        Session statements (SET, USE, SWITCH) are rejected: statements run on
+        pooled connections, so they would only change one of them.
+        
         Args:
             sql: SQL statement to execute
             
         Returns:
             Status message
         """
-        if self.read_only and not sql.strip().upper().startswith(('SELECT', 'SHOW', 'DESC', 'EXPLAIN')):
+        if self.read_only and not analyze_sql(sql).is_read:
             return "Cannot execute write operations in read-only mode."
         
         return self.query(sql, as_pandas=False)
@@ -527,17 +1765,46 @@ class DorisTools(Toolkit):
             if_exists: str = 'append', 
             key_columns: Optional[List[str]] = None,
             table_description: Optional[str] = None,
-            column_descriptions: Optional[Dict[str, str]] = None) -> str:
+            column_descriptions: Optional[Dict[str, str]] = None,
+            load_method: str = 'auto',
+            load_label: Optional[str] = None,
+            parallel: int = 1,
+            partition_column: Optional[str] = None,
+            partition_unit: str = 'month',
+            watermark_column: Optional[str] = None) -> str:
         """Save a pandas DataFrame to a Doris table and update the data dictionary.
         
         Args:
             table: Name of the table to save data to
             df: pandas DataFrame to save
-            if_exists: What to do if the table exists ('fail', 'append', 'replace')
+            if_exists: What to do if the table exists ('fail', 'append', 'replace', 'merge').
+                       'replace' builds and loads the new table under a staging name and
+                       swaps it in atomically, so readers see the old rows until the new
+                       ones are complete; a failed load leaves the old table untouched.
+                       'merge' upserts into a UNIQUE KEY table on key_columns (created if
+                       missing) and only ships rows that are new or changed since the last
+                       merge; rows absent from df are kept.
             key_columns: List of column names to use as the Doris table's key. 
                         If not provided, the first column will be used.
             table_description: Description of the table's purpose
             column_descriptions: Dictionary of column descriptions (column_name: description)
+            load_method: How to load the rows ('auto', 'stream_load', 'insert').
+                        'auto' uses Stream Load when http_port is configured.
+            load_label: Stream Load label for idempotent retries of the same save.
+                        Generated if not provided.
+            parallel: Number of concurrent loads. Above 1 the DataFrame is split into
+                      partitions by the table's distribution key, each partition is loaded
+                      on its own connection (or Stream Load request) into a staging table,
+                      and the staging table is published in one step, so either all rows
+                      are saved or none. INSERT loads beyond pool_max_size wait for a connection.
+            partition_column: Date or datetime column to RANGE-partition a newly created table
+                      by, or 'auto' for the first one. It is added to the key columns (a merge
+                      requires it to be one already), and time-filtered queries then only scan
+                      the matching partitions. Appends add the partitions their rows need.
+            partition_unit: Partition granularity, 'day' or 'month'
+            watermark_column: For 'merge', a timestamp or increasing column: only rows at or
+                      past its maximum from the previous merge are shipped. Without it, rows
+                      are compared by hash with the ones merged before.
         
         Returns:
             Schema information of the saved data and data dictionary update status
@@ -547,90 +1814,177 @@ class DorisTools(Toolkit):
         
         if df.empty:
             return "Cannot save empty DataFrame."
-                
-        self._ensure_connection()
         
+        if load_method not in ('auto', 'stream_load', 'insert'):
+            return f"Invalid value for load_method: {load_method}. Must be one of: 'auto', 'stream_load', 'insert'."
+        
+        if parallel < 1:
+            return f"Invalid value for parallel: {parallel}. Must be at least 1."
+        
+        if if_exists.lower() not in ('fail', 'append', 'replace', 'merge'):
+            return f"Invalid value for if_exists: {if_exists}. Must be one of: 'fail', 'append', 'replace', 'merge'."
+        merge = if_exists.lower() == 'merge'
+        
+        if watermark_column is not None and watermark_column not in df.columns:
+            return f"Error: Watermark column '{watermark_column}' does not exist in the DataFrame."
+        
+        if partition_unit not in PARTITION_UNITS:
+            return f"Invalid value for partition_unit: {partition_unit}. Must be one of: {', '.join(PARTITION_UNITS)}."
+        
+        self._flush_buffered(table=table)
         try:
-            cursor = self.connection.cursor()
-            
-            # Check if table exists
-            cursor.execute("SHOW TABLES LIKE %s", (table,))
-            table_exists = bool(cursor.fetchone())
-            
-            # Handle table existence based on if_exists parameter
-            if table_exists:
-                if if_exists.lower() == 'fail':
-                    cursor.close()
-                    return f"Table '{table}' already exists and if_exists is set to 'fail'."
-                        
-                elif if_exists.lower() == 'replace':
-                    cursor.execute(f"DROP TABLE `{table}`")
-                    table_exists = False
-                        
-                elif if_exists.lower() != 'append':
-                    cursor.close()
-                    return f"Invalid value for if_exists: {if_exists}. Must be one of: 'fail', 'append', 'replace'."
-            
-            # Create table if it doesn't exist
-            if not table_exists:
-                # Generate CREATE TABLE statement based on DataFrame schema
-                column_defs = []
-                
-                for col_name, dtype in df.dtypes.items():
-                    sql_type = self._pandas_dtype_to_sql(dtype)
-                    column_defs.append(f"`{col_name}` {sql_type}")
-                
-                columns_str = ", ".join(column_defs)
+            distribution_columns: List[str] = []
+            # Partition column appended to the key of a new table, reported in the result
+            added_key_column = None
+            # With 'replace' the new table is built under this name and swapped in at the end
+            staging = None
+            with self._cursor() as cursor:
+                # Check if table exists
+                cursor.execute("SHOW TABLES LIKE %s", (table,))
+                table_exists = bool(cursor.fetchone())
                 
-                # Determine key columns
-                if not key_columns:
-                    # Default to first column if not specified
-                    key_columns = [df.columns[0]]
-                
-                # Validate that all key columns exist in the dataframe
-                for col in key_columns:
-                    if col not in df.columns:
-                        cursor.close()
-                        return f"Error: Key column '{col}' does not exist in the DataFrame."
-                
-                # Format key columns and build table options
-                key_cols_str = ", ".join([f"`{col}`" for col in key_columns])
-                distribution_col = key_columns[0]  # Use first key column for distribution
-                
-                table_options = f"ENGINE=OLAP DUPLICATE KEY({key_cols_str}) DISTRIBUTED BY HASH(`{distribution_col}`) BUCKETS 5 PROPERTIES('replication_num' = '1')"
-                
-                create_stmt = f"CREATE TABLE `{table}` ({columns_str}) {table_options}"
-                cursor.execute(create_stmt)
-                log_info(f"Created table {table} with key columns: {key_columns}")
-            
-            # Insert data in batches
-            batch_size = 1000
-            total_rows = len(df)
-            inserted_rows = 0
-            
-            for i in range(0, total_rows, batch_size):
-                batch = df.iloc[i:i+batch_size]
+                # Handle table existence based on if_exists parameter
+                if table_exists:
+                    if if_exists.lower() == 'fail':
+                        return f"Table '{table}' already exists and if_exists is set to 'fail'."
+                            
+                    elif if_exists.lower() == 'replace':
+                        # Readers keep seeing the old table until the loaded one is swapped in
+                        staging = self._staging_name(table)
+                        table_exists = False
+                    
+                    else:
+                        if any(pd.api.types.is_string_dtype(dtype) for dtype in df.dtypes):
+                            # Dates and amounts stored as text parse into the table's column types
+                            cursor.execute(f"DESC `{table}`")
+                            df = coerce_to_types(df, {row['Field']: row['Type'] for row in cursor.fetchall()})
+                        cursor.execute(f"SHOW CREATE TABLE `{table}`")
+                        row = cursor.fetchone()
+                        existing_stmt = (row.get('Create Table') or '') if row else ''
+                        distribution_columns = self._distribution_columns(existing_stmt)
+                        if merge:
+                            key_columns = unique_key_columns(existing_stmt)
+                            if key_columns is None:
+                                return (f"Table '{table}' does not use the UNIQUE KEY model, so rows can't be "
+                                        "merged into it. Merge into a new table instead.")
+                            missing = [col for col in key_columns if col not in df.columns]
+                            if missing:
+                                return f"Error: Key columns {missing} of table '{table}' are missing from the DataFrame."
+                        self._add_missing_partitions(cursor, table, existing_stmt, df)
                 
-                if not batch.empty:
-                    # Prepare for bulk insert
-                    columns = [f"`{col}`" for col in batch.columns]
-                    columns_str = ", ".join(columns)
-                    placeholders = ", ".join(["%s"] * len(columns))
+                table_created = not table_exists
+                # Create table if it doesn't exist
+                if not table_exists:
+                    # Determine key columns
+                    if not key_columns:
+                        # Default to first column if not specified
+                        key_columns = [df.columns[0]]
+                    
+                    # Validate that all key columns exist in the dataframe
+                    for col in key_columns:
+                        if col not in df.columns:
+                            return f"Error: Key column '{col}' does not exist in the DataFrame."
+                    
+                    # Generate CREATE TABLE statement from compact types with room to grow;
+                    # the rows are loaded with dates and amounts parsed the same way
+                    schema = infer_schema(df, key_columns=key_columns)
+                    df = schema.frame
+                    
+                    partition_str = ""
+                    if partition_column is not None:
+                        column_types = dict(schema.columns)
+                        if partition_column == 'auto':
+                            partition_column = auto_partition_column(schema.columns)
+                        if partition_column is None:
+                            log_info(f"No date column to partition {table} by, creating it unpartitioned")
+                        elif column_types.get(partition_column) not in ('DATE', 'DATETIME'):
+                            return f"Error: Partition column '{partition_column}' is not a date or datetime column."
+                        else:
+                            # Doris partition columns must be key columns
+                            if partition_column not in key_columns:
+                                if merge:
+                                    # The key decides which rows a merge replaces, so it isn't changed silently
+                                    return (f"Error: Partition column '{partition_column}' must be one of the key "
+                                            f"columns {list(key_columns)} to merge, since Doris partition columns "
+                                            "are part of the UNIQUE KEY. Add it to key_columns or don't partition.")
+                                key_columns = list(key_columns) + [partition_column]
+                                added_key_column = partition_column
+                            periods = partition_periods(df[partition_column], partition_unit)
+                            partition_str = " " + partition_clause(partition_column, periods)
+                    
+                    # Key columns must be the leading columns, in key order
+                    schema.columns.sort(
+                        key=lambda column: key_columns.index(column[0]) if column[0] in key_columns else len(key_columns)
+                    )
+                    columns_str = schema.column_definitions()
                     
-                    # Construct the INSERT statement
-                    insert_stmt = f"INSERT INTO `{table}` ({columns_str}) VALUES ({placeholders})"
+                    # Format key columns and build table options
+                    key_cols_str = ", ".join([f"`{col}`" for col in key_columns])
+                    distribution_col = key_columns[0]  # Use first key column for distribution
+                    distribution_columns = [distribution_col]
                     
-                    # Prepare data for insertion
-                    values = []
-                    for _, row in batch.iterrows():
-                        row_values = [None if pd.isna(v) else v for v in row]
-                        values.append(row_values)
+                    if merge:
+                        # Loading a key again replaces its row, which makes merges upserts
+                        model = "UNIQUE"
+                        properties = "'replication_num' = '1', 'enable_unique_key_merge_on_write' = 'true'"
+                    else:
+                        model = "DUPLICATE"
+                        properties = "'replication_num' = '1'"
+                    table_options = f"ENGINE=OLAP {model} KEY({key_cols_str}){partition_str} DISTRIBUTED BY HASH(`{distribution_col}`) BUCKETS {schema.buckets} PROPERTIES({properties})"
                     
-                    # Execute batch insert
-                    cursor.executemany(insert_stmt, values)
-                    inserted_rows += len(batch)
+                    create_stmt = f"CREATE TABLE `{staging or table}` ({columns_str}) {table_options}"
+                    cursor.execute(create_stmt)
+                    self._catalog.invalidate()
+                    if staging is None:
+                        # Merge state of a dropped table would hide rows from the next merge
+                        self._clear_merge_state(cursor, table)
+                    log_info(f"Created table {staging or table} with key columns: {key_columns}, {schema.buckets} buckets")
+            
+            # Load the rows
+            use_stream_load = load_method == 'stream_load' or (load_method == 'auto' and self._stream_loader is not None)
+            if use_stream_load and self._stream_loader is None:
+                log_info("Stream Load requested but http_port is not configured. Falling back to INSERT.")
+                use_stream_load = False
             
-            self.connection.commit()
+            merge_state = None
+            total_rows = len(df)
+            if merge:
+                df, merge_state = self._merge_delta(table, df, key_columns, watermark_column)
+            
+            partition_columns = [col for col in distribution_columns if col in df.columns]
+            try:
+                if staging is not None:
+                    # The staging table is invisible to readers, so partitions load straight into it
+                    try:
+                        if df.empty:
+                            inserted_rows = 0
+                        elif parallel > 1:
+                            inserted_rows = self._load_partitions(
+                                staging, df, parallel, partition_columns, use_stream_load, load_label
+                            )
+                        else:
+                            inserted_rows = self._load_frame(staging, df, use_stream_load, load_label)
+                        self._swap_in(table, staging)
+                    except BaseException:
+                        self._drop_staging(staging)
+                        raise
+                    with self._cursor() as cursor:
+                        self._clear_merge_state(cursor, table)
+                elif df.empty:
+                    # Nothing changed since the last merge
+                    inserted_rows = 0
+                elif parallel > 1:
+                    inserted_rows = self._parallel_load(
+                        table, df, parallel, partition_columns, use_stream_load, load_label, table_created
+                    )
+                else:
+                    inserted_rows = self._load_frame(table, df, use_stream_load, load_label)
+            finally:
+                # The table was (re)created or written to, even if only partially
+                self._invalidate_tables(table)
+            
+            if merge_state is not None:
+                self._save_merge_state(merge_state, use_stream_load)
             
             # Update data dictionary
             self._update_data_dictionary(
@@ -641,11 +1995,21 @@ class DorisTools(Toolkit):
             )
             
             # Get schema information
-            cursor.execute(f"DESC `{table}`")
-            schema_info = cursor.fetchall()
+            with self._cursor() as cursor:
+                cursor.execute(f"DESC `{table}`")
+                schema_info = cursor.fetchall()
             
             # Start building output message
-            schema_output = [f"Successfully saved {inserted_rows} rows to table '{table}'"]
+            if merge:
+                schema_output = [
+                    f"Successfully merged {inserted_rows} new or changed rows of {total_rows} into table '{table}'"
+                ]
+            else:
+                schema_output = [f"Successfully saved {inserted_rows} rows to table '{table}'"]
+            if added_key_column is not None:
+                schema_output.append(
+                    f"\nPartition column '{added_key_column}' was added to the key columns: {list(key_columns)}"
+                )
             
             # Add data dictionary information if it was provided
             if table_description or column_descriptions:
@@ -656,9 +2020,8 @@ class DorisTools(Toolkit):
             # Format schema info
             if schema_info:
                 df_schema = pd.DataFrame(schema_info)
-                schema_output.append(df_schema.to_string(index=False))
+                schema_output.append(self._render(df_schema))
             
-            cursor.close()
             return "\n".join(schema_output)
                 
         except Exception as e:
@@ -666,6 +2029,240 @@ class DorisTools(Toolkit):
             log_debug(error_msg)
             return error_msg
 
+    def _merge_delta(self, table: str, df: pd.DataFrame, key_columns: List[str],
+                     watermark_column: Optional[str]) -> tuple:
+        """Select the rows of df a merge has to ship.
+        
+        Returns:
+            The delta DataFrame and the state _save_merge_state records once it is loaded
+        """
+        with self._cursor() as cursor:
+            cursor.execute(WATERMARKS_DDL)
+            cursor.execute(ROW_HASHES_DDL)
+        
+        if watermark_column is not None:
+            with self._cursor() as cursor:
+                cursor.execute(
+                    f"SELECT watermark FROM `{WATERMARKS_TABLE}` WHERE table_name = %s AND column_name = %s",
+                    (table, watermark_column),
+                )
+                row = cursor.fetchone()
+            watermark = row['watermark'] if row else None
+            delta = df[rows_since(df[watermark_column], watermark)]
+            log_info(f"Merging {len(delta)} of {len(df)} rows into {table} past watermark {watermark}")
+            return delta, ('watermark', table, watermark_column, format_watermark(df[watermark_column]))
+        
+        key_hashes, hashes = row_hashes(df, key_columns)
+        # Only the keys of this DataFrame, not every hash stored for the table
+        unique_keys = np.unique(key_hashes).tolist()
+        found = []
+        with self._cursor(Cursor) as cursor:
+            for start in range(0, len(unique_keys), HASH_LOOKUP_BATCH):
+                batch = unique_keys[start:start + HASH_LOOKUP_BATCH]
+                cursor.execute(
+                    f"SELECT key_hash, row_hash FROM `{ROW_HASHES_TABLE}` "
+                    f"WHERE table_name = %s AND key_hash IN ({', '.join(['%s'] * len(batch))})",
+                    [table] + batch,
+                )
+                found.extend(cursor.fetchall())
+        stored = np.array(found, dtype=np.int64).reshape(-1, 2)
+        mask = changed_rows(key_hashes, hashes, stored[:, 0], stored[:, 1])
+        log_info(f"Merging {int(mask.sum())} new or changed rows of {len(df)} into {table}")
+        return df[mask], ('hash', table, key_hashes[mask], hashes[mask])
+
+    def _save_merge_state(self, state: tuple, use_stream_load: bool) -> None:
+        """Record what a merge loaded, after the rows are in, so a failed load is shipped again."""
+        if state[0] == 'watermark':
+            _, table, column, watermark = state
+            if watermark is None:
+                return
+            with self._cursor() as cursor:
+                cursor.execute(
+                    f"INSERT INTO `{WATERMARKS_TABLE}` (table_name, column_name, watermark, updated_at) "
+                    "VALUES (%s, %s, %s, %s)",
+                    (table, column, watermark, time.strftime('%Y-%m-%d %H:%M:%S')),
+                )
+                cursor.connection.commit()
+        else:
+            _, table, key_hashes, hashes = state
+            frame = pd.DataFrame({'table_name': table, 'key_hash': key_hashes, 'row_hash': hashes})
+            self._load_frame(ROW_HASHES_TABLE, frame, use_stream_load)
+        self._invalidate_tables(WATERMARKS_TABLE, ROW_HASHES_TABLE)
+
+    def _clear_merge_state(self, cursor, table: str) -> None:
+        for state_table in (WATERMARKS_TABLE, ROW_HASHES_TABLE):
+            try:
+                cursor.execute(f"DELETE FROM `{state_table}` WHERE table_name = %s", (table,))
+            except Exception as e:
+                # No merge has created the state tables yet
+                log_debug(f"Could not clear {state_table} for {table}: {str(e)}")
+
+    def _load_frame(self, table: str, df: pd.DataFrame, use_stream_load: bool,
+                    load_label: Optional[str] = None) -> int:
+        """Load a DataFrame with Stream Load, finishing with INSERT from where a failed Stream Load stopped.
+        
+        Returns:
+            Number of rows loaded
+        """
+        inserted_rows = 0
+        if use_stream_load:
+            try:
+                inserted_rows = self._stream_loader.load_dataframe(
+                    table, df, label=load_label, chunk_rows=self.stream_load_chunk_rows
+                )["rows"]
+            except StreamLoadError as e:
+                inserted_rows = e.loaded_rows
+                log_info(f"Stream Load failed after {inserted_rows} rows, falling back to INSERT: {str(e)}")
+        
+        if inserted_rows < len(df):
+            inserted_rows += self._insert_batches(table, df.iloc[inserted_rows:])
+        return inserted_rows
+
+    # Suffix of the transient tables parallel save loads into; hidden from show_tables
+    STAGING_MARKER = '__staging_'
+
+    def _parallel_load(self, table: str, df: pd.DataFrame, parallel: int,
+                       partition_columns: List[str], use_stream_load: bool,
+                       load_label: Optional[str], table_created: bool) -> int:
+        """Load partitions of a DataFrame concurrently into a staging table, then publish it.
+        
+        The target only changes once every partition succeeded: a table created
+        by this save is swapped with the staging table, an existing one gets a
+        single INSERT ... SELECT.
+        
+        Returns:
+            Number of rows loaded
+        
+        Raises:
+            RuntimeError: With the error of every failed partition; the target is unchanged
+        """
+        staging = self._staging_name(table)
+        log_info(f"Loading {len(df)} rows into {table} via {staging}")
+        
+        with self._cursor() as cursor:
+            cursor.execute(f"CREATE TABLE `{staging}` LIKE `{table}`")
+        try:
+            loaded_rows = self._load_partitions(staging, df, parallel, partition_columns, use_stream_load, load_label)
+            if table_created:
+                self._swap_in(table, staging)
+                staging = None
+            else:
+                columns_str = ", ".join(f"`{col}`" for col in df.columns)
+                with self._cursor() as cursor:
+                    cursor.execute(f"INSERT INTO `{table}` ({columns_str}) SELECT {columns_str} FROM `{staging}`")
+                    cursor.connection.commit()
+            return loaded_rows
+        finally:
+            if staging is not None:
+                self._drop_staging(staging)
+
+    def _load_partitions(self, table: str, df: pd.DataFrame, parallel: int,
+                         partition_columns: List[str], use_stream_load: bool,
+                         load_label: Optional[str]) -> int:
+        """Load partitions of a DataFrame concurrently, each on its own connection or Stream Load request.
+        
+        Partitions are split by the distribution key, so rows with the same key
+        are loaded by one worker in their original order.
+        
+        Raises:
+            RuntimeError: With the error of every failed partition
+        """
+        partitions = partition_frame(df, parallel, partition_columns)
+        label = load_label or f"data_agent_{table}_{uuid.uuid4().hex}"
+        log_info(f"Loading {len(df)} rows into {table} with {len(partitions)} parallel loads")
+        with ThreadPoolExecutor(max_workers=len(partitions), thread_name_prefix="doris-save") as executor:
+            futures = [
+                executor.submit(self._load_frame, table, partition, use_stream_load, f"{label}_p{index}")
+                for index, partition in enumerate(partitions)
+            ]
+        
+        loaded_rows = 0
+        errors = []
+        for index, future in enumerate(futures):
+            try:
+                loaded_rows += future.result()
+            except Exception as e:
+                errors.append(f"partition {index} ({len(partitions[index])} rows): {str(e)}")
+        if errors:
+            raise RuntimeError(
+                f"{len(errors)} of {len(partitions)} parallel loads failed, nothing was saved: " + "; ".join(errors)
+            )
+        return loaded_rows
+
+    def _staging_name(self, table: str) -> str:
+        return f"{table}{self.STAGING_MARKER}{uuid.uuid4().hex[:8]}"
+
+    def _swap_in(self, table: str, staging: str) -> None:
+        """Atomically replace table with staging; the old table is dropped and staging's name disappears."""
+        with self._cursor() as cursor:
+            cursor.execute(f"ALTER TABLE `{table}` REPLACE WITH TABLE `{staging}` PROPERTIES('swap' = 'false')")
+            cursor.connection.commit()
+        self._catalog.invalidate()
+
+    def _drop_staging(self, staging: str) -> None:
+        try:
+            with self._cursor() as cursor:
+                cursor.execute(f"DROP TABLE IF EXISTS `{staging}` FORCE")
+        except Exception as e:
+            log_debug(f"Could not drop staging table {staging}: {str(e)}")
+
+    @staticmethod
+    def _distribution_columns(create_stmt: str) -> List[str]:
+        """Return the hash distribution columns from a table's CREATE statement, [] if it has none."""
+        match = re.search(r"DISTRIBUTED BY HASH\s*\(([^)]*)\)", create_stmt, re.IGNORECASE)
+        if not match:
+            return []
+        return [col.strip().strip('`') for col in match.group(1).split(',') if col.strip()]
+
+    @staticmethod
+    def _add_missing_partitions(cursor, table: str, create_stmt: str, df: pd.DataFrame) -> None:
+        """Add the day or month partitions rows of df need to a table partitioned by save()."""
+        column = range_partition_column(create_stmt)
+        if column is None or column not in df.columns:
+            return
+        cursor.execute(f"SHOW PARTITIONS FROM `{table}`")
+        names = [row['PartitionName'] for row in cursor.fetchall()]
+        unit = detect_partition_unit(names)
+        if unit is None:
+            # Partitioned some other way; leave its layout alone
+            return
+        for statement in add_partition_statements(table, partition_periods(df[column], unit), names):
+            cursor.execute(statement)
+            log_info(f"Added partition to {table}: {statement}")
+
+    def _insert_batches(self, table: str, df: pd.DataFrame, batch_size: int = 1000) -> int:
+        """Insert a DataFrame with batched INSERT statements over the MySQL protocol.
+        
+        Args:
+            table: Target table
+            df: DataFrame to insert
+            batch_size: Rows per executemany batch
+            
+        Returns:
+            Number of rows inserted
+        """
+        inserted_rows = 0
+        
+        # Prepare for bulk insert
+        columns = [f"`{col}`" for col in df.columns]
+        columns_str = ", ".join(columns)
+        placeholders = ", ".join(["%s"] * len(columns))
+        
+        # Construct the INSERT statement
+        insert_stmt = f"INSERT INTO `{table}` ({columns_str}) VALUES ({placeholders})"
+        
+        with self._cursor() as cursor:
+            cursor.max_stmt_length = self.insert_max_statement_bytes
+            
+            # Rows are materialized column by column, NaN/NaT already mapped to None
+            for values in iter_row_batches(df, batch_size=batch_size):
+                cursor.executemany(insert_stmt, values)
+                inserted_rows += len(values)
+            
+            cursor.connection.commit()
+        
+        return inserted_rows
+
     def _update_data_dictionary(self, table: str, df: pd.DataFrame, 
                               table_description: Optional[str] = None,
                               column_descriptions: Optional[Dict[str, str]] = None):
@@ -678,83 +2275,47 @@ class DorisTools(Toolkit):
             column_descriptions: Column descriptions
         """
         try:
-            self._ensure_connection()
-            cursor = self.connection.cursor()
             now = time.strftime('%Y-%m-%d %H:%M:%S')
             
-            # Update table description if provided
+            # Collect every description into one multi-row upsert
+            entries = []
             if table_description:
-                # Check if table description exists
-                cursor.execute(f"SELECT 1 FROM data_dictionary WHERE table_name = '{table}' AND column_name = '' LIMIT 1")
-                exists = bool(cursor.fetchone())
-                
-                if exists:
-                    # Update existing record
-                    cursor.execute(f"""
-                    UPDATE data_dictionary 
-                    SET description = %s, updated_at = '{now}'
-                    WHERE table_name = '{table}' AND column_name = ''
-                    """, (table_description,))
-                else:
-                    # Insert new record
-                    cursor.execute(f"""
-                    INSERT INTO data_dictionary (table_name, column_name, description, updated_at)
-                    VALUES (%s, '', %s, '{now}')
-                    """, (table, table_description))
-            
-            # Update column descriptions if provided
-            if column_descriptions:
-                for col_name, description in column_descriptions.items():
-                    if col_name in df.columns:  # Only add descriptions for columns that exist
-                        # Check if column description exists
-                        cursor.execute(f"SELECT 1 FROM data_dictionary WHERE table_name = '{table}' AND column_name = '{col_name}' LIMIT 1")
-                        exists = bool(cursor.fetchone())
-                        
-                        if exists:
-                            # Update existing record
-                            cursor.execute(f"""
-                            UPDATE data_dictionary 
-                            SET description = %s, updated_at = '{now}'
-                            WHERE table_name = '{table}' AND column_name = '{col_name}'
-                            """, (description,))
-                        else:
-                            # Insert new record
-                            cursor.execute(f"""
-                            INSERT INTO data_dictionary (table_name, column_name, description, updated_at)
-                            VALUES (%s, %s, %s, '{now}')
-                            """, (table, col_name, description))
+                entries.append((table, '', table_description))
+            for col_name, description in (column_descriptions or {}).items():
+                if col_name in df.columns:  # Only add descriptions for columns that exist
+                    entries.append((table, col_name, description))
             
-            self.connection.commit()
-            cursor.close()
+            if not entries:
+                return
             
+            placeholders = ", ".join(["(%s, %s, %s, %s)"] * len(entries))
+            values = [value for entry in entries for value in (*entry, now)]
+            
+            with self._cursor() as cursor:
+                cursor.execute(
+                    "INSERT INTO data_dictionary (table_name, column_name, description, updated_at) "
+                    f"VALUES {placeholders}",
+                    values,
+                )
+                cursor.connection.commit()
+            self._invalidate_tables('data_dictionary')
+            
+            # Apply the same changes to the in-memory dictionary
+            if self._dictionary.loaded:
+                for entry_table, col_name, description in entries:
+                    self._dictionary.upsert(entry_table, col_name, description)
+                
         except Exception as e:
             log_debug(f"Error updating data dictionary: {str(e)}")
     
-    def _pandas_dtype_to_sql(self, dtype) -> str:
-        """Convert pandas dtype to SQL data type."""
-        dtype_str = str(dtype).lower()
-        
-        if "int" in dtype_str:
-            return "BIGINT"
-        elif "float" in dtype_str:
-            return "DOUBLE"
-        elif "bool" in dtype_str:
-            return "BOOLEAN"
-        elif "datetime" in dtype_str:
-            return "DATETIME"
-        elif "date" in dtype_str:
-            return "DATE"
-        elif "object" in dtype_str or "category" in dtype_str:
-            return "VARCHAR(255)"
-        else:
-            # Default for unknown types
-            return "VARCHAR(255)"
-            
     def close(self) -> None:
-        """Close the database connection."""
-        if self._connection is not None:
-            self._connection.close()
-            self._connection = None
+        """Write buffered inserts, stop background analyses and FE health checks and close all pooled database connections."""
+        if self._write_buffer is not None:
+            self._write_buffer.close()
+        if self._analysis_executor is not None:
+            self._analysis_executor.shutdown(wait=False, cancel_futures=True)
+        self._result_store.clear()
+        self._router.close()
 
             
 if __name__ == "__main__":
@@ -0,0 +1,234 @@
+import atexit
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from agno.utils.log import log_debug, log_info
+
+GROUP_COMMIT_MODES = ("async_mode", "sync_mode", "off_mode")
+
+Row = Dict[str, Any]
+
+
+class PartialWriteError(Exception):
+    """A write failed after some of its rows may have been committed.
+
+    Doris commits every INSERT statement on its own, so writing these rows
+    again could duplicate the ones that made it; the buffer never retries them.
+    """
+
+
+class WriteBuffer:
+    """Coalesce small inserts per table and write them in batches.
+
+    Every Doris load is a transaction that adds a version to the tablets it
+    touches, so many single-row INSERTs cause compaction pressure and
+    eventually "too many versions" errors. Rows added here are held per table
+    and written with one call once max_rows are pending or the oldest pending
+    row is max_delay seconds old, whichever comes first. A background thread
+    handles the time threshold; flush() and close() write everything pending.
+
+    Writes of one table never overlap, so rows reach Doris in the order they
+    were added. If a write fails with a retryable error (the FE is
+    unreachable) before anything was written, the rows are put back and
+    retried with exponential backoff, up to max_retries times. A
+    PartialWriteError, any other error or running out of retries drops them,
+    and the error is kept until take_error() reports it. Pending rows are
+    written when the interpreter exits if close() wasn't called.
+    """
+
+    def __init__(
+        self,
+        write: Callable[[str, List[Row]], int],
+        max_rows: int = 1000,
+        max_delay: float = 1.0,
+        retryable: Optional[Callable[[BaseException], bool]] = None,
+        max_retries: int = 5,
+        max_backoff: float = 60.0,
+    ):
+        """Initialize the buffer.
+
+        Args:
+            write: Writes the rows to a table and returns the number written; raises
+                   PartialWriteError if it failed after writing some of them
+            max_rows: Pending rows of a table that trigger a write
+            max_delay: Seconds the oldest pending row of a table may wait
+            retryable: Whether a write error is transient; those rows are retried
+            max_retries: Failed writes of a table retried before its rows are dropped
+            max_backoff: Upper bound in seconds of the delay between retries
+        """
+        if max_rows < 1:
+            raise ValueError(f"max_rows must be at least 1, got {max_rows}")
+        self._write = write
+        self.max_rows = max_rows
+        self.max_delay = max_delay
+        self.max_retries = max_retries
+        self.max_backoff = max_backoff
+        self._retryable = retryable or (lambda error: False)
+        self._pending: Dict[str, List[Row]] = {}
+        # Monotonic time the pending rows of a table are written by the background thread
+        self._due: Dict[str, float] = {}
+        # Consecutive failed writes per table
+        self._failures: Dict[str, int] = {}
+        self._errors: Dict[str, str] = {}
+        self._write_locks: Dict[str, threading.Lock] = {}
+        self._cond = threading.Condition()
+        self._closed = False
+        self._flusher: Optional[threading.Thread] = None
+        self._stats = {"added_rows": 0, "writes": 0, "written_rows": 0, "retries": 0, "dropped_rows": 0}
+        atexit.register(self.close)
+
+    def add(self, table: str, rows: List[Row]) -> int:
+        """Buffer rows for a table, writing them right away if max_rows are reached.
+
+        Returns:
+            Rows of the table still pending afterwards
+
+        Raises:
+            Exception: The write error, if reaching max_rows triggered a write that failed
+        """
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Write buffer is closed")
+            pending = self._pending.setdefault(table, [])
+            pending.extend(rows)
+            self._due.setdefault(table, time.monotonic() + self.max_delay)
+            self._stats["added_rows"] += len(rows)
+            full = len(pending) >= self.max_rows
+            self._start_flusher()
+            self._cond.notify()
+        if full:
+            self.flush(table)
+        return self.pending_rows(table)
+
+    def pending_rows(self, table: Optional[str] = None) -> int:
+        """Rows waiting to be written, for one table or in total."""
+        with self._cond:
+            if table is not None:
+                return len(self._pending.get(table, ()))
+            return sum(len(rows) for rows in self._pending.values())
+
+    def pending_tables(self) -> List[str]:
+        with self._cond:
+            return list(self._pending)
+
+    def flush(self, table: Optional[str] = None) -> int:
+        """Write the pending rows of one table, or of all tables, now.
+
+        Returns:
+            Number of rows written
+
+        Raises:
+            Exception: The first write error; other tables are still written
+        """
+        tables = [table] if table is not None else self.pending_tables()
+        written = 0
+        first_error: Optional[BaseException] = None
+        for name in tables:
+            try:
+                written += self._flush_table(name)
+            except Exception as e:
+                if first_error is None:
+                    first_error = e
+        if first_error is not None:
+            raise first_error
+        return written
+
+    def _flush_table(self, table: str) -> int:
+        with self._cond:
+            lock = self._write_locks.setdefault(table, threading.Lock())
+        with lock:
+            with self._cond:
+                rows = self._pending.pop(table, None)
+                self._due.pop(table, None)
+            if not rows:
+                return 0
+            try:
+                written = self._write(table, rows)
+            except Exception as e:
+                with self._cond:
+                    failures = self._failures.get(table, 0) + 1
+                    if (self._retryable(e) and not isinstance(e, PartialWriteError)
+                            and failures <= self.max_retries and not self._closed):
+                        # Ahead of rows added meanwhile, to keep their order
+                        self._pending[table] = rows + self._pending.get(table, [])
+                        self._failures[table] = failures
+                        self._due[table] = time.monotonic() + min(self.max_delay * 2 ** (failures - 1), self.max_backoff)
+                        self._stats["retries"] += 1
+                        self._cond.notify()
+                    else:
+                        self._failures.pop(table, None)
+                        self._stats["dropped_rows"] += len(rows)
+                        if isinstance(e, PartialWriteError):
+                            self._errors[table] = f"{len(rows)} buffered rows were not all written: {str(e)}"
+                        else:
+                            self._errors[table] = f"{len(rows)} buffered rows were not written: {str(e)}"
+                raise
+            with self._cond:
+                self._stats["writes"] += 1
+                self._stats["written_rows"] += written
+                self._failures.pop(table, None)
+                self._errors.pop(table, None)
+            return written
+
+    def take_error(self, table: str) -> Optional[str]:
+        """Return and forget the error of the last failed write of a table, if any."""
+        with self._cond:
+            return self._errors.pop(table, None)
+
+    def take_errors(self) -> Dict[str, str]:
+        """Return and forget the errors of the last failed write of every table."""
+        with self._cond:
+            errors, self._errors = self._errors, {}
+            return errors
+
+    def _start_flusher(self) -> None:
+        # Called with the condition held
+        if self._flusher is None or not self._flusher.is_alive():
+            self._flusher = threading.Thread(target=self._flush_loop, name="doris-write-buffer", daemon=True)
+            self._flusher.start()
+
+    def _flush_loop(self) -> None:
+        while True:
+            with self._cond:
+                while not self._closed:
+                    now = time.monotonic()
+                    due = [table for table, due_at in self._due.items() if due_at <= now]
+                    if due:
+                        break
+                    next_due = min(self._due.values(), default=None)
+                    self._cond.wait(None if next_due is None else next_due - now)
+                if self._closed:
+                    return
+            for table in due:
+                try:
+                    self._flush_table(table)
+                except Exception as e:
+                    log_debug(f"Buffered write to {table} failed: {str(e)}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Return pending rows per table and write counters."""
+        with self._cond:
+            return dict(
+                self._stats,
+                pending={table: len(rows) for table, rows in self._pending.items()},
+                max_rows=self.max_rows,
+                max_delay=self.max_delay,
+            )
+
+    def close(self) -> None:
+        """Stop the background thread and write everything still pending."""
+        atexit.unregister(self.close)
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+            flusher = self._flusher
+        if flusher is not None and flusher is not threading.current_thread():
+            flusher.join()
+        pending = self.pending_rows()
+        if pending:
+            log_info(f"Writing {pending} buffered rows before closing")
+        try:
+            self.flush()
+        except Exception as e:
+            log_debug(f"Buffered rows lost on close: {str(e)}")
@@ -0,0 +1,184 @@
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, FrozenSet, Iterable, Optional, Tuple
+
+from src.tools.doris_sql import analyze_sql
+
+# Reads of these describe the catalog, which DDL changes without naming a
+# table the cache could invalidate
+METADATA_SCHEMAS = frozenset(("information_schema", "mysql", "__internal_schema"))
+
+
+def is_cacheable(sql: str, database: str) -> bool:
+    """Whether a read's result may be cached: a deterministic SELECT over user tables only.
+
+    SHOW, DESC and information_schema reads are never cached, nor SELECTs
+    without a table, whose results invalidation could never drop.
+    """
+    info = analyze_sql(sql)
+    if not (info.is_query and info.deterministic):
+        return False
+    tables = info.qualified_tables(database)
+    return bool(tables) and not any(table.split(".", 1)[0] in METADATA_SCHEMAS for table in tables)
+
+
+def estimate_size(rows: Any) -> int:
+    """Roughly estimate the memory held by fetched rows.
+
+    Only the first rows are measured and the result is extrapolated, which
+    keeps the cost independent of the result size.
+    """
+    if hasattr(rows, "memory_usage"):
+        # Columnar results are DataFrames, which know their own size
+        return int(rows.memory_usage(deep=True).sum())
+    if not rows:
+        return sys.getsizeof(rows)
+    sample = rows[:100]
+    sample_size = 0
+    for row in sample:
+        values = row.values() if isinstance(row, dict) else row
+        sample_size += sys.getsizeof(row) + sum(sys.getsizeof(value) for value in values)
+    return sys.getsizeof(rows) + sample_size * len(rows) // len(sample)
+
+
+class _Entry:
+    __slots__ = ("value", "size", "tables", "expires_at")
+
+    def __init__(self, value: Any, size: int, tables: FrozenSet[str], expires_at: float):
+        self.value = value
+        self.size = size
+        self.tables = tables
+        self.expires_at = expires_at
+
+
+class QueryResultCache:
+    """A thread-safe LRU cache of query results bounded by bytes and TTL.
+
+    Each entry remembers the tables its statement read, so writes to a table
+    can drop exactly the entries that depend on it.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, ttl: float = 300.0):
+        """Initialize the cache.
+
+        Args:
+            max_bytes: Upper bound on the estimated size of all cached results
+            ttl: Seconds an entry stays valid
+        """
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries: "OrderedDict[Tuple[str, str], _Entry]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        # Bumped on every invalidation so a read that started before a write
+        # cannot store its (possibly stale) result afterwards.
+        self._generation = 0
+
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._invalidations = 0
+
+    @staticmethod
+    def key(database: str, sql: str) -> Tuple[str, str]:
+        return (database, analyze_sql(sql).normalized)
+
+    def get(self, database: str, sql: str) -> Optional[Any]:
+        """Return the cached result or None on a miss."""
+        key = self.key(database, sql)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            if entry.expires_at <= time.monotonic():
+                self._remove(key)
+                self._expirations += 1
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry.value
+
+    @property
+    def generation(self) -> int:
+        """Invalidation counter to capture before executing a read."""
+        return self._generation
+
+    def put(
+        self,
+        database: str,
+        sql: str,
+        value: Any,
+        tables: Optional[Iterable[str]] = None,
+        generation: Optional[int] = None,
+    ) -> None:
+        """Cache a result. Results larger than max_bytes are not cached.
+
+        Args:
+            database: Database the statement ran against
+            sql: Statement text
+            value: Fetched rows
+            tables: Tables the statement read; extracted from sql if omitted
+            generation: Value of ``generation`` captured before the read ran;
+                the result is dropped if an invalidation happened since
+        """
+        size = estimate_size(value)
+        if size > self.max_bytes:
+            return
+        key = self.key(database, sql)
+        tables = frozenset(tables) if tables is not None else analyze_sql(sql).qualified_tables(database)
+        entry = _Entry(value, size, tables, time.monotonic() + self.ttl)
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = entry
+            self._bytes += size
+            while self._bytes > self.max_bytes and self._entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self._evictions += 1
+
+    def invalidate_tables(self, tables: Iterable[str]) -> int:
+        """Drop every entry that read one of ``tables`` (lowercase 'db.table')."""
+        tables = {table.lower() for table in tables}
+        with self._lock:
+            self._generation += 1
+            stale = [key for key, entry in self._entries.items() if entry.tables & tables]
+            for key in stale:
+                self._remove(key)
+            self._invalidations += len(stale)
+        return len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._invalidations += len(self._entries)
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss/eviction counters and current usage."""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": self._hits / lookups if lookups else 0.0,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+                "invalidations": self._invalidations,
+            }
+
+    def _remove(self, key: Tuple[str, str]) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+
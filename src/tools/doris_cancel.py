@@ -0,0 +1,111 @@
+import re
+import threading
+from typing import Callable, List, Optional
+
+import pymysql
+
+# Doris/MySQL error numbers of an interrupted or timed-out query
+ER_QUERY_INTERRUPTED = 1317
+ER_QUERY_TIMEOUT = 3024
+
+# Server messages of a statement that hit query_timeout, e.g. "Query timeout",
+# "query exceeded timeout", "Timeout by txn manager". A bare "timeout" also
+# appears in client errors (connect timeout, pool checkout) that say nothing
+# about the query itself.
+_TIMEOUT_RE = re.compile(
+    r"\bquery\b[\w\s]*?\btime ?out|\btime ?out\b[\w\s]*?\bquery\b|query_timeout"
+    r"|exceeded (?:the )?time limit|timeout by txn manager",
+    re.IGNORECASE,
+)
+_MEMORY_MARKERS = ("mem_limit_exceeded", "memory exceed", "exceed limit", "memory limit", "exec_mem_limit")
+_CANCEL_MARKERS = ("cancelled", "canceled", "interrupted", "killed")
+
+
+class CancelToken:
+    """Handle a caller keeps to cancel a running query from another thread.
+
+    DorisTools registers a callback that issues ``KILL QUERY`` for the
+    connection executing the statement; ``cancel()`` runs it. Cancelling
+    before the query starts makes it get killed as soon as it registers.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._cancelled = False
+        self._callbacks: List[Callable[[], None]] = []
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled
+
+    def cancel(self) -> None:
+        with self._lock:
+            if self._cancelled:
+                return
+            self._cancelled = True
+            callbacks = list(self._callbacks)
+        for callback in callbacks:
+            callback()
+
+    def register(self, callback: Callable[[], None]) -> Callable[[], None]:
+        """Register a cancel callback and return a function that unregisters it."""
+        with self._lock:
+            cancelled = self._cancelled
+            if not cancelled:
+                self._callbacks.append(callback)
+        if cancelled:
+            callback()
+
+        def unregister() -> None:
+            with self._lock:
+                if callback in self._callbacks:
+                    self._callbacks.remove(callback)
+
+        return unregister
+
+
+def classify_error(error: BaseException) -> Optional[str]:
+    """Return 'timeout', 'memory_limit' or 'cancelled' for resource-limit errors, else None.
+
+    Only errors reported by Doris count: client-side errors (CR_* codes
+    2000-2999 such as a connect timeout, pool timeouts, socket errors) are
+    about reaching the FE, not about the query.
+    """
+    if not isinstance(error, pymysql.err.MySQLError):
+        return None
+    errno = error.args[0] if error.args and isinstance(error.args[0], int) else None
+    if errno is not None and 2000 <= errno < 3000:
+        return None
+    message = str(error).lower()
+    if any(marker in message for marker in _MEMORY_MARKERS):
+        return "memory_limit"
+    if errno == ER_QUERY_TIMEOUT or _TIMEOUT_RE.search(message):
+        return "timeout"
+    if errno == ER_QUERY_INTERRUPTED or any(marker in message for marker in _CANCEL_MARKERS):
+        return "cancelled"
+    return None
+
+
+def format_limit_error(kind: str, timeout: Optional[float] = None, detail: str = "") -> str:
+    """Agent-facing message for a query stopped by a timeout, memory limit or cancel.
+
+    The message starts with ``Query error (<kind>)`` so the agent can tell the
+    cases apart, and says what to change before retrying.
+    """
+    if kind == "timeout":
+        limit = f" the {timeout:g}s limit" if timeout else " its time limit"
+        message = (
+            f"Query error (timeout): the query exceeded{limit} and was stopped. "
+            "Add a LIMIT, filter on partition or date columns, aggregate inside Doris instead of "
+            "fetching raw rows, or use analyze_data(mode='sample') on large tables."
+        )
+    elif kind == "memory_limit":
+        message = (
+            "Query error (memory_limit): the query exceeded exec_mem_limit. "
+            "Select fewer columns, add filters or a LIMIT, or aggregate before fetching."
+        )
+    else:
+        message = "Query error (cancelled): the query was cancelled by the caller."
+    if detail:
+        message += f" Details: {detail}"
+    return message
@@ -0,0 +1,104 @@
+from typing import Any, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from pymysql.constants import FIELD_TYPE
+
+INTEGER_TYPES = {FIELD_TYPE.TINY, FIELD_TYPE.SHORT, FIELD_TYPE.LONG, FIELD_TYPE.LONGLONG, FIELD_TYPE.INT24}
+FLOAT_TYPES = {FIELD_TYPE.FLOAT, FIELD_TYPE.DOUBLE}
+DATETIME_TYPES = {FIELD_TYPE.DATETIME, FIELD_TYPE.TIMESTAMP}
+STRING_TYPES = {
+    FIELD_TYPE.VARCHAR, FIELD_TYPE.VAR_STRING, FIELD_TYPE.STRING, FIELD_TYPE.ENUM,
+    FIELD_TYPE.BLOB, FIELD_TYPE.TINY_BLOB, FIELD_TYPE.MEDIUM_BLOB, FIELD_TYPE.LONG_BLOB,
+}
+
+# Columns shorter than this are never dictionary-encoded; the categories
+# would cost more than they save.
+CATEGORICAL_MIN_ROWS = 64
+
+
+def _arrow_string_dtype():
+    try:
+        import pyarrow as pa
+    except ImportError:
+        return None
+    return pd.ArrowDtype(pa.string())
+
+
+def _object_array(values: Tuple[Any, ...]) -> np.ndarray:
+    array = np.empty(len(values), dtype=object)
+    array[:] = values
+    return array
+
+
+def build_column(values: Tuple[Any, ...], type_code: int, categorical_max_ratio: Optional[float] = 0.5):
+    """Build one DataFrame column from the values of a result column.
+
+    The MySQL protocol type decides the representation instead of pandas
+    inferring it value by value:
+
+    - integers: int64, or nullable Int64 when NULLs are present
+    - floats: float64 with NaN for NULL
+    - DATETIME: datetime64[us] with NaT for NULL
+    - strings: categorical when at most ``categorical_max_ratio`` of the
+      values are distinct, otherwise Arrow-backed strings (object without pyarrow)
+    - everything else (DECIMAL, DATE, ...): object, as returned by PyMySQL
+    """
+    if type_code in INTEGER_TYPES:
+        if None in values:
+            return pd.array(values, dtype="Int64")
+        return np.array(values, dtype=np.int64)
+    if type_code in FLOAT_TYPES:
+        return np.array(values, dtype=np.float64)
+    if type_code in DATETIME_TYPES:
+        try:
+            return pd.array(values, dtype="datetime64[us]")
+        except (TypeError, ValueError, OverflowError):
+            return _object_array(values)
+    first = next((value for value in values if value is not None), None)
+    if type_code in STRING_TYPES and not isinstance(first, bytes):
+        if categorical_max_ratio is not None and len(values) >= CATEGORICAL_MIN_ROWS:
+            distinct = set(values)
+            distinct.discard(None)
+            if len(distinct) <= categorical_max_ratio * len(values):
+                return pd.Categorical(values, categories=sorted(distinct))
+        string_dtype = _arrow_string_dtype()
+        if string_dtype is not None:
+            return pd.array(values, dtype=string_dtype)
+    return _object_array(values)
+
+
+def rows_to_frame(
+    rows: Sequence[Tuple[Any, ...]],
+    description: Sequence[Tuple[Any, ...]],
+    categorical_max_ratio: Optional[float] = 0.5,
+) -> pd.DataFrame:
+    """Build a DataFrame column by column from tuple rows and cursor metadata.
+
+    Compared with ``pd.DataFrame(dict_rows)`` this skips the per-row dicts of
+    DictCursor and per-value type inference, and stores low-cardinality
+    strings dictionary-encoded.
+
+    Args:
+        rows: Tuples as returned by a plain (non-dict) cursor
+        description: ``cursor.description`` of the statement
+        categorical_max_ratio: Distinct/total ratio below which string columns
+            become categorical; None disables categoricals
+
+    Returns:
+        DataFrame with one column per description entry
+    """
+    names = [desc[0] for desc in description]
+    if not rows:
+        return pd.DataFrame({name: pd.Series(dtype=object) for name in names}, columns=names)
+
+    columns = [
+        build_column(values, desc[1], categorical_max_ratio)
+        for desc, values in zip(description, zip(*rows))
+    ]
+    if len(set(names)) == len(names):
+        return pd.DataFrame(dict(zip(names, columns)), columns=names, copy=False)
+    # Duplicate column names (e.g. SELECT a.id, b.id) are kept positionally
+    frame = pd.concat([pd.Series(column) for column in columns], axis=1)
+    frame.columns = names
+    return frame
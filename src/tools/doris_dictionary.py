@@ -0,0 +1,128 @@
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+
+def _bigrams(text: str) -> Set[str]:
+    return {text[i:i + 2] for i in range(len(text) - 1)}
+
+
+class _TableEntry:
+    __slots__ = ("description", "columns")
+
+    def __init__(self):
+        self.description: Optional[str] = None
+        self.columns: Dict[str, str] = {}
+
+
+class DataDictionaryIndex:
+    """In-process copy of the ``data_dictionary`` table.
+
+    Entries are grouped by table with per-column descriptions. Searching uses
+    an inverted index from character bigrams to entries, which supports the
+    substring semantics of the old ``LIKE '%term%'`` queries for Latin and CJK
+    text alike: candidates sharing every bigram of the term are verified with a
+    plain substring check.
+    """
+
+    def __init__(self):
+        self._tables: Dict[str, _TableEntry] = {}
+        # Postings map a bigram to (table, column) keys; '' is the table row.
+        self._postings: Dict[str, Set[Tuple[str, str]]] = {}
+        self._texts: Dict[Tuple[str, str], str] = {}
+        self._lock = threading.RLock()
+        self.loaded_at: Optional[float] = None
+
+    @property
+    def loaded(self) -> bool:
+        return self.loaded_at is not None
+
+    def is_stale(self, refresh_interval: Optional[float]) -> bool:
+        """Whether the index should be reloaded from the database."""
+        if self.loaded_at is None:
+            return True
+        if not refresh_interval:
+            return False
+        return time.monotonic() - self.loaded_at > refresh_interval
+
+    def load(self, rows: Iterable[Tuple[str, str, Optional[str]]]) -> None:
+        """Replace the index with (table_name, column_name, description) rows."""
+        with self._lock:
+            self._tables = {}
+            self._postings = {}
+            self._texts = {}
+            for table, column, description in rows:
+                self._set(table, column or "", description)
+            self.loaded_at = time.monotonic()
+
+    def upsert(self, table: str, column: str, description: Optional[str]) -> None:
+        """Apply a single dictionary write; column '' is the table description."""
+        with self._lock:
+            self._set(table, column or "", description)
+
+    def tables(self) -> List[Tuple[str, Optional[str]]]:
+        """Return (table, description) for tables that have a table description."""
+        with self._lock:
+            return sorted(
+                (table, entry.description)
+                for table, entry in self._tables.items()
+                if entry.description is not None
+            )
+
+    def table_description(self, table: str) -> Optional[str]:
+        with self._lock:
+            entry = self._tables.get(table)
+            return entry.description if entry else None
+
+    def column_descriptions(self, table: str) -> Dict[str, str]:
+        with self._lock:
+            entry = self._tables.get(table)
+            return dict(entry.columns) if entry else {}
+
+    def search(self, term: str) -> List[Tuple[str, str, Optional[str]]]:
+        """Case-insensitive substring search over table names, column names and descriptions.
+
+        Returns:
+            (table, column, description) sorted by table and column; column is '' for table rows
+        """
+        needle = term.lower()
+        with self._lock:
+            if len(needle) >= 2:
+                grams = sorted(_bigrams(needle), key=lambda gram: len(self._postings.get(gram, ())))
+                candidates = set(self._postings.get(grams[0], ()))
+                for gram in grams[1:]:
+                    if not candidates:
+                        break
+                    candidates &= self._postings.get(gram, set())
+            else:
+                candidates = set(self._texts)
+
+            results = []
+            for key in candidates:
+                if needle in self._texts[key]:
+                    table, column = key
+                    entry = self._tables[table]
+                    description = entry.description if column == "" else entry.columns.get(column)
+                    results.append((table, column, description))
+        return sorted(results, key=lambda item: (item[0], item[1]))
+
+    def _set(self, table: str, column: str, description: Optional[str]) -> None:
+        entry = self._tables.setdefault(table, _TableEntry())
+        if column == "":
+            entry.description = description
+        else:
+            entry.columns[column] = description
+
+        key = (table, column)
+        old_text = self._texts.get(key)
+        if old_text is not None:
+            for gram in _bigrams(old_text):
+                postings = self._postings.get(gram)
+                if postings is not None:
+                    postings.discard(key)
+
+        # The \x00 separators keep bigrams from spanning two fields.
+        text = "\x00".join([table, column, description or ""]).lower()
+        self._texts[key] = text
+        for gram in _bigrams(text):
+            self._postings.setdefault(gram, set()).add(key)
@@ -0,0 +1,245 @@
+import gzip
+import os
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Sequence
+from urllib.parse import quote
+
+import pandas as pd
+from pymysql.constants import FIELD_TYPE
+
+from src.tools.doris_columnar import DATETIME_TYPES, FLOAT_TYPES, INTEGER_TYPES
+
+HIVE_DEFAULT_PARTITION = "__HIVE_DEFAULT_PARTITION__"
+
+EXPORT_FORMATS = ("csv", "csv.gz", "parquet")
+
+MAX_DECIMAL_PRECISION = 38
+
+# Partitions written to at the same time; the least recently used one is
+# closed beyond this, and continues in a new part file if it gets more rows.
+MAX_OPEN_PARTITIONS = 64
+
+
+def infer_export_format(file_path: str) -> str:
+    """Guess the export format from a file extension, defaulting to CSV."""
+    path = file_path.lower()
+    if path.endswith((".csv.gz", ".gz")):
+        return "csv.gz"
+    if path.endswith((".parquet", ".pq")):
+        return "parquet"
+    return "csv"
+
+
+class _ChunkWriter(ABC):
+    """Append DataFrame chunks to a single output file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    @abstractmethod
+    def write(self, chunk: pd.DataFrame, description: Optional[Sequence[tuple]] = None) -> None:
+        """Append a chunk; description is the cursor metadata of the result, if known."""
+
+    @abstractmethod
+    def close(self) -> None:
+        """Flush and close the file."""
+
+
+class _CsvWriter(_ChunkWriter):
+    def __init__(self, path: str, compress: bool = False):
+        super().__init__(path)
+        if compress:
+            self._file = gzip.open(path, "wt", newline="", encoding="utf-8")
+        else:
+            self._file = open(path, "w", newline="", encoding="utf-8")
+        self._header = True
+
+    def write(self, chunk: pd.DataFrame, description: Optional[Sequence[tuple]] = None) -> None:
+        chunk.to_csv(self._file, index=False, header=self._header)
+        self._header = False
+
+    def close(self) -> None:
+        self._file.close()
+
+
+def arrow_type(type_code: int, scale: Optional[int], pa):
+    """Arrow type of a result column from its MySQL protocol type, None if it has to be inferred."""
+    if type_code in INTEGER_TYPES:
+        return pa.int64()
+    if type_code in FLOAT_TYPES:
+        return pa.float64()
+    if type_code in DATETIME_TYPES:
+        return pa.timestamp("us")
+    if type_code in (FIELD_TYPE.DATE, FIELD_TYPE.NEWDATE):
+        return pa.date32()
+    if type_code in (FIELD_TYPE.DECIMAL, FIELD_TYPE.NEWDECIMAL):
+        return pa.decimal128(MAX_DECIMAL_PRECISION, scale or 0)
+    if type_code in (FIELD_TYPE.VARCHAR, FIELD_TYPE.VAR_STRING, FIELD_TYPE.STRING, FIELD_TYPE.JSON):
+        return pa.string()
+    return None
+
+
+def import_pyarrow():
+    """Import pyarrow and pyarrow.parquet, which only the Parquet format needs."""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError(
+            "Parquet export needs `pyarrow`, which is not installed. Install it using `pip install pyarrow`, "
+            "or export as 'csv' or 'csv.gz'."
+        )
+    return pa, pq
+
+
+class _ParquetWriter(_ChunkWriter):
+    """Write each chunk as one Parquet row group.
+
+    The file schema is fixed by the first chunk, so it is taken from the
+    cursor metadata where possible: a later chunk may hold longer decimals, or
+    values in a column that was all NULL so far. Without metadata, decimals
+    are widened to the maximum precision and all-NULL columns become strings.
+    """
+
+    def __init__(self, path: str):
+        super().__init__(path)
+        self._pa, self._pq = import_pyarrow()
+        self._writer = None
+        self._schema = None
+
+    def _build_schema(self, table, description: Optional[Sequence[tuple]]):
+        pa = self._pa
+        declared = {}
+        for desc in description or ():
+            declared[desc[0]] = arrow_type(desc[1], desc[5], pa)
+        fields = []
+        for field in table.schema:
+            arrow = declared.get(field.name)
+            if arrow is None:
+                if pa.types.is_decimal(field.type):
+                    arrow = pa.decimal128(MAX_DECIMAL_PRECISION, field.type.scale)
+                elif pa.types.is_null(field.type):
+                    arrow = pa.string()
+                else:
+                    arrow = field.type
+            fields.append(pa.field(field.name, arrow))
+        return pa.schema(fields)
+
+    def write(self, chunk: pd.DataFrame, description: Optional[Sequence[tuple]] = None) -> None:
+        table = self._pa.Table.from_pandas(chunk, preserve_index=False)
+        if self._writer is None:
+            self._schema = self._build_schema(table, description)
+            self._writer = self._pq.ParquetWriter(self.path, self._schema, compression="snappy")
+        self._writer.write_table(table.cast(self._schema))
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+
+
+def _open_writer(path: str, file_format: str) -> _ChunkWriter:
+    if file_format == "parquet":
+        return _ParquetWriter(path)
+    return _CsvWriter(path, compress=file_format == "csv.gz")
+
+
+def _partition_dir(column: str, value) -> str:
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        text = HIVE_DEFAULT_PARTITION
+    else:
+        text = quote(str(value), safe="")
+    return f"{quote(str(column), safe='')}={text}"
+
+
+def write_chunks(
+    chunks: Iterable[pd.DataFrame],
+    file_path: str,
+    file_format: str,
+    partition_by: Optional[str] = None,
+    max_open_partitions: int = MAX_OPEN_PARTITIONS,
+) -> Dict[str, object]:
+    """Stream DataFrame chunks to disk.
+
+    Without ``partition_by`` everything goes to ``file_path``. With it,
+    ``file_path`` is treated as a directory and rows are split Hive-style into
+    ``{file_path}/{column}={value}/part-00000.{ext}``; the partition column is
+    encoded in the path and dropped from the data files. At most
+    ``max_open_partitions`` files are open at once: a partition whose writer
+    was closed continues in ``part-00001.{ext}`` and so on.
+
+    Chunks may carry the cursor metadata of the result in
+    ``chunk.attrs['description']``, which fixes the Parquet column types.
+
+    Args:
+        chunks: DataFrame chunks, e.g. from DorisTools.iter_query
+        file_path: Output file, or output directory when partitioning
+        file_format: One of EXPORT_FORMATS
+        partition_by: Optional column to partition by
+        max_open_partitions: Open file limit when partitioning
+
+    Returns:
+        Dictionary with rows, bytes, chunks and the list of files written
+    """
+    if file_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {file_format}. Must be one of: {', '.join(EXPORT_FORMATS)}.")
+    if max_open_partitions < 1:
+        raise ValueError(f"max_open_partitions must be at least 1, got {max_open_partitions}")
+    if file_format == "parquet":
+        # Fail before the query runs, not on its first chunk
+        import_pyarrow()
+
+    extension = {"csv": "csv", "csv.gz": "csv.gz", "parquet": "parquet"}[file_format]
+    # Open writers by partition directory, least recently used first
+    writers: "OrderedDict[str, _ChunkWriter]" = OrderedDict()
+    parts_written: Dict[str, int] = {}
+    files: List[str] = []
+    rows = 0
+    chunk_count = 0
+
+    def writer_for(directory: str) -> _ChunkWriter:
+        writer = writers.get(directory)
+        if writer is not None:
+            writers.move_to_end(directory)
+            return writer
+        if len(writers) >= max_open_partitions:
+            _, oldest = writers.popitem(last=False)
+            oldest.close()
+        part = parts_written.get(directory, 0)
+        parts_written[directory] = part + 1
+        path = os.path.join(directory, f"part-{part:05d}.{extension}")
+        writer = writers[directory] = _open_writer(path, file_format)
+        files.append(path)
+        return writer
+
+    try:
+        for chunk in chunks:
+            if chunk.empty:
+                continue
+            chunk_count += 1
+            rows += len(chunk)
+            description = chunk.attrs.get("description")
+
+            if partition_by is None:
+                if file_path not in writers:
+                    writers[file_path] = _open_writer(file_path, file_format)
+                    files.append(file_path)
+                writers[file_path].write(chunk, description)
+                continue
+
+            if partition_by not in chunk.columns:
+                raise ValueError(f"Partition column '{partition_by}' is not in the query result.")
+            for value, part in chunk.groupby(partition_by, dropna=False, sort=False):
+                directory = os.path.join(file_path, _partition_dir(partition_by, value))
+                writer_for(directory).write(part.drop(columns=[partition_by]), description)
+    finally:
+        for writer in writers.values():
+            writer.close()
+
+    return {
+        "rows": rows,
+        "bytes": sum(os.path.getsize(path) for path in files),
+        "chunks": chunk_count,
+        "files": files,
+    }
@@ -0,0 +1,219 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+from src.tools.doris_sql import analyze_sql, normalize_sql
+
+GUARD_ACTIONS = ("limit", "reject")
+
+_SCAN_NODE_RE = re.compile(r"\bV?OlapScanNode\b|\bOLAP_SCAN_NODE\b", re.IGNORECASE)
+_TABLETS_RE = re.compile(r"\btablets=(\d+)/(\d+)")
+_CARDINALITY_RE = re.compile(r"\bcardinality=([\d,]+)")
+# Operators that consume their whole input, so a LIMIT on top does not stop the scan early
+_BLOCKING_RE = re.compile(
+    r"\b(?:V?AGGREGATE|V?SORT|V?TOP-N|V?ANALYTIC|HASH JOIN|NESTED LOOP JOIN|CROSS JOIN)\b",
+    re.IGNORECASE,
+)
+
+_TRAILING_LIMIT_RE = re.compile(
+    r"\bLIMIT\s+(\d+)(?:\s*,\s*(\d+)|\s+OFFSET\s+(\d+))?\s*$", re.IGNORECASE
+)
+_SELECT_STAR_RE = re.compile(r"^\s*SELECT\s+(?:DISTINCT\s+)?\*", re.IGNORECASE)
+
+
+def trailing_limit(sql: str) -> Optional[Tuple[int, int]]:
+    """(offset, row count) of the statement's trailing LIMIT clause, None if it has none."""
+    match = _TRAILING_LIMIT_RE.search(normalize_sql(sql))
+    if match is None:
+        return None
+    first, second, offset = match.groups()
+    if second is not None:
+        # LIMIT offset, count
+        return int(first), int(second)
+    return int(offset or 0), int(first)
+
+
+def has_limit(sql: str) -> bool:
+    """Whether the statement ends with a top-level LIMIT clause."""
+    return trailing_limit(sql) is not None
+
+
+def add_limit(sql: str, limit: int) -> str:
+    """Cap the rows a statement returns at limit, lowering its own trailing LIMIT if it has one."""
+    normalized = normalize_sql(sql)
+    existing = trailing_limit(normalized)
+    if existing is None:
+        return f"{normalized} LIMIT {int(limit)}"
+    offset, count = existing
+    head = normalized[:_TRAILING_LIMIT_RE.search(normalized).start()].rstrip()
+    clause = f"LIMIT {min(count, int(limit))}" + (f" OFFSET {offset}" if offset else "")
+    return f"{head} {clause}"
+
+
+class PlanEstimate:
+    """What an EXPLAIN plan says the statement will scan."""
+
+    __slots__ = ("scan_rows", "tablets", "total_tablets", "scan_nodes", "blocking")
+
+    def __init__(self, scan_rows: Optional[int], tablets: int, total_tablets: int, scan_nodes: int, blocking: bool):
+        self.scan_rows = scan_rows
+        self.tablets = tablets
+        self.total_tablets = total_tablets
+        self.scan_nodes = scan_nodes
+        self.blocking = blocking
+
+    def describe(self) -> str:
+        rows = f"~{self.scan_rows} rows" if self.scan_rows is not None else "unknown rows"
+        return f"{rows}, {self.tablets}/{self.total_tablets} tablets in {self.scan_nodes} scan(s)"
+
+
+def parse_explain(lines: List[str]) -> PlanEstimate:
+    """Sum the scan estimates of every OLAP scan node in a Doris EXPLAIN output.
+
+    Row estimates are the scan nodes' ``cardinality``; nodes without
+    statistics report -1 or omit it, in which case scan_rows is None.
+    """
+    cardinalities: List[Optional[int]] = []
+    tablets = total_tablets = 0
+    blocking = False
+    for line in lines:
+        if _BLOCKING_RE.search(line):
+            blocking = True
+        if _SCAN_NODE_RE.search(line):
+            cardinalities.append(None)
+            continue
+        if not cardinalities:
+            continue
+        match = _TABLETS_RE.search(line)
+        if match:
+            tablets += int(match.group(1))
+            total_tablets += int(match.group(2))
+        match = _CARDINALITY_RE.search(line)
+        if match and cardinalities[-1] is None:
+            cardinality = int(match.group(1).replace(",", ""))
+            cardinalities[-1] = cardinality if cardinality >= 0 else None
+    scan_nodes = len(cardinalities)
+    scan_rows = None if None in cardinalities else sum(cardinalities)
+    return PlanEstimate(scan_rows, tablets, total_tablets, scan_nodes, blocking)
+
+
+class GuardDecision:
+    """Outcome of CostGuard.check: 'allow', 'limit' (sql rewritten) or 'reject'."""
+
+    __slots__ = ("action", "sql", "reason", "estimate")
+
+    def __init__(self, action: str, sql: str, reason: str = "", estimate: Optional[PlanEstimate] = None):
+        self.action = action
+        self.sql = sql
+        self.reason = reason
+        self.estimate = estimate
+
+    def message(self) -> str:
+        """Agent-facing note, '' when the statement was allowed unchanged."""
+        if self.action == "limit":
+            return f"[Cost guard] {self.reason} Ran it with LIMIT appended: {self.sql}"
+        if self.action == "reject":
+            return f"Query error (cost_guard): {self.reason}"
+        return ""
+
+
+class CostGuard:
+    """Pre-execution check of read statements against a scan budget.
+
+    Plans come from ``EXPLAIN`` and are cached by SQL shape for ``ttl``
+    seconds, so repeated queries that only differ in constants cost one
+    EXPLAIN. A statement over budget is rewritten with a LIMIT when the plan
+    streams (no aggregation, sort or join that must read everything first)
+    and the action is 'limit'; otherwise it is rejected with the reason.
+    """
+
+    def __init__(
+        self,
+        max_scan_rows: Optional[int] = None,
+        max_tablets: Optional[int] = None,
+        action: str = "limit",
+        limit: int = 1000,
+        ttl: float = 600.0,
+        max_entries: int = 1024,
+    ):
+        if action not in GUARD_ACTIONS:
+            raise ValueError(f"Invalid cost guard action: {action}. Must be one of: {', '.join(GUARD_ACTIONS)}.")
+        self.max_scan_rows = max_scan_rows
+        self.max_tablets = max_tablets
+        self.action = action
+        self.limit = limit
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._plans: "OrderedDict[str, Tuple[PlanEstimate, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"checks": 0, "explains": 0, "allowed": 0, "limited": 0, "rejected": 0}
+
+    def estimate(self, sql: str, explain: Callable[[str], List[str]]) -> PlanEstimate:
+        """Return the cached plan estimate for sql's shape, running explain(sql) on a miss."""
+        # Queries differing only in constants share a plan estimate
+        shape = analyze_sql(sql).fingerprint
+        now = time.monotonic()
+        with self._lock:
+            cached = self._plans.get(shape)
+            if cached is not None and cached[1] > now:
+                self._plans.move_to_end(shape)
+                return cached[0]
+        estimate = parse_explain(explain(sql))
+        with self._lock:
+            self._stats["explains"] += 1
+            self._plans[shape] = (estimate, now + self.ttl)
+            self._plans.move_to_end(shape)
+            while len(self._plans) > self.max_entries:
+                self._plans.popitem(last=False)
+        return estimate
+
+    def check(self, sql: str, explain: Callable[[str], List[str]]) -> GuardDecision:
+        """Decide whether sql may run as is, with a LIMIT appended, or not at all.
+
+        A trailing LIMIT over a streaming plan stops the scan after offset +
+        count rows, so the statement passes when that is within the row budget
+        (or within the guard's own limit when only tablets are budgeted). A
+        LIMIT larger than that is checked like no LIMIT at all.
+        """
+        estimate = self.estimate(sql, explain)
+        limit = trailing_limit(sql)
+        row_cap = self.max_scan_rows if self.max_scan_rows is not None else self.limit
+        bounded = limit is not None and not estimate.blocking and sum(limit) <= row_cap
+
+        over = []
+        if self.max_scan_rows is not None and estimate.scan_rows is not None and estimate.scan_rows > self.max_scan_rows:
+            over.append(f"scans ~{estimate.scan_rows} rows (budget {self.max_scan_rows})")
+        if self.max_tablets is not None and estimate.tablets > self.max_tablets:
+            over.append(f"reads {estimate.tablets} tablets (budget {self.max_tablets})")
+        if over and limit is not None and not estimate.blocking and not bounded:
+            over.append(f"its LIMIT reads up to {sum(limit)} rows (at most {row_cap} allowed)")
+
+        if not over or bounded:
+            decision = GuardDecision("allow", sql, estimate=estimate)
+        else:
+            reason = f"The plan {' and '.join(over)}."
+            if self.action == "limit" and not estimate.blocking:
+                decision = GuardDecision("limit", add_limit(sql, self.limit), reason, estimate)
+            else:
+                hints = ["add WHERE filters on partition or key columns"]
+                if _SELECT_STAR_RE.match(sql):
+                    hints.insert(0, "select only the columns you need instead of *")
+                if not estimate.blocking:
+                    hints.extend(["aggregate in SQL", f"add a LIMIT of at most {row_cap}"])
+                hints.append("or use analyze_data(mode='sample')")
+                decision = GuardDecision("reject", sql, f"{reason} Not executed. To proceed, {', '.join(hints)}.", estimate)
+
+        with self._lock:
+            self._stats["checks"] += 1
+            self._stats[{"allow": "allowed", "limit": "limited", "reject": "rejected"}[decision.action]] += 1
+        return decision
+
+    def clear(self) -> None:
+        with self._lock:
+            self._plans.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._stats, cached_plans=len(self._plans))
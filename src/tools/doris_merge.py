@@ -0,0 +1,131 @@
+import datetime
+import decimal
+import re
+from typing import Any, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.tools.doris_rows import column_to_objects
+
+WATERMARKS_TABLE = "data_agent_watermarks"
+ROW_HASHES_TABLE = "data_agent_row_hashes"
+
+WATERMARKS_DDL = f"""
+CREATE TABLE IF NOT EXISTS `{WATERMARKS_TABLE}` (
+    `table_name` VARCHAR(255) NOT NULL COMMENT '表名',
+    `column_name` VARCHAR(255) NOT NULL COMMENT '水位列',
+    `watermark` VARCHAR(255) COMMENT '上次合并的最大值',
+    `updated_at` DATETIME COMMENT '更新时间'
+) ENGINE=OLAP
+UNIQUE KEY(`table_name`)
+DISTRIBUTED BY HASH(`table_name`) BUCKETS 1
+PROPERTIES('replication_num' = '1', 'enable_unique_key_merge_on_write' = 'true');
+"""
+
+ROW_HASHES_DDL = f"""
+CREATE TABLE IF NOT EXISTS `{ROW_HASHES_TABLE}` (
+    `table_name` VARCHAR(255) NOT NULL COMMENT '表名',
+    `key_hash` BIGINT NOT NULL COMMENT '主键列哈希',
+    `row_hash` BIGINT NOT NULL COMMENT '整行哈希'
+) ENGINE=OLAP
+UNIQUE KEY(`table_name`, `key_hash`)
+DISTRIBUTED BY HASH(`table_name`, `key_hash`) BUCKETS 8
+PROPERTIES('replication_num' = '1', 'enable_unique_key_merge_on_write' = 'true');
+"""
+
+# Stored hashes are looked up for this many keys per query
+HASH_LOOKUP_BATCH = 5000
+
+_UNIQUE_KEY_RE = re.compile(r"UNIQUE KEY\s*\(([^)]*)\)", re.IGNORECASE)
+
+
+def unique_key_columns(create_stmt: str) -> Optional[List[str]]:
+    """Key columns of a UNIQUE KEY table from SHOW CREATE TABLE, None for other models."""
+    match = _UNIQUE_KEY_RE.search(create_stmt)
+    if not match:
+        return None
+    return [col.strip().strip("`") for col in match.group(1).split(",") if col.strip()]
+
+
+def canonical_value(value: Any) -> Optional[str]:
+    """Text of a value as loaded into Doris, the same whatever dtype the column had.
+
+    A merge hashes rows of DataFrames typed by infer_schema on its first run
+    and by coerce_to_types afterwards, so 3, 3.0 and Decimal('3.00') must
+    agree, and so must a date and the midnight datetime it was parsed to.
+    """
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        return str(int(value))
+    if isinstance(value, float):
+        return str(int(value)) if value.is_integer() else repr(value)
+    if isinstance(value, decimal.Decimal):
+        return str(int(value)) if value == value.to_integral_value() else format(value.normalize(), "f")
+    if isinstance(value, datetime.datetime):
+        if value.time() == datetime.time(0) and value.tzinfo is None:
+            return value.date().isoformat()
+        return value.isoformat(sep=" ")
+    return str(value)
+
+
+def _hash(df: pd.DataFrame) -> np.ndarray:
+    canonical = pd.DataFrame({
+        i: [canonical_value(value) for value in column_to_objects(df.iloc[:, i])] for i in range(df.shape[1])
+    })
+    # Stored as signed BIGINT
+    return pd.util.hash_pandas_object(canonical, index=False).to_numpy().view(np.int64)
+
+
+def row_hashes(df: pd.DataFrame, key_columns: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """Hash of every row's key columns and of the whole row, from the canonical text of each cell."""
+    return _hash(df[list(key_columns)]), _hash(df)
+
+
+def changed_rows(key_hashes: np.ndarray, hashes: np.ndarray,
+                 stored_keys: np.ndarray, stored_hashes: np.ndarray) -> np.ndarray:
+    """Mask of rows whose key is new or whose content differs from the stored row hash.
+
+    Of several rows with the same key only the last counts, as the UNIQUE KEY
+    model keeps the last one loaded.
+    """
+    positions = pd.Index(stored_keys).get_indexer(key_hashes)
+    known = positions >= 0
+    changed = ~known
+    changed[known] = stored_hashes[positions[known]] != hashes[known]
+    last = ~pd.Series(key_hashes).duplicated(keep="last").to_numpy()
+    return changed & last
+
+
+def rows_since(values: pd.Series, watermark: Optional[str]) -> np.ndarray:
+    """Mask of rows at or past the watermark, all rows if there is none yet.
+
+    Rows equal to the watermark are included: they may have arrived after
+    the previous merge, and upserting them again is harmless.
+    """
+    if watermark is None:
+        return np.ones(len(values), dtype=bool)
+    if pd.api.types.is_datetime64_any_dtype(values.dtype):
+        bound = pd.Timestamp(watermark)
+    elif pd.api.types.is_numeric_dtype(values.dtype):
+        bound = float(watermark)
+    else:
+        bound = watermark
+        values = values.astype(str)
+    return (values >= bound).fillna(False).to_numpy(dtype=bool)
+
+
+def format_watermark(values: pd.Series) -> Optional[str]:
+    """Maximum of a watermark column as stored in the watermarks table, None if all missing."""
+    present = values.dropna()
+    if present.empty:
+        return None
+    maximum = present.astype(str).max() if not (
+        pd.api.types.is_datetime64_any_dtype(present.dtype) or pd.api.types.is_numeric_dtype(present.dtype)
+    ) else present.max()
+    if isinstance(maximum, pd.Timestamp):
+        return maximum.isoformat(sep=" ")
+    if isinstance(maximum, np.generic):
+        maximum = maximum.item()
+    return str(maximum)
@@ -0,0 +1,89 @@
+import re
+from typing import Iterable, List, Optional, Tuple
+
+import pandas as pd
+
+PARTITION_UNITS = ("day", "month")
+
+# Partition names encode their period, so the unit of an existing table can be read back
+_PARTITION_NAME_RE = {"day": re.compile(r"^p\d{8}$"), "month": re.compile(r"^p\d{6}$")}
+_RANGE_COLUMN_RE = re.compile(r"PARTITION BY RANGE\s*\(\s*`?([^`)\s]+)`?\s*\)", re.IGNORECASE)
+
+# NULLs of the partition column are stored as the type's minimum value, so
+# they need a partition below every real date
+NULL_PARTITION = ("p_null", "0000-01-01", "1000-01-01")
+
+
+class Period:
+    """One RANGE partition: name and [start, end) bounds as 'YYYY-MM-DD'."""
+
+    __slots__ = ("name", "start", "end")
+
+    def __init__(self, name: str, start: str, end: str):
+        self.name = name
+        self.start = start
+        self.end = end
+
+    def values_clause(self) -> str:
+        return f"VALUES [('{self.start}'), ('{self.end}'))"
+
+
+def partition_periods(values: pd.Series, unit: str) -> List[Period]:
+    """Return the day or month periods the values fall into, in order.
+
+    Only periods that contain data are returned, plus the NULL partition when
+    the column has missing values.
+    """
+    if unit not in PARTITION_UNITS:
+        raise ValueError(f"Invalid partition unit: {unit}. Must be one of: {', '.join(PARTITION_UNITS)}.")
+    dates = pd.to_datetime(values, errors="coerce")
+    if getattr(dates.dt, "tz", None) is not None:
+        dates = dates.dt.tz_localize(None)
+    present = dates.dropna()
+    periods = [Period(*NULL_PARTITION)] if len(present) < len(dates) else []
+
+    freq = "D" if unit == "day" else "M"
+    for period in present.dt.to_period(freq).drop_duplicates().sort_values():
+        start = period.start_time
+        end = (period + 1).start_time
+        name = f"p{start:%Y%m%d}" if unit == "day" else f"p{start:%Y%m}"
+        periods.append(Period(name, f"{start:%Y-%m-%d}", f"{end:%Y-%m-%d}"))
+    return periods
+
+
+def partition_clause(column: str, periods: Iterable[Period]) -> str:
+    """PARTITION BY RANGE clause of a CREATE TABLE statement with one partition per period."""
+    partitions = ", ".join(f"PARTITION `{period.name}` {period.values_clause()}" for period in periods)
+    return f"PARTITION BY RANGE(`{column}`) ({partitions})"
+
+
+def add_partition_statements(table: str, periods: Iterable[Period], existing: Iterable[str]) -> List[str]:
+    """ALTER TABLE statements adding the periods that are not among the existing partition names."""
+    existing = set(existing)
+    return [
+        f"ALTER TABLE `{table}` ADD PARTITION IF NOT EXISTS `{period.name}` {period.values_clause()}"
+        for period in periods
+        if period.name not in existing
+    ]
+
+
+def range_partition_column(create_stmt: str) -> Optional[str]:
+    """Partition column of a single-column RANGE-partitioned table, from SHOW CREATE TABLE."""
+    match = _RANGE_COLUMN_RE.search(create_stmt)
+    return match.group(1) if match else None
+
+
+def detect_partition_unit(names: Iterable[str]) -> Optional[str]:
+    """Unit of partitions created by partition_clause, None if the names follow another scheme."""
+    names = [name for name in names if name != NULL_PARTITION[0]]
+    if not names:
+        return None
+    for unit, pattern in _PARTITION_NAME_RE.items():
+        if all(pattern.match(name) for name in names):
+            return unit
+    return None
+
+
+def auto_partition_column(column_types: Iterable[Tuple[str, str]]) -> Optional[str]:
+    """First DATE or DATETIME column of an inferred schema."""
+    return next((name for name, sql_type in column_types if sql_type in ("DATE", "DATETIME")), None)
@@ -0,0 +1,250 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Deque, Dict, Iterator
+
+import pymysql
+
+from agno.utils.log import log_debug
+
+
+class PoolTimeoutError(Exception):
+    """Raised when no connection could be checked out of the pool in time."""
+
+
+class _PooledConnection:
+    """A connection together with the bookkeeping the pool needs."""
+
+    __slots__ = ("conn", "created_at", "last_used")
+
+    def __init__(self, conn: pymysql.connections.Connection):
+        self.conn = conn
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+
+
+class DorisConnectionPool:
+    """A bounded, thread-safe pool of PyMySQL connections to a Doris FE.
+
+    Connections are created lazily up to ``max_size``. Idle connections are
+    handed out most-recently-used first, so the pool naturally shrinks back to
+    ``min_size`` when load drops. A connection is only pinged when it has been
+    idle for longer than ``health_check_after`` seconds, so hot connections go
+    straight to the statement without an extra round trip.
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], pymysql.connections.Connection],
+        min_size: int = 1,
+        max_size: int = 8,
+        idle_timeout: float = 300.0,
+        max_lifetime: float = 3600.0,
+        health_check_after: float = 30.0,
+        acquire_timeout: float = 30.0,
+    ):
+        """Initialize the pool.
+
+        Args:
+            connect: Factory returning a new, fully configured connection
+            min_size: Number of idle connections kept open regardless of idle_timeout
+            max_size: Maximum number of connections open at the same time
+            idle_timeout: Seconds after which a surplus idle connection is closed
+            max_lifetime: Seconds after which a connection is recycled
+            health_check_after: Idle seconds after which a connection is pinged before reuse
+            acquire_timeout: Seconds to wait for a free connection before giving up
+        """
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        if min_size < 0 or min_size > max_size:
+            raise ValueError("min_size must be between 0 and max_size")
+
+        self._connect = connect
+        self.min_size = min_size
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.max_lifetime = max_lifetime
+        self.health_check_after = health_check_after
+        self.acquire_timeout = acquire_timeout
+
+        self._idle: Deque[_PooledConnection] = deque()
+        self._size = 0
+        self._closed = False
+        self._cond = threading.Condition(threading.Lock())
+
+        self._created = 0
+        self._discarded = 0
+        self._waits = 0
+
+    @contextmanager
+    def connection(self) -> Iterator[pymysql.connections.Connection]:
+        """Check a connection out of the pool for the duration of the block.
+
+        The connection is returned to the pool afterwards, or discarded when
+        the block failed with a client-side connection error.
+        """
+        pooled = self._acquire()
+        try:
+            yield pooled.conn
+        except BaseException as e:
+            self._release(pooled, discard=self._is_broken(pooled.conn, e))
+            raise
+        else:
+            self._release(pooled)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return a snapshot of the pool counters."""
+        with self._cond:
+            return {
+                "size": self._size,
+                "idle": len(self._idle),
+                "in_use": self._size - len(self._idle),
+                "max_size": self.max_size,
+                "created": self._created,
+                "discarded": self._discarded,
+                "waits": self._waits,
+            }
+
+    def close(self) -> None:
+        """Close all idle connections and refuse further checkouts.
+
+        Connections that are checked out are closed when they are released.
+        """
+        with self._cond:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._size -= len(idle)
+            self._cond.notify_all()
+        for pooled in idle:
+            self._close_quietly(pooled.conn)
+
+    def _acquire(self) -> _PooledConnection:
+        deadline = time.monotonic() + self.acquire_timeout
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise PoolTimeoutError("Connection pool is closed")
+
+                while self._idle:
+                    pooled = self._idle.pop()
+                    if self._is_expired(pooled, time.monotonic()):
+                        self._size -= 1
+                        self._discarded += 1
+                        self._close_quietly(pooled.conn)
+                        continue
+                    break
+                else:
+                    pooled = None
+
+                if pooled is not None:
+                    break
+
+                if self._size < self.max_size:
+                    # Reserve the slot before connecting outside the lock.
+                    self._size += 1
+                    break
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise PoolTimeoutError(
+                        f"Timed out after {self.acquire_timeout}s waiting for a Doris connection "
+                        f"(max_size={self.max_size})"
+                    )
+                self._waits += 1
+                self._cond.wait(remaining)
+
+        if pooled is None:
+            return self._open_reserved()
+
+        if time.monotonic() - pooled.last_used > self.health_check_after and not self._ping(pooled.conn):
+            log_debug("Discarding stale Doris connection after failed health check")
+            self._close_quietly(pooled.conn)
+            with self._cond:
+                self._discarded += 1
+            # Keep the slot and replace the stale connection in place.
+            return self._open_reserved()
+
+        return pooled
+
+    def _open_reserved(self) -> _PooledConnection:
+        """Open a connection for a slot that has already been counted in ``_size``."""
+        try:
+            conn = self._connect()
+        except BaseException:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self._created += 1
+        return _PooledConnection(conn)
+
+    def _release(self, pooled: _PooledConnection, discard: bool = False) -> None:
+        now = time.monotonic()
+        with self._cond:
+            if discard or self._closed or now - pooled.created_at > self.max_lifetime:
+                self._size -= 1
+                self._discarded += 1
+                self._cond.notify()
+                close = True
+            else:
+                pooled.last_used = now
+                self._idle.append(pooled)
+                self._trim_idle(now)
+                self._cond.notify()
+                close = False
+        if close:
+            self._close_quietly(pooled.conn)
+
+    def _trim_idle(self, now: float) -> None:
+        """Close surplus connections that have been idle longer than idle_timeout.
+
+        Must be called with the lock held. The oldest idle connections sit at
+        the left end of the deque.
+        """
+        while self._idle and self._size > self.min_size:
+            oldest = self._idle[0]
+            if now - oldest.last_used <= self.idle_timeout:
+                break
+            self._idle.popleft()
+            self._size -= 1
+            self._discarded += 1
+            self._close_quietly(oldest.conn)
+
+    def _is_expired(self, pooled: _PooledConnection, now: float) -> bool:
+        if now - pooled.created_at > self.max_lifetime:
+            return True
+        return self._size > self.min_size and now - pooled.last_used > self.idle_timeout
+
+    @staticmethod
+    def _ping(conn: pymysql.connections.Connection) -> bool:
+        try:
+            conn.ping(reconnect=False)
+            return True
+        except Exception:
+            return False
+
+    @staticmethod
+    def _is_broken(conn: pymysql.connections.Connection, error: BaseException) -> bool:
+        """Whether a connection must not go back to the pool after ``error``.
+
+        Doris reports SQL errors as OperationalError too, so only client-side
+        errors (CR_* codes, 2000-2999) and closed sockets count as broken.
+        """
+        if not getattr(conn, "open", False):
+            return True
+        if isinstance(error, pymysql.err.InterfaceError):
+            return True
+        if isinstance(error, pymysql.err.OperationalError):
+            errno = error.args[0] if error.args and isinstance(error.args[0], int) else 0
+            return 2000 <= errno < 3000
+        return not isinstance(error, Exception)
+
+    @staticmethod
+    def _close_quietly(conn: pymysql.connections.Connection) -> None:
+        try:
+            conn.close()
+        except Exception:
+            pass
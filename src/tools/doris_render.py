@@ -0,0 +1,148 @@
+import threading
+import uuid
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+import pandas as pd
+
+
+class ResultStore:
+    """Keeps recent full results in memory so truncated output can be paged.
+
+    Results are evicted least recently used first once either ``max_results``
+    or ``max_bytes`` (pandas deep memory usage) is exceeded.
+    """
+
+    def __init__(self, max_results: int = 16, max_bytes: int = 256 * 1024 * 1024):
+        self.max_results = max_results
+        self.max_bytes = max_bytes
+        self._results: "OrderedDict[str, Tuple[pd.DataFrame, int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def put(self, df: pd.DataFrame) -> Optional[str]:
+        """Store a result and return its id, or None if it can never fit."""
+        size = int(df.memory_usage(deep=True).sum())
+        if self.max_results <= 0 or size > self.max_bytes:
+            return None
+        result_id = uuid.uuid4().hex[:12]
+        with self._lock:
+            self._results[result_id] = (df, size)
+            self._bytes += size
+            while len(self._results) > self.max_results or self._bytes > self.max_bytes:
+                _, (_, evicted) = self._results.popitem(last=False)
+                self._bytes -= evicted
+        return result_id
+
+    def get(self, result_id: str) -> Optional[pd.DataFrame]:
+        with self._lock:
+            item = self._results.get(result_id)
+            if item is None:
+                return None
+            self._results.move_to_end(result_id)
+            return item[0]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._results.clear()
+            self._bytes = 0
+
+
+class ResultRenderer:
+    """Render DataFrames as bounded text for tool output.
+
+    Long results are cut to a head and tail preview, long cell values are
+    truncated, and the text is kept under a character budget. A footer states
+    what was omitted so the agent knows the output is partial.
+    """
+
+    def __init__(self, max_rows: int = 50, max_chars: int = 8000, max_column_chars: int = 100):
+        """Initialize the renderer.
+
+        Args:
+            max_rows: Rows shown at most; the preview is split between head and tail
+            max_chars: Character budget of the rendered table
+            max_column_chars: Cell values longer than this are truncated with '…'
+        """
+        self.max_rows = max_rows
+        self.max_chars = max_chars
+        self.max_column_chars = max_column_chars
+
+    def render(self, df: pd.DataFrame, store: Optional[ResultStore] = None, result_id: Optional[str] = None,
+               offset: int = 0, total_rows: Optional[int] = None) -> str:
+        """Render df within the budgets.
+
+        Args:
+            df: Rows to render
+            store: If given and rows had to be omitted, df is retained there for paging
+            result_id: Id of an already retained full result that df is a page of
+            offset: Position of df's first row within the full result (for page footers)
+            total_rows: Row count of the full result; defaults to len(df)
+        """
+        total_rows = len(df) if total_rows is None else total_rows
+        if df.empty:
+            return self._footer(0, 0, total_rows, offset, offset, result_id, 0) or "Empty result"
+
+        head_rows, tail_rows = self._preview_split(len(df), self.max_rows)
+        text = self._table(df, head_rows, tail_rows)
+        # Shrink the preview until the table fits the character budget
+        while len(text) > self.max_chars and head_rows + tail_rows > 1:
+            head_rows, tail_rows = self._preview_split(len(df), max(1, (head_rows + tail_rows) // 2))
+            text = self._table(df, head_rows, tail_rows)
+        if len(text) > self.max_chars:
+            text = text[:self.max_chars] + "…"
+
+        shown = head_rows + tail_rows
+        if store is not None and result_id is None and shown < len(df):
+            result_id = store.put(df)
+        # First row the agent has not seen yet
+        next_offset = offset + (head_rows if shown < len(df) else len(df))
+        footer = self._footer(shown, len(df), total_rows, offset, next_offset, result_id,
+                              int(df.memory_usage(deep=True).sum()))
+        return text + ("\n" + footer if footer else "")
+
+    @staticmethod
+    def _preview_split(rows: int, budget: int) -> Tuple[int, int]:
+        if rows <= budget:
+            return rows, 0
+        head = (budget + 1) // 2
+        return head, budget - head
+
+    def _truncate(self, df: pd.DataFrame) -> pd.DataFrame:
+        limit = self.max_column_chars
+
+        def cell(value):
+            text = str(value)
+            return text if len(text) <= limit else text[:max(1, limit - 1)] + "…"
+
+        return df.apply(lambda column: column.map(cell))
+
+    def _table(self, df: pd.DataFrame, head_rows: int, tail_rows: int) -> str:
+        if tail_rows:
+            preview = pd.concat([df.iloc[:head_rows], df.iloc[-tail_rows:]])
+        else:
+            preview = df.iloc[:head_rows]
+        lines = self._truncate(preview).to_string(index=False).split("\n")
+        if tail_rows:
+            # lines[0] is the header
+            lines.insert(head_rows + 1, f"... ({len(df) - head_rows - tail_rows} rows omitted) ...")
+        return "\n".join(lines)
+
+    @staticmethod
+    def _footer(shown: int, rows: int, total_rows: int, offset: int, next_offset: int,
+                result_id: Optional[str], size: int) -> str:
+        if shown == total_rows and rows == total_rows:
+            return ""
+        parts = [f"[Showing {shown} of {total_rows} rows"]
+        if rows != total_rows:
+            parts.append(f"page rows {offset}-{offset + rows - 1}")
+        parts.append(f"{total_rows - shown} rows omitted")
+        if size:
+            parts.append(f"~{size} bytes in this page" if rows != total_rows else f"~{size} bytes in full result")
+        footer = ", ".join(parts) + "]"
+        if result_id and next_offset < total_rows:
+            footer += (
+                f" Full result retained as '{result_id}'; call fetch_result_page"
+                f" with offset={next_offset} to read more rows."
+            )
+        return footer
@@ -0,0 +1,312 @@
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple, Union
+
+import pymysql
+
+from agno.utils.log import log_debug, log_info
+
+from src.tools.doris_pool import DorisConnectionPool, PoolTimeoutError
+
+ROUTING_POLICIES = ("least_outstanding", "round_robin")
+
+FrontendSpec = Union[str, Tuple[str, int], Tuple[str, int, float], Mapping[str, Any]]
+
+
+class Frontend:
+    """One Doris FE endpoint with its own connection pool and health state."""
+
+    __slots__ = ("host", "port", "weight", "pool", "outstanding", "failures", "down_until", "current_weight")
+
+    def __init__(self, host: str, port: int, weight: float = 1.0):
+        if weight <= 0:
+            raise ValueError(f"Frontend weight must be positive, got {weight} for {host}:{port}")
+        self.host = host
+        self.port = int(port)
+        self.weight = float(weight)
+        self.pool: Optional[DorisConnectionPool] = None
+        self.outstanding = 0
+        self.failures = 0
+        self.down_until = 0.0
+        # Smooth weighted round-robin state
+        self.current_weight = 0.0
+
+    @property
+    def address(self) -> str:
+        return f"{self.host}:{self.port}"
+
+    def is_up(self, now: float) -> bool:
+        return self.failures == 0 or now >= self.down_until
+
+
+def parse_frontends(specs: Iterable[FrontendSpec], default_port: int) -> List[Frontend]:
+    """Build Frontends from 'host', 'host:port', (host, port[, weight]) or {'host', 'port', 'weight'} specs.
+
+    Duplicate addresses are dropped, keeping the first occurrence.
+    """
+    frontends: List[Frontend] = []
+    seen = set()
+    for spec in specs:
+        if isinstance(spec, str):
+            host, _, port = spec.rpartition(":") if ":" in spec else (spec, "", "")
+            frontend = Frontend(host, int(port) if port else default_port)
+        elif isinstance(spec, Mapping):
+            frontend = Frontend(spec["host"], spec.get("port", default_port), spec.get("weight", 1.0))
+        else:
+            frontend = Frontend(*spec)
+        if frontend.address not in seen:
+            seen.add(frontend.address)
+            frontends.append(frontend)
+    if not frontends:
+        raise ValueError("At least one Doris frontend is required")
+    return frontends
+
+
+def is_connection_failure(error: BaseException) -> bool:
+    """Whether error means the FE is unreachable rather than that the statement failed.
+
+    Covers client-side errors (CR_* codes 2000-2999: can't connect, lost
+    connection, server gone away) and socket errors.
+    """
+    if isinstance(error, pymysql.err.OperationalError):
+        errno = error.args[0] if error.args and isinstance(error.args[0], int) else 0
+        return 2000 <= errno < 3000
+    return isinstance(error, (pymysql.err.InterfaceError, OSError))
+
+
+class FrontendRouter:
+    """Route statements across several Doris FEs.
+
+    Reads are spread over the healthy FEs, either to the one with the fewest
+    statements in flight relative to its weight ('least_outstanding') or by
+    smooth weighted round-robin ('round_robin'). Writes and DDL go to the
+    pinned master; any FE accepts them and forwards to the master, so they
+    fall back to the others when it is unreachable.
+
+    An FE that fails to connect is taken out of rotation with exponential
+    backoff and the request moves on to the next FE, so a restarting FE costs
+    one failed connect instead of a timeout on every request. A background
+    thread probes FEs that are down and puts them back once they answer.
+    """
+
+    def __init__(
+        self,
+        frontends: Sequence[Frontend],
+        pool_factory: Callable[[Frontend], DorisConnectionPool],
+        probe: Callable[[Frontend], None],
+        policy: str = "least_outstanding",
+        backoff_base: float = 1.0,
+        backoff_max: float = 30.0,
+        health_check_interval: Optional[float] = 5.0,
+        locate_master: Optional[Callable[[], Optional[Tuple[str, int]]]] = None,
+    ):
+        """Initialize the router.
+
+        Args:
+            frontends: FE endpoints; the first one is the write master until locate_master says otherwise
+            pool_factory: Creates the connection pool of a frontend
+            probe: Opens and closes a connection to a frontend, raising if it is unreachable
+            policy: Read routing policy, 'least_outstanding' or 'round_robin'
+            backoff_base: Seconds an FE stays out of rotation after its first failure
+            backoff_max: Upper bound of the backoff, which doubles with every consecutive failure
+            health_check_interval: Seconds between probes of FEs that are down. None or 0 disables
+                probing; FEs then rejoin the rotation when their backoff expires.
+            locate_master: Returns the (host, query port) of the current master FE, or None if unknown
+        """
+        if policy not in ROUTING_POLICIES:
+            raise ValueError(f"Invalid routing policy: {policy}. Must be one of: {', '.join(ROUTING_POLICIES)}.")
+        self.frontends = list(frontends)
+        for frontend in self.frontends:
+            frontend.pool = pool_factory(frontend)
+        self.probe = probe
+        self.policy = policy
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.health_check_interval = health_check_interval
+        self.locate_master = locate_master
+
+        self._master = self.frontends[0]
+        self._master_located = locate_master is None or len(self.frontends) == 1
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+        self._checker: Optional[threading.Thread] = None
+        self._stats = {"reads": 0, "writes": 0, "failovers": 0, "failures": 0, "recoveries": 0}
+
+    @property
+    def master(self) -> Frontend:
+        if not self._master_located:
+            self._locate_master()
+        return self._master
+
+    @contextmanager
+    def connection(self, read: bool = False) -> Iterator[pymysql.connections.Connection]:
+        """Check out a connection on the FE chosen for a read or a write.
+
+        FEs that can't be connected to are marked down and the next candidate
+        is tried. A connection lost while the block runs marks its FE down
+        too, but the block is not retried.
+        """
+        last_error: Optional[BaseException] = None
+        for attempt, frontend in enumerate(self._candidates(read)):
+            with self._lock:
+                frontend.outstanding += 1
+                if attempt:
+                    self._stats["failovers"] += 1
+                else:
+                    self._stats["reads" if read else "writes"] += 1
+            try:
+                try:
+                    context = frontend.pool.connection()
+                    connection = context.__enter__()
+                except PoolTimeoutError:
+                    # The FE is healthy, just busy
+                    raise
+                except Exception as e:
+                    self._mark_failure(frontend, e)
+                    last_error = e
+                    continue
+
+                try:
+                    yield connection
+                except BaseException as e:
+                    if is_connection_failure(e):
+                        self._mark_failure(frontend, e)
+                    if not context.__exit__(type(e), e, e.__traceback__):
+                        raise
+                else:
+                    context.__exit__(None, None, None)
+                    self._mark_success(frontend)
+                return
+            finally:
+                with self._lock:
+                    frontend.outstanding -= 1
+        raise last_error if last_error is not None else PoolTimeoutError("No Doris frontend available")
+
+    def write_frontends(self) -> List[Frontend]:
+        """Frontends in the order a write tries them: the master, healthy ones, then those backing off."""
+        return self._candidates(read=False)
+
+    def _candidates(self, read: bool) -> List[Frontend]:
+        """Frontends to try in order: the preferred one first, then healthy ones, then those still backing off."""
+        # Resolved before taking the lock: locating the master runs a read itself
+        master = None if read else self.master
+        now = time.monotonic()
+        with self._lock:
+            up = [frontend for frontend in self.frontends if frontend.is_up(now)]
+            down = sorted((f for f in self.frontends if not f.is_up(now)), key=lambda f: f.down_until)
+            if read:
+                preferred = self._pick_read(up)
+            else:
+                preferred = master if master in up else None
+        ordered = [preferred] if preferred is not None else []
+        ordered.extend(frontend for frontend in up if frontend is not preferred)
+        ordered.extend(down)
+        return ordered
+
+    def _pick_read(self, up: List[Frontend]) -> Optional[Frontend]:
+        """Choose the read FE among healthy ones; must be called with the lock held."""
+        if not up:
+            return None
+        if self.policy == "least_outstanding":
+            # Ties (e.g. an idle cluster) are broken by weighted round-robin
+            load = min(frontend.outstanding / frontend.weight for frontend in up)
+            up = [frontend for frontend in up if frontend.outstanding / frontend.weight == load]
+        total = sum(frontend.weight for frontend in up)
+        for frontend in up:
+            frontend.current_weight += frontend.weight
+        chosen = max(up, key=lambda frontend: frontend.current_weight)
+        chosen.current_weight -= total
+        return chosen
+
+    def _mark_failure(self, frontend: Frontend, error: BaseException) -> None:
+        with self._lock:
+            frontend.failures += 1
+            delay = min(self.backoff_base * 2 ** (frontend.failures - 1), self.backoff_max)
+            # Jitter keeps agents from retrying a recovering FE in lockstep
+            frontend.down_until = time.monotonic() + delay * random.uniform(0.5, 1.0)
+            self._stats["failures"] += 1
+            if frontend is self._master and self.locate_master is not None:
+                self._master_located = False
+        log_info(f"Doris FE {frontend.address} marked down for up to {delay:g}s: {str(error)}")
+        self._start_health_checks()
+
+    def _mark_success(self, frontend: Frontend) -> None:
+        if frontend.failures == 0:
+            return
+        with self._lock:
+            frontend.failures = 0
+            frontend.down_until = 0.0
+            self._stats["recoveries"] += 1
+        log_info(f"Doris FE {frontend.address} is back in rotation")
+
+    def _locate_master(self) -> None:
+        self._master_located = True
+        try:
+            address = self.locate_master()
+        except Exception as e:
+            log_debug(f"Could not locate the Doris master FE: {str(e)}")
+            return
+        for frontend in self.frontends:
+            if address is not None and (frontend.host, frontend.port) == (address[0], int(address[1])):
+                self._master = frontend
+                return
+
+    def check_health(self) -> None:
+        """Probe the FEs that are down and whose backoff has expired."""
+        now = time.monotonic()
+        for frontend in self.frontends:
+            if frontend.failures == 0 or now < frontend.down_until:
+                continue
+            try:
+                self.probe(frontend)
+            except Exception as e:
+                self._mark_failure(frontend, e)
+            else:
+                self._mark_success(frontend)
+
+    def _start_health_checks(self) -> None:
+        # A single FE is always tried anyway, so there is nothing to probe for
+        if not self.health_check_interval or len(self.frontends) == 1 or self._closed.is_set():
+            return
+        with self._lock:
+            if self._checker is not None and self._checker.is_alive():
+                return
+            self._checker = threading.Thread(target=self._health_loop, name="doris-fe-health", daemon=True)
+            self._checker.start()
+
+    def _health_loop(self) -> None:
+        # Runs only while some FE is down
+        while not self._closed.wait(self.health_check_interval):
+            self.check_health()
+            if all(frontend.failures == 0 for frontend in self.frontends):
+                return
+
+    def stats(self) -> Dict[str, Any]:
+        """Return routing counters and the state of every FE."""
+        now = time.monotonic()
+        with self._lock:
+            master = self._master
+            return dict(
+                self._stats,
+                policy=self.policy,
+                frontends=[
+                    {
+                        "address": frontend.address,
+                        "weight": frontend.weight,
+                        "master": frontend is master,
+                        "healthy": frontend.is_up(now),
+                        "outstanding": frontend.outstanding,
+                        "failures": frontend.failures,
+                        "pool": frontend.pool.stats(),
+                    }
+                    for frontend in self.frontends
+                ],
+            )
+
+    def close(self) -> None:
+        """Stop health checks and close every FE's pool."""
+        self._closed.set()
+        for frontend in self.frontends:
+            frontend.pool.close()
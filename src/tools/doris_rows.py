@@ -0,0 +1,115 @@
+from typing import Any, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+def column_to_objects(series: pd.Series) -> np.ndarray:
+    """Convert a column to an object array of values PyMySQL can escape.
+
+    Missing values (NaN, NaT, pd.NA) become None, numpy scalars become Python
+    scalars and pandas Timestamp/Timedelta become datetime/timedelta. The
+    conversion runs once per column instead of once per cell.
+
+    Args:
+        series: Column to convert
+
+    Returns:
+        1-D object ndarray with one Python value per row
+    """
+    dtype = series.dtype
+    if pd.api.types.is_datetime64_any_dtype(dtype):
+        if getattr(dtype, "tz", None) is not None:
+            # Doris DATETIME has no zone; keep the wall-clock time.
+            series = series.dt.tz_localize(None)
+        # Casting datetime64[us] to object yields datetime.datetime and None for NaT.
+        return series.to_numpy(dtype="datetime64[us]").astype(object)
+    if pd.api.types.is_timedelta64_dtype(dtype):
+        return series.to_numpy(dtype="timedelta64[us]").astype(object)
+
+    # Numpy-backed numeric/bool columns come back as Python scalars, and
+    # extension dtypes (Int64, boolean, string, category) map pd.NA to None.
+    return series.to_numpy(dtype=object, na_value=None)
+
+
+def dataframe_to_rows(df: pd.DataFrame) -> List[Tuple[Any, ...]]:
+    """Materialize a DataFrame as a list of row tuples ready for executemany.
+
+    Args:
+        df: DataFrame to convert
+
+    Returns:
+        One tuple per row, in column order
+    """
+    if df.empty:
+        return []
+    columns = [column_to_objects(df.iloc[:, i]) for i in range(df.shape[1])]
+    return list(zip(*columns))
+
+
+def iter_row_batches(
+    df: pd.DataFrame, batch_size: int = 1000, block_rows: int = 65536
+) -> Iterator[List[Tuple[Any, ...]]]:
+    """Yield row tuples in batches without materializing the whole frame.
+
+    Columns are converted a block of ``block_rows`` rows at a time, which keeps
+    the per-column conversion cost amortized while bounding the extra memory.
+
+    Args:
+        df: DataFrame to convert
+        batch_size: Rows per yielded batch
+        block_rows: Rows converted per columnar pass
+
+    Yields:
+        Lists of at most ``batch_size`` row tuples
+    """
+    block_rows = max(block_rows, batch_size)
+    for start in range(0, len(df), block_rows):
+        rows = dataframe_to_rows(df.iloc[start:start + block_rows])
+        for i in range(0, len(rows), batch_size):
+            yield rows[i:i + batch_size]
+
+
+def partition_frame(df: pd.DataFrame, parts: int, key_columns: Optional[Sequence[str]] = None) -> List[pd.DataFrame]:
+    """Split a DataFrame into at most ``parts`` non-empty partitions.
+
+    With key columns, rows are assigned by a hash of those columns, so every
+    key lands in exactly one partition and keeps its row order there;
+    otherwise the frame is cut into contiguous slices of equal size.
+
+    Args:
+        df: DataFrame to split
+        parts: Number of partitions
+        key_columns: Columns to hash, typically the table's distribution key
+
+    Returns:
+        List of partitions; empty ones are dropped
+    """
+    parts = max(1, min(parts, len(df)))
+    if parts == 1:
+        return [df]
+    if key_columns:
+        hashes = pd.util.hash_pandas_object(df[list(key_columns)], index=False).to_numpy()
+        assignment = hashes % np.uint64(parts)
+        partitions = [df[assignment == i] for i in range(parts)]
+    else:
+        bounds = np.linspace(0, len(df), parts + 1).astype(int)
+        partitions = [df.iloc[start:stop] for start, stop in zip(bounds[:-1], bounds[1:])]
+    return [partition for partition in partitions if len(partition)]
+
+
+def to_db_value(value: Any) -> Any:
+    """Convert a single value the same way column_to_objects converts a column."""
+    if value is None:
+        return None
+    if isinstance(value, (list, tuple, dict, set, np.ndarray)):
+        return value
+    if pd.isna(value):
+        return None
+    if isinstance(value, pd.Timestamp):
+        return value.to_pydatetime()
+    if isinstance(value, pd.Timedelta):
+        return value.to_pytimedelta()
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
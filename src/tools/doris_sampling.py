@@ -0,0 +1,123 @@
+import json
+import math
+import re
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# z-score of the two-sided 95% confidence interval used for error bounds
+Z_95 = 1.96
+
+# Hash sampling keeps rows whose hash falls below fraction * HASH_BUCKETS.
+HASH_BUCKETS = 1000000
+
+# A plain scan of one table: no joins, subqueries, grouping or limits, so
+# sampling the base table samples the result rows uniformly as well.
+_SIMPLE_SCAN_RE = re.compile(
+    r"^\s*SELECT\s+(?P<select>.+?)\s+FROM\s+(?P<table>(?:`[^`]+`|[\w$]+)(?:\s*\.\s*(?:`[^`]+`|[\w$]+))?)"
+    r"(?P<rest>\s+(?:WHERE|ORDER)\b.*)?\s*$",
+    re.IGNORECASE | re.DOTALL,
+)
+
+# Doris versions without HISTOGRAM() fail with "Can not found function
+# 'histogram'" or "No matching function with signature: histogram(...)"
+_MISSING_HISTOGRAM_RE = re.compile(r"\bfunction\b.*\bhistogram\b", re.IGNORECASE | re.DOTALL)
+
+_UNSUPPORTED_RE = re.compile(
+    r"\b(?:JOIN|SELECT|GROUP|HAVING|LIMIT|UNION|DISTINCT|TABLESAMPLE)\b|\(\s*SELECT",
+    re.IGNORECASE,
+)
+
+
+def is_histogram_unsupported(error: BaseException) -> bool:
+    """Whether a sampled aggregate failed only because this Doris version lacks HISTOGRAM()."""
+    return _MISSING_HISTOGRAM_RE.search(str(error)) is not None
+
+
+def simple_scan_table(sql: str) -> Optional[Tuple[str, str]]:
+    """Return (table, rest-of-query) if sql is a plain single-table scan, else None.
+
+    Only such statements can be sampled with ``TABLESAMPLE``; anything else is
+    sampled by hashing the result rows.
+    """
+    match = _SIMPLE_SCAN_RE.match(sql.strip().rstrip(";"))
+    if match is None:
+        return None
+    if _UNSUPPORTED_RE.search(match.group("select")) or _UNSUPPORTED_RE.search(match.group("rest") or ""):
+        return None
+    return match.group("table"), match.group("rest") or ""
+
+
+def split_table_name(table: str) -> Tuple[Optional[str], str]:
+    """Split a possibly qualified, possibly quoted table name into (database, table)."""
+    parts = [part.strip().strip("`") for part in table.split(".")]
+    if len(parts) == 1:
+        return None, parts[0]
+    return parts[0], parts[1]
+
+
+def tablesample_clause(rows: int, seed: int) -> str:
+    return f"TABLESAMPLE({int(rows)} ROWS) REPEATABLE {int(seed)}"
+
+
+def tablesample_sql(sql: str, rows: int, seed: int) -> str:
+    """Rewrite a plain single-table scan to read only a tablet sample of about ``rows`` rows."""
+    parsed = simple_scan_table(sql)
+    if parsed is None:
+        raise ValueError("TABLESAMPLE only applies to a plain single-table SELECT")
+    table, rest = parsed
+    head = sql.strip().rstrip(";")
+    head = head[:len(head) - len(rest)] if rest else head
+    return f"{head} {tablesample_clause(rows, seed)}{rest}"
+
+
+def hash_sample_sql(sql: str, columns: Sequence[str], fraction: float) -> str:
+    """Wrap sql so that only rows whose content hash falls within ``fraction`` are kept.
+
+    Hashing the row instead of calling RAND() keeps the sample stable between
+    runs, so progressive refinement and the result cache see the same rows.
+    """
+    values = ", ".join(
+        "IFNULL(CAST(`" + name.replace("`", "``") + "` AS STRING), '')" for name in columns
+    )
+    threshold = max(1, int(round(fraction * HASH_BUCKETS)))
+    subquery = sql.strip().rstrip(";")
+    return (
+        f"SELECT * FROM ({subquery}) AS __sample "
+        f"WHERE ABS(MURMUR_HASH3_32(CONCAT_WS('|', {values}))) % {HASH_BUCKETS} < {threshold}"
+    )
+
+
+def scaled_count(count: float, fraction: float, z: float = Z_95) -> Tuple[float, float]:
+    """Scale a count observed in a Bernoulli sample to the full data.
+
+    Returns:
+        (estimate, half-width of the confidence interval)
+    """
+    if fraction >= 1:
+        return float(count), 0.0
+    estimate = count / fraction
+    margin = z * math.sqrt(count * (1 - fraction)) / fraction
+    return estimate, margin
+
+
+def mean_margin(stddev: Optional[float], count: int, fraction: float, z: float = Z_95) -> float:
+    """Half-width of the confidence interval of a sample mean (finite-population corrected)."""
+    if fraction >= 1 or not count or stddev is None:
+        return 0.0
+    return z * float(stddev) / math.sqrt(count) * math.sqrt(1 - fraction)
+
+
+def parse_histogram(value: Optional[str]) -> List[Dict[str, object]]:
+    """Parse the JSON returned by Doris ``HISTOGRAM()`` into a list of buckets."""
+    if not value:
+        return []
+    try:
+        data = json.loads(value)
+    except (TypeError, ValueError):
+        return []
+    return list(data.get("buckets") or [])
+
+
+def format_estimate(estimate: float, margin: float) -> str:
+    if margin <= 0:
+        return f"{estimate:.0f}"
+    return f"~{estimate:.0f} (±{margin:.0f}, 95% CI)"
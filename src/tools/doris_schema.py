@@ -0,0 +1,264 @@
+import math
+import re
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Doris tablets perform best at 1-10 GB; buckets are sized for the lower end
+# since agent-created tables mostly grow by appends.
+TARGET_BUCKET_BYTES = 1 << 30
+MAX_BUCKETS = 64
+
+# Longest VARCHAR; longer strings need STRING, which can't be a key column
+MAX_VARCHAR_BYTES = 65533
+MAX_DECIMAL_PRECISION = 38
+MAX_DECIMAL_SCALE = 6
+# Tables keep growing after the first batch: integers are at least INT, key
+# and id columns BIGINT, and DECIMALs get one of the two native precisions
+MIN_INTEGER_TYPE = "INT"
+ID_INTEGER_TYPE = "BIGINT"
+DECIMAL_PRECISIONS = (18, MAX_DECIMAL_PRECISION)
+
+_INTEGER_RANGES = (
+    ("TINYINT", -(1 << 7), (1 << 7) - 1, 1),
+    ("SMALLINT", -(1 << 15), (1 << 15) - 1, 2),
+    ("INT", -(1 << 31), (1 << 31) - 1, 4),
+    ("BIGINT", -(1 << 63), (1 << 63) - 1, 8),
+)
+
+# '$5,320 ', '-€1.234,00' is not supported: a comma is only a thousands separator
+_NUMBER_RE = r"[-+]?(?:\d{1,3}(?:,\d{3})+|\d+)(?:\.\d+)?"
+_CURRENCY_RE = re.compile(rf"\s*\(?\s*[-+]?[$€£¥]?\s*{_NUMBER_RE}\s*\)?\s*")
+_CURRENCY_CHARS_RE = re.compile(r"[$€£¥,\s()]")
+_CURRENCY_SYMBOL_RE = re.compile(r"[$€£¥]")
+# Amounts with a currency symbol keep cents even if the sample has none
+CURRENCY_SCALE = 2
+# Numeric-looking codes whose leading zeros must survive (zip codes, IDs)
+_LEADING_ZERO_RE = re.compile(r"\s*[-+]?0\d")
+# 'id', 'order_id', 'customerId'
+_ID_COLUMN_RE = re.compile(r"(?i:id|.*_id)|.*[a-z0-9]Id")
+
+_DATE_FORMATS = ("%Y-%m-%d", "%Y/%m/%d", "%d-%b-%y", "%d-%b-%Y", "%d %b %Y", "%b %d, %Y", "%m/%d/%Y", "%d/%m/%Y", "%d.%m.%Y")
+_DATETIME_FORMATS = ("%Y-%m-%d %H:%M:%S", "%Y-%m-%dT%H:%M:%S", "%Y/%m/%d %H:%M:%S", "%Y-%m-%d %H:%M", "ISO8601")
+
+# Values checked against a candidate format before the whole column is parsed
+_PROBE_ROWS = 200
+
+
+class InferredSchema:
+    """Column types, load-ready values and bucket count inferred for a DataFrame."""
+
+    __slots__ = ("columns", "frame", "estimated_bytes", "buckets")
+
+    def __init__(self, columns: List[Tuple[str, str]], frame: pd.DataFrame, estimated_bytes: int, buckets: int):
+        self.columns = columns
+        self.frame = frame
+        self.estimated_bytes = estimated_bytes
+        self.buckets = buckets
+
+    def column_definitions(self) -> str:
+        return ", ".join(f"`{name}` {sql_type}" for name, sql_type in self.columns)
+
+
+def integer_type(minimum: int, maximum: int, smallest: str = MIN_INTEGER_TYPE) -> Tuple[str, int]:
+    """Narrowest Doris integer type, no narrower than smallest, holding [minimum, maximum], with its width in bytes."""
+    candidates = [name for name, _, _, _ in _INTEGER_RANGES]
+    for sql_type, low, high, width in _INTEGER_RANGES[candidates.index(smallest):]:
+        if low <= minimum and maximum <= high:
+            return sql_type, width
+    return "LARGEINT", 16
+
+
+def is_id_column(name: object) -> bool:
+    """Whether a column name looks like an identifier ('id', 'order_id', 'customerId')."""
+    return _ID_COLUMN_RE.fullmatch(str(name)) is not None
+
+
+def decimal_scale(values: np.ndarray) -> Optional[int]:
+    """Smallest number of decimal places that represents every float exactly, None if above MAX_DECIMAL_SCALE."""
+    magnitude = np.maximum(np.abs(values), 1.0)
+    for scale in range(MAX_DECIMAL_SCALE + 1):
+        if np.all(np.abs(np.round(values, scale) - values) <= 1e-9 * magnitude):
+            return scale
+    return None
+
+
+def _numeric_type(values: pd.Series, min_scale: int = 0, identifier: bool = False) -> Tuple[str, pd.Series, int]:
+    """Type of a numeric column: an integer type if all values are whole, else DECIMAL or DOUBLE.
+
+    With min_scale, the column is a DECIMAL with at least that many decimal
+    places. Integer identifiers (key or id columns) are at least BIGINT.
+    """
+    smallest = ID_INTEGER_TYPE if identifier else MIN_INTEGER_TYPE
+    present = values.dropna()
+    if present.empty:
+        sql_type, width = integer_type(0, 0, smallest)
+        return sql_type, values, width
+    array = present.to_numpy(dtype=np.float64) if not pd.api.types.is_integer_dtype(present) else present.to_numpy()
+    if not min_scale and (pd.api.types.is_integer_dtype(present) or (
+        np.all(np.isfinite(array)) and np.all(array == np.round(array)) and np.abs(array).max() < 2 ** 53
+    )):
+        sql_type, width = integer_type(int(array.min()), int(array.max()), smallest)
+        if not pd.api.types.is_integer_dtype(values):
+            values = values.astype("Int64")
+        return sql_type, values, width
+    if not np.all(np.isfinite(array)):
+        return "DOUBLE", values, 8
+    scale = decimal_scale(array)
+    if scale is not None:
+        scale = max(scale, min_scale)
+        integer_digits = len(str(int(np.abs(array).max())))
+        # Keep the observed scale but leave room for larger amounts later;
+        # DECIMALV3 stores up to 18 digits in 8 bytes and up to 38 in 16
+        precision = next((p for p in DECIMAL_PRECISIONS if integer_digits + scale <= p), None)
+        if precision is not None:
+            return f"DECIMAL({precision}, {scale})", values, 8 if precision <= 18 else 16
+    return "DOUBLE", values, 8
+
+
+def parse_currency(strings: pd.Series) -> Optional[pd.Series]:
+    """Parse numbers written like '$5,320 ', '1,234.5' or '(12.00)'; None unless every value parses."""
+    if not strings.str.fullmatch(_CURRENCY_RE).all() or strings.str.match(_LEADING_ZERO_RE).any():
+        return None
+    negative = strings.str.contains("(", regex=False) | strings.str.contains("-", regex=False)
+    numbers = pd.to_numeric(strings.str.replace(_CURRENCY_CHARS_RE, "", regex=True).str.lstrip("-+"), errors="coerce")
+    if numbers.isna().any():
+        return None
+    return numbers.where(~negative, -numbers)
+
+
+def parse_dates(strings: pd.Series) -> Optional[Tuple[pd.Series, bool]]:
+    """Parse date or datetime strings; returns the values and whether they carry a time, None if any fails."""
+    probe = strings.iloc[:_PROBE_ROWS]
+    for formats, has_time in ((_DATE_FORMATS, False), (_DATETIME_FORMATS, True)):
+        for fmt in formats:
+            if pd.to_datetime(probe, format=fmt, errors="coerce").isna().any():
+                continue
+            parsed = pd.to_datetime(strings, format=fmt, errors="coerce")
+            if parsed.isna().any():
+                continue
+            if parsed.dt.tz is not None:
+                parsed = parsed.dt.tz_localize(None)
+            if has_time and (parsed == parsed.dt.normalize()).all():
+                has_time = False
+            return parsed, has_time
+    return None
+
+
+def _string_type(values: pd.Series, present: pd.Series, key: bool, identifier: bool) -> Tuple[str, pd.Series, int]:
+    strings = present.astype(str)
+    numbers = parse_currency(strings)
+    if numbers is not None:
+        money = strings.str.contains(_CURRENCY_SYMBOL_RE).any()
+        sql_type, parsed, width = _numeric_type(numbers, min_scale=CURRENCY_SCALE if money else 0, identifier=identifier)
+        return sql_type, parsed.reindex(values.index), width
+    dates = parse_dates(strings)
+    if dates is not None:
+        parsed, has_time = dates
+        parsed = parsed.reindex(values.index)
+        return ("DATETIME", parsed, 8) if has_time else ("DATE", parsed, 4)
+
+    # Doris VARCHAR lengths are in bytes
+    lengths = strings.str.encode("utf-8").str.len()
+    longest = int(lengths.max())
+    average = int(math.ceil(lengths.mean()))
+    if longest > MAX_VARCHAR_BYTES and not key:
+        return "STRING", values, average
+    # Headroom for later appends: the next power of two, at least 16
+    length = min(max(16, 1 << (longest - 1).bit_length()), MAX_VARCHAR_BYTES)
+    return f"VARCHAR({length})", values, average
+
+
+def infer_column(values: pd.Series, key: bool = False) -> Tuple[str, pd.Series, int]:
+    """Infer the Doris type of a column.
+
+    Returns:
+        SQL type, the column converted for loading (parsed dates and numbers),
+        and the estimated bytes per value
+    """
+    identifier = key or is_id_column(values.name)
+    dtype = values.dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        values = values.astype(object)
+        dtype = values.dtype
+    if pd.api.types.is_bool_dtype(dtype):
+        return "BOOLEAN", values, 1
+    if pd.api.types.is_datetime64_any_dtype(dtype):
+        present = values.dropna()
+        wall_clock = present.dt.tz_localize(None) if getattr(dtype, "tz", None) is not None else present
+        if len(present) and (wall_clock == wall_clock.dt.normalize()).all():
+            return "DATE", values, 4
+        return "DATETIME", values, 8
+    if pd.api.types.is_numeric_dtype(dtype):
+        return _numeric_type(values, identifier=identifier)
+
+    present = values.dropna()
+    if present.empty:
+        return "VARCHAR(255)", values, 0
+    kind = pd.api.types.infer_dtype(present, skipna=True)
+    if kind == "boolean":
+        return "BOOLEAN", values, 1
+    if kind in ("integer", "floating", "mixed-integer-float", "decimal"):
+        return _numeric_type(pd.to_numeric(values, errors="coerce"), identifier=identifier)
+    if kind == "date":
+        return "DATE", values, 4
+    if kind == "datetime":
+        return "DATETIME", pd.to_datetime(values), 8
+    if kind == "string":
+        return _string_type(values, present, key, identifier)
+    return "VARCHAR(255)", values, 16
+
+
+def bucket_count(estimated_bytes: int, bucket_bytes: int = TARGET_BUCKET_BYTES, max_buckets: int = MAX_BUCKETS) -> int:
+    return max(1, min(max_buckets, math.ceil(estimated_bytes / bucket_bytes)))
+
+
+def infer_schema(df: pd.DataFrame, key_columns: Sequence[str] = (),
+                 bucket_bytes: int = TARGET_BUCKET_BYTES) -> InferredSchema:
+    """Scan a DataFrame and choose a compact Doris type for every column.
+
+    Integers get INT unless their range needs more (BIGINT for key and id
+    columns), fractional numbers a DECIMAL(18 or 38, scale) when a few
+    decimal places represent them exactly, and strings that all parse as
+    currency amounts or dates are converted. The bucket count follows the
+    estimated size of the data.
+    """
+    columns = []
+    converted = {}
+    row_bytes = 0
+    for name in df.columns:
+        sql_type, values, width = infer_column(df[name], key=name in key_columns)
+        columns.append((str(name), sql_type))
+        converted[name] = values
+        row_bytes += width
+    frame = pd.DataFrame(converted, index=df.index)
+    estimated_bytes = row_bytes * len(df)
+    return InferredSchema(columns, frame, estimated_bytes, bucket_count(estimated_bytes, bucket_bytes))
+
+
+def coerce_to_types(df: pd.DataFrame, column_types: Dict[str, str]) -> pd.DataFrame:
+    """Parse string columns of df into the numeric or date type of an existing table's column.
+
+    Columns whose strings don't all parse, or whose table type is a string,
+    are left as they are.
+    """
+    coerced = {}
+    for name, sql_type in column_types.items():
+        if name not in df.columns or not pd.api.types.is_string_dtype(df[name].dtype):
+            continue
+        base = sql_type.split("(")[0].strip().upper()
+        present = df[name].dropna()
+        if present.empty or pd.api.types.infer_dtype(present, skipna=True) != "string":
+            continue
+        strings = present.astype(str)
+        if base in ("TINYINT", "SMALLINT", "INT", "BIGINT", "LARGEINT", "DECIMAL", "DECIMALV3", "FLOAT", "DOUBLE"):
+            parsed = parse_currency(strings)
+        elif base in ("DATE", "DATEV2", "DATETIME", "DATETIMEV2"):
+            dates = parse_dates(strings)
+            parsed = dates[0] if dates is not None else None
+        else:
+            continue
+        if parsed is not None:
+            coerced[name] = parsed.reindex(df.index)
+    return df.assign(**coerced) if coerced else df
@@ -0,0 +1,73 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+class SingleFlight:
+    """Coalesce concurrent calls with the same key into one execution.
+
+    The first caller for a key (the leader) runs the function; callers that
+    arrive while it is still running wait for the leader and receive the same
+    result or exception. Nothing is kept once the call finishes, so this is
+    not a cache. Threaded callers use ``do``, asyncio callers ``do_async``,
+    and both share the same in-flight calls.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+        self._executions = 0
+        self._coalesced = 0
+
+    def _join(self, key: Hashable) -> Tuple[Future, bool]:
+        """Return the in-flight future for key and whether the caller is its leader."""
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                self._coalesced += 1
+                return future, False
+            future = Future()
+            self._calls[key] = future
+            self._executions += 1
+            return future, True
+
+    def _run(self, key: Hashable, future: Future, fn: Callable[[], Any]) -> Any:
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                if self._calls.get(key) is future:
+                    del self._calls[key]
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """Run fn, or wait for an identical in-flight call, and return its result."""
+        future, leader = self._join(key)
+        if not leader:
+            return future.result()
+        return self._run(key, future, fn)
+
+    async def do_async(self, key: Hashable, fn: Callable[[], Any], executor: Optional[Any] = None) -> Any:
+        """Async variant of ``do``; the blocking fn runs in ``executor`` (default: the loop's)."""
+        future, leader = self._join(key)
+        if not leader:
+            return await asyncio.wrap_future(future)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, self._run, key, future, fn)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return executions, coalesced (saved) executions and calls in flight."""
+        with self._lock:
+            requests = self._executions + self._coalesced
+            return {
+                "executions": self._executions,
+                "coalesced": self._coalesced,
+                "in_flight": len(self._calls),
+                "saved_ratio": self._coalesced / requests if requests else 0.0,
+            }
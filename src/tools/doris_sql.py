@@ -0,0 +1,253 @@
+import re
+from functools import lru_cache
+from typing import FrozenSet, List, Tuple
+
+READ = "read"
+WRITE = "write"
+DDL = "ddl"
+OTHER = "other"
+
+# Later entries win when a batch mixes statement kinds
+_SEVERITY = {READ: 0, OTHER: 1, WRITE: 2, DDL: 3}
+
+_KEYWORD_KINDS = {
+    "SELECT": READ, "SHOW": READ, "DESC": READ, "DESCRIBE": READ, "EXPLAIN": READ, "HELP": READ,
+    "INSERT": WRITE, "UPDATE": WRITE, "DELETE": WRITE, "REPLACE": WRITE, "MERGE": WRITE, "LOAD": WRITE,
+    "CREATE": DDL, "ALTER": DDL, "DROP": DDL, "TRUNCATE": DDL, "RENAME": DDL, "RECOVER": DDL,
+    "GRANT": DDL, "REVOKE": DDL,
+}
+
+# Quoted strings/identifiers are matched first so whitespace and comment
+# handling never touches their contents.
+_TOKEN_RE = re.compile(
+    r"""('(?:[^'\\]|\\.|'')*'|"(?:[^"\\]|\\.|"")*"|`[^`]*`)"""
+    r"""|((?:\s|--[^\n]*|#[^\n]*|/\*.*?\*/)+)""",
+    re.DOTALL,
+)
+
+_TABLE_RE = re.compile(
+    r"\b(?:FROM|JOIN|INTO|UPDATE|TABLE|EXISTS)\s+((?:`[^`]+`|[\w$]+)(?:\s*\.\s*(?:`[^`]+`|[\w$]+))?)",
+    re.IGNORECASE,
+)
+
+_CTE_RE = re.compile(
+    r"(?:\bWITH\s+(?:RECURSIVE\s+)?|,\s*)(`[^`]+`|[\w$]+)\s*(?:\([^()]*\)\s*)?AS\s*\(",
+    re.IGNORECASE,
+)
+
+_WORD_RE = re.compile(r"`[^`]*`|[\w$]+|[()]")
+
+# Names, dots, commas and parens: enough to walk a comma-separated FROM list
+_REF_TOKEN_RE = re.compile(r"`[^`]*`|[\w$]+|[().,]")
+
+# Words that end a FROM list item; anything else after the table is an alias,
+# PARTITION/TABLET clause and the like
+_FROM_LIST_END = frozenset((
+    "WHERE", "GROUP", "ORDER", "HAVING", "LIMIT", "QUALIFY", "WINDOW", "UNION", "INTERSECT", "EXCEPT", "MINUS",
+    "JOIN", "INNER", "LEFT", "RIGHT", "FULL", "CROSS", "NATURAL", "SEMI", "ANTI", "ON", "USING", "LATERAL",
+    "INTO", "SET", "VALUES", "SELECT",
+))
+
+# INTO targets that are files on the BE or broker, not tables
+_FILE_TARGETS = ("OUTFILE", "DUMPFILE")
+
+# SET forms that change the server or a user rather than the current session
+_NON_SESSION_SET = ("GLOBAL", "PASSWORD", "PROPERTY", "LDAP_ADMIN_PASSWORD", "DEFAULT")
+
+_NON_DETERMINISTIC_RE = re.compile(
+    r"\b(?:now|rand|random|uuid|uuid_numeric|curdate|curtime|sysdate|unix_timestamp|utc_timestamp"
+    r"|current_timestamp|current_date|current_time|localtime|localtimestamp)\s*\("
+    # The SQL-standard forms are also valid without parentheses
+    r"|(?<!`)\b(?:current_timestamp|current_date|current_time|localtime|localtimestamp)\b(?!`)",
+    re.IGNORECASE,
+)
+
+_LITERAL_RE = re.compile(r"""(`[^`]*`)|'(?:[^'\\]|\\.|'')*'|"(?:[^"\\]|\\.|"")*"|\b\d+(?:\.\d+)?(?:[eE][-+]?\d+)?\b""")
+_IN_LIST_RE = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+
+
+def normalize_sql(sql: str) -> str:
+    """Collapse whitespace and strip comments and trailing semicolons.
+
+    String literals and quoted identifiers are left untouched, and case is
+    preserved because Doris table names are case-sensitive.
+    """
+    def replace(match: re.Match) -> str:
+        if match.group(1) is not None:
+            return match.group(1)
+        return " "
+
+    return _TOKEN_RE.sub(replace, sql).strip().rstrip(";").strip()
+
+
+def fingerprint_sql(normalized: str) -> str:
+    """Replace literals with '?' and IN lists with a single '?' so queries differing only in constants match."""
+    text = _LITERAL_RE.sub(lambda m: m.group(1) or "?", normalized)
+    return _IN_LIST_RE.sub("(?)", text)
+
+
+def qualify_table(table: str, database: str) -> str:
+    """Qualify a table name as lowercase 'db.table'."""
+    parts = [part.strip().strip("`") for part in table.split(".")]
+    if len(parts) == 1:
+        parts.insert(0, database)
+    return ".".join(parts).lower()
+
+
+def _strip_literals(sql: str) -> str:
+    return _TOKEN_RE.sub(lambda m: m.group(0) if m.group(0).startswith("`") else " ", sql)
+
+
+def _split_statements(stripped: str) -> Tuple[str, ...]:
+    return tuple(part.strip() for part in stripped.split(";") if part.strip())
+
+
+def _writes_file(statement: str) -> bool:
+    """Whether the statement is a SELECT ... INTO OUTFILE export."""
+    words = [word.upper() for word in _WORD_RE.findall(statement)]
+    return any(word == "INTO" and following in _FILE_TARGETS for word, following in zip(words, words[1:]))
+
+
+def _changes_session(statement: str) -> bool:
+    """Whether the statement changes session state: a session variable, the database or the catalog."""
+    words = [word.upper() for word in _WORD_RE.findall(statement)[:2]]
+    if not words:
+        return False
+    if words[0] in ("USE", "SWITCH"):
+        return True
+    return words[0] == "SET" and (len(words) < 2 or words[1] not in _NON_SESSION_SET)
+
+
+def _statement_kind(statement: str) -> Tuple[str, bool]:
+    """Classify one statement by its leading keyword; also whether it is a query (SELECT)."""
+    words = [word.upper() for word in _WORD_RE.findall(statement) if word != "("]
+    if not words:
+        return OTHER, False
+    if words[0] in ("SELECT", "WITH") and _writes_file(statement):
+        # Exports write files and return a summary row, not the query result
+        return WRITE, False
+    if words[0] == "WITH":
+        # The statement after the CTE list decides: the first keyword at paren depth 0
+        depth = 0
+        for word in _WORD_RE.findall(statement)[1:]:
+            if word == "(":
+                depth += 1
+            elif word == ")":
+                depth -= 1
+            elif depth == 0 and word.upper() in ("SELECT", "INSERT", "UPDATE", "DELETE", "MERGE"):
+                kind = _KEYWORD_KINDS[word.upper()]
+                return kind, kind == READ
+        return READ, True
+    kind = _KEYWORD_KINDS.get(words[0], OTHER)
+    return kind, words[0] == "SELECT"
+
+
+def _comma_joined(statement: str) -> List[str]:
+    """Table references after the first one in comma-separated FROM lists (``FROM t1, t2``)."""
+    tokens = _REF_TOKEN_RE.findall(statement)
+    names = []
+    i = 0
+    while i < len(tokens):
+        if tokens[i].upper() != "FROM":
+            i += 1
+            continue
+        # Walk the FROM list at its own paren depth; nested FROMs are found by the outer loop
+        depth = 0
+        i += 1
+        while i < len(tokens):
+            token = tokens[i]
+            if token == "(":
+                depth += 1
+            elif token == ")":
+                depth -= 1
+                if depth < 0:
+                    break
+            elif depth == 0 and token.upper() in _FROM_LIST_END:
+                break
+            elif depth == 0 and token == "," and i + 1 < len(tokens) and tokens[i + 1] != "(":
+                name = tokens[i + 1]
+                if i + 3 < len(tokens) and tokens[i + 2] == ".":
+                    name += "." + tokens[i + 3]
+                names.append(name)
+            i += 1
+    return names
+
+
+def _tokenizer_tables(statement: str) -> FrozenSet[str]:
+    ctes = {name.strip("`").lower() for name in _CTE_RE.findall(statement)}
+    tables = set()
+    words = _WORD_RE.findall(statement)
+    if words and words[0].upper() in ("DESC", "DESCRIBE") and len(words) > 1:
+        tables.add(words[1].strip("`"))
+    references = [match.group(1) for match in _TABLE_RE.finditer(statement)] + _comma_joined(statement)
+    for reference in references:
+        parts = [part.strip().strip("`") for part in reference.split(".")]
+        if parts[-1].upper() in ("SELECT", "IF", "LATERAL") + _FILE_TARGETS:
+            continue
+        if len(parts) == 1 and parts[0].lower() in ctes:
+            continue
+        tables.add(".".join(parts))
+    return frozenset(tables)
+
+
+class SqlInfo:
+    """Result of analyze_sql: classification, referenced tables and fingerprint of a SQL text."""
+
+    __slots__ = ("normalized", "fingerprint", "kind", "statement_kinds", "is_query", "tables", "deterministic",
+                 "changes_session")
+
+    def __init__(self, normalized: str, fingerprint: str, kind: str, statement_kinds: Tuple[str, ...],
+                 is_query: bool, tables: FrozenSet[str], deterministic: bool, changes_session: bool = False):
+        self.normalized = normalized
+        self.fingerprint = fingerprint
+        self.kind = kind
+        self.statement_kinds = statement_kinds
+        self.is_query = is_query
+        self.tables = tables
+        self.deterministic = deterministic
+        self.changes_session = changes_session
+
+    @property
+    def is_read(self) -> bool:
+        """True only if every statement in the text is a read."""
+        return self.kind == READ
+
+    @property
+    def is_multi_statement(self) -> bool:
+        return len(self.statement_kinds) > 1
+
+    def qualified_tables(self, database: str) -> FrozenSet[str]:
+        """Referenced tables as lowercase 'db.table', unqualified names qualified with database."""
+        return frozenset(qualify_table(table, database) for table in self.tables)
+
+
+@lru_cache(maxsize=4096)
+def analyze_sql(sql: str) -> SqlInfo:
+    """Parse sql once and describe it; results are memoized in an LRU.
+
+    A tokenizer that ignores comments and literals does the parsing; it
+    covers the statements agents send rather than the full Doris grammar.
+    Comments, CTEs (``WITH ... SELECT`` vs ``WITH ... INSERT``) and
+    multi-statement batches are classified by what they actually do; a
+    batch is as severe as its most severe statement (ddl > write > other > read).
+    """
+    normalized = normalize_sql(sql)
+    stripped = _strip_literals(normalized)
+    statements = _split_statements(stripped)
+
+    classified = [_statement_kind(statement) for statement in statements]
+    statement_kinds = tuple(kind for kind, _ in classified)
+    tables = frozenset().union(*(_tokenizer_tables(statement) for statement in statements))
+
+    kind = max(statement_kinds, key=_SEVERITY.__getitem__) if statement_kinds else OTHER
+    is_query = len(classified) == 1 and classified[0][1]
+    return SqlInfo(
+        normalized=normalized,
+        fingerprint=fingerprint_sql(normalized),
+        kind=kind,
+        statement_kinds=statement_kinds,
+        is_query=is_query,
+        tables=tables,
+        deterministic=_NON_DETERMINISTIC_RE.search(stripped) is None,
+        changes_session=any(_changes_session(statement) for statement in statements),
+    )
@@ -0,0 +1,243 @@
+import base64
+import csv
+import http.client
+import json
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional, Sequence
+from urllib.parse import urlsplit
+
+import pandas as pd
+
+from agno.utils.log import log_debug, log_info
+
+
+class StreamLoadError(Exception):
+    """Raised when a Stream Load request fails.
+
+    Attributes:
+        loaded_rows: Number of leading DataFrame rows that were loaded
+            successfully before the failure, so callers can resume from there.
+        response: Parsed Stream Load response body, if one was received.
+    """
+
+    def __init__(self, message: str, loaded_rows: int = 0, response: Optional[Dict[str, Any]] = None):
+        super().__init__(message)
+        self.loaded_rows = loaded_rows
+        self.response = response
+
+
+class DorisStreamLoader:
+    """Bulk-load pandas DataFrames into Doris through the Stream Load HTTP API.
+
+    The DataFrame is serialized in memory one chunk at a time and PUT to
+    ``/api/{db}/{table}/_stream_load``. The FE answers with a 307 redirect to a
+    BE, which is followed with the credentials preserved. Every chunk carries
+    its own label derived from the load label, so retrying a chunk after a
+    network error never loads it twice.
+    """
+
+    SUCCESS_STATUSES = ("Success", "Publish Timeout")
+
+    def __init__(
+        self,
+        host: str,
+        http_port: int,
+        user: str,
+        password: str,
+        database: str,
+        data_format: str = "json",
+        timeout: float = 600.0,
+        max_retries: int = 2,
+        max_redirects: int = 3,
+        frontend_hosts: Optional[Callable[[], Sequence[str]]] = None,
+    ):
+        """Initialize the loader.
+
+        Args:
+            host: FE (or BE) host serving the HTTP API
+            http_port: FE http_port (usually 8030) or BE webserver_port (usually 8040)
+            user: Username for authentication
+            password: Password for authentication
+            database: Target database
+            data_format: Wire format, 'json' (JSON lines) or 'csv'
+            timeout: Socket timeout for a single request in seconds
+            max_retries: Retries per chunk on network errors
+            max_redirects: Maximum number of redirects to follow
+            frontend_hosts: Returns the FE hosts to send loads to, preferred first; a chunk
+                whose request fails moves on to the next one. Defaults to host alone.
+        """
+        if data_format not in ("json", "csv"):
+            raise ValueError(f"Unsupported Stream Load format: {data_format}. Must be 'json' or 'csv'.")
+
+        self.host = host
+        self.http_port = http_port
+        self.user = user
+        self.password = password
+        self.database = database
+        self.data_format = data_format
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.max_redirects = max_redirects
+        self.frontend_hosts = frontend_hosts
+
+    def load_dataframe(
+        self,
+        table: str,
+        df: pd.DataFrame,
+        label: Optional[str] = None,
+        chunk_rows: int = 100_000,
+    ) -> Dict[str, Any]:
+        """Load a DataFrame into an existing table.
+
+        Args:
+            table: Target table
+            df: DataFrame whose columns match the table columns by name
+            label: Load label; chunk labels are '{label}_{n}'. Generated if omitted.
+            chunk_rows: Rows serialized and sent per request
+
+        Returns:
+            Dictionary with loaded row count, chunk labels, bytes sent and elapsed seconds
+
+        Raises:
+            StreamLoadError: If a chunk fails; ``loaded_rows`` tells how far the load got
+        """
+        label = label or f"data_agent_{table}_{uuid.uuid4().hex}"
+        start = time.monotonic()
+        loaded_rows = 0
+        bytes_sent = 0
+        labels: List[str] = []
+
+        for chunk_index, offset in enumerate(range(0, len(df), chunk_rows)):
+            chunk = df.iloc[offset:offset + chunk_rows]
+            chunk_label = f"{label}_{chunk_index}"
+
+            try:
+                body = self.serialize(chunk)
+                self._load_chunk(table, chunk, body, chunk_label)
+            except StreamLoadError as e:
+                e.loaded_rows = loaded_rows
+                raise
+            except (csv.Error, ValueError) as e:
+                raise StreamLoadError(f"Could not serialize chunk {chunk_index} for Stream Load: {e}", loaded_rows) from e
+
+            loaded_rows += len(chunk)
+            bytes_sent += len(body)
+            labels.append(chunk_label)
+
+        elapsed = time.monotonic() - start
+        log_info(f"Stream Load finished: {loaded_rows} rows, {bytes_sent} bytes into {table} in {elapsed:.2f}s")
+        return {"rows": loaded_rows, "labels": labels, "bytes": bytes_sent, "elapsed": elapsed}
+
+    def serialize(self, df: pd.DataFrame) -> bytes:
+        """Serialize a DataFrame chunk into the configured wire format."""
+        df = self._format_temporal_columns(df)
+        if self.data_format == "json":
+            return df.to_json(orient="records", lines=True, force_ascii=False).encode("utf-8")
+
+        # Control characters as separators avoid quoting and escaping entirely;
+        # values that contain them make csv raise and the load falls back.
+        return df.to_csv(
+            sep="\x01",
+            header=False,
+            index=False,
+            na_rep="\\N",
+            lineterminator="\x02",
+            quoting=csv.QUOTE_NONE,
+            quotechar="\x03",
+        ).encode("utf-8")
+
+    def _format_temporal_columns(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Render datetime columns the way Doris parses DATE/DATETIME values."""
+        temporal = [col for col, dtype in df.dtypes.items() if pd.api.types.is_datetime64_any_dtype(dtype)]
+        if not temporal:
+            return df
+        df = df.copy()
+        for col in temporal:
+            df[col] = df[col].dt.strftime("%Y-%m-%d %H:%M:%S")
+        return df
+
+    def _headers(self, df: pd.DataFrame, label: str) -> Dict[str, str]:
+        token = base64.b64encode(f"{self.user}:{self.password}".encode("utf-8")).decode("ascii")
+        headers = {
+            "Authorization": f"Basic {token}",
+            "Expect": "100-continue",
+            "label": label,
+            "format": self.data_format,
+        }
+        if self.data_format == "json":
+            headers["read_json_by_line"] = "true"
+        else:
+            headers["column_separator"] = "\\x01"
+            headers["line_delimiter"] = "\\x02"
+            headers["columns"] = ",".join(f"`{col}`" for col in df.columns)
+        return headers
+
+    def _load_chunk(self, table: str, df: pd.DataFrame, body: bytes, label: str) -> Dict[str, Any]:
+        headers = self._headers(df, label)
+        path = f"/api/{self.database}/{table}/_stream_load"
+
+        hosts = self._hosts()
+        attempt = 0
+        while True:
+            host = hosts[attempt % len(hosts)]
+            try:
+                result = self._put(host, self.http_port, path, headers, body)
+                break
+            except (OSError, http.client.HTTPException) as e:
+                attempt += 1
+                # Every FE gets a try even with fewer retries; the label keeps retries idempotent
+                if attempt > max(self.max_retries, len(hosts) - 1):
+                    raise StreamLoadError(f"Stream Load request failed for label {label}: {e}") from e
+                log_debug(f"Stream Load attempt {attempt} for label {label} on {host} failed: {e}. Retrying.")
+                if attempt % len(hosts) == 0:
+                    # Back off once all FEs have failed
+                    time.sleep(min(2 ** (attempt // len(hosts)), 10))
+
+        status = result.get("Status")
+        if status in self.SUCCESS_STATUSES:
+            return result
+        if status == "Label Already Exists" and result.get("ExistingJobStatus") == "FINISHED":
+            # A previous attempt with this label already committed the chunk.
+            log_debug(f"Stream Load label {label} already finished, skipping chunk")
+            return result
+
+        message = result.get("Message") or status or "unknown error"
+        error_url = result.get("ErrorURL")
+        if error_url:
+            message = f"{message} (see {error_url})"
+        raise StreamLoadError(f"Stream Load failed for label {label}: {message}", response=result)
+
+    def _hosts(self) -> List[str]:
+        if self.frontend_hosts is None:
+            return [self.host]
+        # Several FEs may share a host on different query ports; the HTTP port is the same
+        hosts = list(dict.fromkeys(self.frontend_hosts()))
+        return hosts or [self.host]
+
+    def _put(self, host: str, port: int, path: str, headers: Dict[str, str], body: bytes) -> Dict[str, Any]:
+        for _ in range(self.max_redirects + 1):
+            conn = http.client.HTTPConnection(host, port, timeout=self.timeout)
+            try:
+                conn.request("PUT", path, body=body, headers=headers)
+                response = conn.getresponse()
+                payload = response.read()
+                if response.status in (301, 302, 307, 308):
+                    location = urlsplit(response.getheader("Location", ""))
+                    host = location.hostname or host
+                    port = location.port or port
+                    path = location.path + (f"?{location.query}" if location.query else "")
+                    continue
+            finally:
+                conn.close()
+
+            if response.status != 200:
+                raise StreamLoadError(
+                    f"Stream Load HTTP {response.status}: {payload.decode('utf-8', errors='replace')[:500]}"
+                )
+            try:
+                return json.loads(payload)
+            except ValueError:
+                raise StreamLoadError(f"Invalid Stream Load response: {payload[:500]!r}")
+
+        raise StreamLoadError(f"Too many redirects while loading {path}")
@@ -0,0 +1,164 @@
+"""公共测试工具和夹具。
+
+Doris 相关测试不连接真实集群：``fake_doris`` 夹具把 ``pymysql.connect``
+替换为内存中的假连接，记录执行过的 SQL，并按预设规则返回结果。
+"""
+import itertools
+import os
+import sys
+from typing import Any, Callable, List, Tuple, Union
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pymysql  # noqa: E402
+from pymysql.converters import escape_item  # noqa: E402
+from pymysql.cursors import DictCursor  # noqa: E402
+
+Response = Union[List[dict], Exception, Callable[[str], Any]]
+
+
+class FakeCursor:
+    """Cursor answering statements from the fake server's responses."""
+
+    def __init__(self, connection: "FakeConnection", cursor_class: type = None):
+        self.connection = connection
+        self.rowcount = 0
+        self.description = None
+        self.max_stmt_length = 1024000
+        self._rows: List[dict] = []
+        self._as_dict = cursor_class is None or issubclass(cursor_class, DictCursor)
+
+    def execute(self, sql: str, args: Any = None) -> int:
+        server = self.connection.server
+        server.statements.append((self.connection.id, sql, args))
+        self._rows, self.rowcount, self.description = [], 1, None
+        for predicate, response in server.responses:
+            if predicate(sql):
+                rows = response(sql) if callable(response) else response
+                if isinstance(rows, Exception):
+                    raise rows
+                self._rows = list(rows)
+                self.rowcount = len(self._rows)
+                if self._rows:
+                    self.description = [(name, 253, None, None, None, None, True) for name in self._rows[0]]
+                break
+        for predicate, description in server.descriptions:
+            if predicate(sql):
+                self.description = description
+                break
+        return self.rowcount
+
+    def executemany(self, sql: str, args: Any) -> int:
+        args = list(args)
+        server = self.connection.server
+        if server.executemany_error is not None:
+            error = server.executemany_error(sql, args)
+            if error is not None:
+                raise error
+        server.statements.append((self.connection.id, sql, args))
+        self.rowcount = len(args)
+        return self.rowcount
+
+    def _convert(self, rows: List[dict]) -> list:
+        return rows if self._as_dict else [tuple(row.values()) for row in rows]
+
+    def fetchall(self) -> list:
+        rows, self._rows = self._rows, []
+        return self._convert(rows)
+
+    def fetchone(self):
+        if not self._rows:
+            return None
+        return self._convert([self._rows.pop(0)])[0]
+
+    def fetchmany(self, size: int) -> list:
+        rows, self._rows = self._rows[:size], self._rows[size:]
+        return self._convert(rows)
+
+    def close(self) -> None:
+        pass
+
+
+class FakeConnection:
+    # Enough for PyMySQL's own cursors to render statements
+    encoding = "utf8"
+
+    def __init__(self, server: "FakeDoris", **kwargs):
+        self.server = server
+        self.id = next(server.ids)
+        self.host = kwargs.get("host")
+        self.port = kwargs.get("port")
+        self.open = True
+        self.pings = 0
+
+    def escape(self, value: Any, mapping: Any = None) -> str:
+        return escape_item(value, "utf8mb4", mapping)
+
+    def cursor(self, cursor_class: type = None) -> FakeCursor:
+        return FakeCursor(self, cursor_class)
+
+    def commit(self) -> None:
+        self.server.statements.append((self.id, "COMMIT", None))
+
+    def rollback(self) -> None:
+        pass
+
+    def ping(self, reconnect: bool = False) -> None:
+        self.pings += 1
+        if not self.open:
+            raise pymysql.err.InterfaceError(0, "")
+
+    def thread_id(self) -> int:
+        return 1000 + self.id
+
+    def close(self) -> None:
+        self.open = False
+
+
+class FakeDoris:
+    """In-memory stand-in for a Doris FE reached through pymysql."""
+
+    def __init__(self):
+        self.ids = itertools.count(1)
+        self.statements: List[Tuple[int, str, Any]] = []
+        self.responses: List[Tuple[Callable[[str], bool], Response]] = []
+        self.descriptions: List[Tuple[Callable[[str], bool], list]] = []
+        self.executemany_error: Callable[[str, list], Any] = None
+
+    def connect(self, **kwargs) -> FakeConnection:
+        return FakeConnection(self, **kwargs)
+
+    def respond(self, prefix: str, response: Response) -> None:
+        """Answer statements starting with prefix; earlier rules win."""
+        self.responses.append((lambda sql: sql.lstrip().startswith(prefix), response))
+
+    def describe(self, prefix: str, columns: List[Tuple[str, int]]) -> None:
+        """Report (name, type_code) result columns for statements starting with prefix, even without rows."""
+        description = [(name, type_code, None, None, None, None, True) for name, type_code in columns]
+        self.descriptions.append((lambda sql: sql.lstrip().startswith(prefix), description))
+
+    def sqls(self) -> List[str]:
+        return [str(sql) for _, sql, _ in self.statements]
+
+    def clear(self) -> None:
+        self.statements.clear()
+
+
+@pytest.fixture
+def fake_doris(monkeypatch) -> FakeDoris:
+    server = FakeDoris()
+    monkeypatch.setattr(pymysql, "connect", server.connect)
+    return server
+
+
+@pytest.fixture
+def tools(fake_doris):
+    """DorisTools on the fake server, with the statements of its setup cleared."""
+    from src.tools.doris import DorisTools
+
+    doris = DorisTools(host="fe", database="db")
+    fake_doris.clear()
+    yield doris
+    doris.close()
@@ -0,0 +1,77 @@
+import pymysql
+import pytest
+from pymysql.constants import FIELD_TYPE
+
+pytestmark = pytest.mark.unit
+
+SQL = "SELECT amount, city FROM orders"
+
+
+@pytest.fixture
+def schema(fake_doris):
+    fake_doris.describe("SELECT * FROM (", [("amount", FIELD_TYPE.LONG), ("city", FIELD_TYPE.VAR_STRING)])
+
+
+def test_pushdown_fetches_one_summary_row(tools, fake_doris, schema):
+    fake_doris.respond("SELECT COUNT(*) AS `__rows`", [{
+        "__rows": 3,
+        "c0_nulls": 0, "c0_min": 1, "c0_max": 9, "c0_mean": 4.0,
+        "c1_nulls": 1, "c1_distinct": 2, "c1_top": '{"上海": 2}',
+    }])
+
+    result = tools.analyze_data(SQL + ";")
+
+    assert fake_doris.sqls() == [
+        f"SELECT * FROM ({SQL}) AS __analyze LIMIT 0",
+        "SELECT COUNT(*) AS `__rows`, "
+        "SUM(CASE WHEN `amount` IS NULL THEN 1 ELSE 0 END) AS `c0_nulls`, "
+        "MIN(`amount`) AS `c0_min`, MAX(`amount`) AS `c0_max`, AVG(`amount`) AS `c0_mean`, "
+        "SUM(CASE WHEN `city` IS NULL THEN 1 ELSE 0 END) AS `c1_nulls`, "
+        "APPROX_COUNT_DISTINCT(`city`) AS `c1_distinct`, "
+        f"TOPN(CAST(`city` AS STRING), 1) AS `c1_top` FROM ({SQL}) AS __analyze",
+    ]
+    assert "Rows: 3" in result
+    assert "Columns: amount, city" in result
+    assert "amount:\n  Min: 1\n  Max: 9\n  Mean: 4.0\n  Null count: 0" in result
+    assert "city:\n  Unique values: 2\n  Most common: 上海\n  Null count: 1" in result
+
+
+def test_pushdown_quotes_column_names(tools, fake_doris):
+    fake_doris.describe("SELECT * FROM (", [("a`b", FIELD_TYPE.LONG)])
+    fake_doris.respond("SELECT COUNT(*)", [{"__rows": 0}])
+
+    assert tools.analyze_data("SELECT 1 AS `a``b`") == "No data to analyze."
+    assert "MIN(`a``b`) AS `c0_min`" in fake_doris.sqls()[-1]
+
+
+def test_pushdown_without_columns(tools, fake_doris):
+    assert tools.analyze_data(SQL) == "No data to analyze."
+    assert not any(sql.startswith("SELECT COUNT(*)") for sql in fake_doris.sqls())
+
+
+def test_pushdown_falls_back_to_local(tools, fake_doris, schema):
+    fake_doris.respond("SELECT COUNT(*)", pymysql.err.OperationalError(1105, "Can not found function 'TOPN'"))
+    fake_doris.respond(SQL, [{"amount": 1, "city": "上海"}, {"amount": 3, "city": "上海"}])
+
+    result = tools.analyze_data(SQL)
+
+    assert fake_doris.sqls()[-1].startswith(SQL)
+    assert "Rows: 2" in result
+    assert "Most common: 上海" in result
+
+
+def test_pushdown_timeout_is_not_retried_locally(tools, fake_doris, schema):
+    fake_doris.respond("SELECT @@query_timeout", [{"query_timeout": 900}])
+    fake_doris.respond("SELECT COUNT(*)", pymysql.err.OperationalError(3024, "query timeout"))
+
+    result = tools.analyze_data(SQL, timeout=5)
+
+    assert result.startswith("Query error (timeout)")
+    assert not any(sql.startswith(SQL) for sql in fake_doris.sqls())
+
+
+def test_local_mode_skips_pushdown(tools, fake_doris, schema):
+    fake_doris.respond(SQL, [{"amount": 1, "city": "北京"}])
+
+    assert "Rows: 1" in tools.analyze_data(SQL, mode="local")
+    assert not any("__analyze" in sql for sql in fake_doris.sqls())
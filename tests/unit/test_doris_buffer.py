@@ -0,0 +1,167 @@
+import time
+
+import pymysql
+import pytest
+
+from src.tools.doris import DorisTools
+from src.tools.doris_buffer import PartialWriteError, WriteBuffer
+
+pytestmark = pytest.mark.unit
+
+
+class TransientError(Exception):
+    pass
+
+
+class Writer:
+    """Records writes and fails the next ones with the queued errors."""
+
+    def __init__(self, *errors):
+        self.errors = list(errors)
+        self.writes = []
+
+    def __call__(self, table, rows):
+        if self.errors:
+            raise self.errors.pop(0)
+        self.writes.append((table, [row["id"] for row in rows]))
+        return len(rows)
+
+
+def make_buffer(writer, **kwargs):
+    kwargs.setdefault("max_delay", 60.0)
+    return WriteBuffer(writer, retryable=lambda e: isinstance(e, TransientError), **kwargs)
+
+
+def rows(*ids):
+    return [{"id": i} for i in ids]
+
+
+def test_flushes_at_max_rows():
+    writer = Writer()
+    buffer = make_buffer(writer, max_rows=3)
+    try:
+        assert buffer.add("t", rows(1, 2)) == 2
+        assert buffer.add("t", rows(3)) == 0
+        assert writer.writes == [("t", [1, 2, 3])]
+    finally:
+        buffer.close()
+
+
+def test_flushes_after_max_delay():
+    writer = Writer()
+    buffer = make_buffer(writer, max_delay=0.05)
+    try:
+        buffer.add("t", rows(1))
+        deadline = time.monotonic() + 2
+        while not writer.writes and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert writer.writes == [("t", [1])]
+    finally:
+        buffer.close()
+
+
+def test_transient_failure_requeues_ahead_of_new_rows():
+    writer = Writer(TransientError("down"))
+    buffer = make_buffer(writer)
+    try:
+        buffer.add("t", rows(1, 2))
+        with pytest.raises(TransientError):
+            buffer.flush("t")
+        buffer.add("t", rows(3))
+        assert buffer.flush("t") == 3
+        assert writer.writes == [("t", [1, 2, 3])]
+        assert buffer.stats()["retries"] == 1
+    finally:
+        buffer.close()
+
+
+def test_partial_write_is_not_retried():
+    writer = Writer(PartialWriteError("second INSERT failed"))
+    buffer = WriteBuffer(writer, max_delay=60.0, retryable=lambda e: True)
+    try:
+        buffer.add("t", rows(1, 2))
+        with pytest.raises(PartialWriteError):
+            buffer.flush("t")
+        assert buffer.pending_rows("t") == 0
+        assert buffer.stats()["dropped_rows"] == 2
+        assert "were not all written" in buffer.take_error("t")
+    finally:
+        buffer.close()
+
+
+def test_retries_are_bounded():
+    writer = Writer(*[TransientError("down")] * 3)
+    buffer = make_buffer(writer, max_retries=2)
+    try:
+        buffer.add("t", rows(1))
+        for _ in range(3):
+            with pytest.raises(TransientError):
+                buffer.flush("t")
+        assert buffer.pending_rows("t") == 0
+        assert buffer.take_error("t") == "1 buffered rows were not written: down"
+    finally:
+        buffer.close()
+
+
+def test_retries_back_off_exponentially():
+    writer = Writer(TransientError("down"), TransientError("down"))
+    buffer = make_buffer(writer, max_delay=10.0, max_backoff=15.0)
+    try:
+        buffer.add("t", rows(1))
+        for expected in (10.0, 15.0):
+            with pytest.raises(TransientError):
+                buffer.flush("t")
+            assert buffer._due["t"] - time.monotonic() == pytest.approx(expected, abs=1.0)
+    finally:
+        buffer.close()
+
+
+def test_close_writes_pending_rows_and_unregisters(monkeypatch):
+    registered = []
+    monkeypatch.setattr("atexit.register", registered.append)
+    monkeypatch.setattr("atexit.unregister", registered.remove)
+    writer = Writer()
+    buffer = make_buffer(writer)
+    assert registered == [buffer.close]
+    buffer.add("t", rows(1))
+    buffer.close()
+    assert writer.writes == [("t", [1])]
+    assert registered == []
+    with pytest.raises(RuntimeError):
+        buffer.add("t", rows(2))
+
+
+def test_tools_do_not_retry_batches_with_committed_inserts(fake_doris):
+    tools = DorisTools(host="fe", database="db", write_buffer_max_rows=100, insert_max_rows_per_statement=1)
+    try:
+        calls = []
+
+        def fail_second(sql, args):
+            calls.append(args)
+            if len(calls) == 2:
+                return pymysql.err.OperationalError(2013, "Lost connection to MySQL server during query")
+
+        fake_doris.executemany_error = fail_second
+        tools.insert_data("t", rows(1, 2))
+        tools.flush_writes()
+        assert len(calls) == 2
+        assert tools.write_buffer_stats()["pending"] == {}
+        assert tools.write_buffer_stats()["retries"] == 0
+    finally:
+        fake_doris.executemany_error = None
+        tools.close()
+
+
+def test_tools_retry_when_nothing_was_sent(fake_doris):
+    tools = DorisTools(host="fe", database="db", write_buffer_max_rows=100, group_commit="async_mode")
+    try:
+        failures = [pymysql.err.OperationalError(2013, "Lost connection to MySQL server during query")]
+        fake_doris.respond("SET group_commit = async_mode", lambda sql: failures.pop() if failures else [])
+        tools.insert_data("t", rows(1, 2))
+        tools.flush_writes()
+        assert tools.write_buffer_stats()["pending"] == {"t": 2}
+        assert not any(sql.startswith("INSERT") for sql in fake_doris.sqls())
+        tools.flush_writes()
+        assert tools.write_buffer_stats()["written_rows"] == 2
+    finally:
+        tools.close()
@@ -0,0 +1,70 @@
+import time
+
+import pytest
+
+from src.tools.doris_cache import QueryResultCache, is_cacheable
+
+pytestmark = pytest.mark.unit
+
+
+def test_hit_after_put_with_normalized_sql():
+    cache = QueryResultCache()
+    cache.put("db", "SELECT * FROM t", [{"a": 1}])
+    assert cache.get("db", "SELECT  *\n FROM t; -- again") == [{"a": 1}]
+    assert cache.get("other", "SELECT * FROM t") is None
+    assert cache.stats()["hits"] == 1
+
+
+def test_ttl_expires_entries():
+    cache = QueryResultCache(ttl=0.01)
+    cache.put("db", "SELECT * FROM t", [{"a": 1}])
+    time.sleep(0.02)
+    assert cache.get("db", "SELECT * FROM t") is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_lru_bounded_by_bytes():
+    cache = QueryResultCache(max_bytes=2000)
+    rows = [{"a": "x" * 100}]
+    for i in range(20):
+        cache.put("db", f"SELECT * FROM t{i}", rows)
+    stats = cache.stats()
+    assert stats["bytes"] <= 2000
+    assert stats["evictions"] > 0
+    assert cache.get("db", "SELECT * FROM t19") == rows
+
+
+def test_invalidate_tables_drops_dependent_entries():
+    cache = QueryResultCache()
+    cache.put("db", "SELECT * FROM a JOIN b ON a.id = b.id", [(1,)])
+    cache.put("db", "SELECT * FROM c", [(2,)])
+    assert cache.invalidate_tables(["db.b"]) == 1
+    assert cache.get("db", "SELECT * FROM a JOIN b ON a.id = b.id") is None
+    assert cache.get("db", "SELECT * FROM c") == [(2,)]
+
+
+def test_put_after_invalidation_is_dropped():
+    cache = QueryResultCache()
+    generation = cache.generation
+    cache.invalidate_tables(["db.t"])
+    cache.put("db", "SELECT * FROM t", [(1,)], generation=generation)
+    assert cache.get("db", "SELECT * FROM t") is None
+
+
+@pytest.mark.parametrize("sql, cacheable", [
+    ("SELECT * FROM orders", True),
+    ("SELECT * FROM sales.orders WHERE id = 1", True),
+    ("SHOW TABLES", False),
+    ("SHOW CREATE TABLE orders", False),
+    ("DESC orders", False),
+    ("SELECT * FROM information_schema.tables", False),
+    ("SELECT * FROM INFORMATION_SCHEMA.COLUMNS WHERE table_name = 't'", False),
+    ("SELECT now() FROM orders", False),
+    ("SELECT 1", False),
+])
+def test_is_cacheable(sql, cacheable):
+    assert is_cacheable(sql, "sales") is cacheable
+
+
+def test_metadata_database_is_not_cacheable():
+    assert not is_cacheable("SELECT * FROM tables", "information_schema")
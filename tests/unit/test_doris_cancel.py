@@ -0,0 +1,50 @@
+import socket
+
+import pymysql
+import pytest
+
+from src.tools.doris_cancel import CancelToken, classify_error, format_limit_error
+from src.tools.doris_pool import PoolTimeoutError
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.mark.parametrize("error, kind", [
+    (pymysql.err.OperationalError(1105, "errCode = 2, detailMessage = Query timeout"), "timeout"),
+    (pymysql.err.OperationalError(1105, "[CANCELLED]query exceeded timeout limit"), "timeout"),
+    (pymysql.err.OperationalError(1105, "errCode = 2, detailMessage = Timeout by txn manager"), "timeout"),
+    (pymysql.err.OperationalError(3024, "maximum statement execution time exceeded"), "timeout"),
+    (pymysql.err.OperationalError(1105, "MEM_LIMIT_EXCEEDED: exec_mem_limit 2GB"), "memory_limit"),
+    (pymysql.err.OperationalError(1317, "Query execution was interrupted"), "cancelled"),
+    (pymysql.err.OperationalError(1105, "errCode = 2, detailMessage = Unknown table 'x'"), None),
+])
+def test_classify_server_errors(error, kind):
+    assert classify_error(error) == kind
+
+
+@pytest.mark.parametrize("error", [
+    PoolTimeoutError("Timed out after 30s waiting for a Doris connection (max_size=8)"),
+    pymysql.err.OperationalError(2003, "Can't connect to MySQL server on 'fe' (timed out)"),
+    pymysql.err.OperationalError(2013, "Lost connection to MySQL server during query (timed out)"),
+    socket.timeout("timed out"),
+])
+def test_client_side_timeouts_are_not_query_timeouts(error):
+    assert classify_error(error) is None
+
+
+def test_format_limit_error_names_kind():
+    assert format_limit_error("timeout", timeout=30).startswith("Query error (timeout): the query exceeded the 30s limit")
+    assert format_limit_error("cancelled").startswith("Query error (cancelled)")
+
+
+def test_cancel_runs_callbacks_once_and_late_registrations_immediately():
+    token = CancelToken()
+    calls = []
+    unregister = token.register(lambda: calls.append("a"))
+    token.register(lambda: calls.append("b"))
+    unregister()
+    token.cancel()
+    token.cancel()
+    assert calls == ["b"]
+    token.register(lambda: calls.append("late"))
+    assert calls == ["b", "late"]
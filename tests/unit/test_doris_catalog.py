@@ -0,0 +1,127 @@
+import pymysql
+import pytest
+
+from src.tools.doris_catalog import MetadataCatalog, format_size
+
+pytestmark = pytest.mark.unit
+
+TABLES = [
+    {"TABLE_NAME": "users", "TABLE_TYPE": "BASE TABLE", "TABLE_ROWS": 2, "DATA_LENGTH": 2048,
+     "CREATE_TIME": None, "UPDATE_TIME": "2024-01-02 00:00:00", "TABLE_COMMENT": "用户表"},
+    {"TABLE_NAME": "orders", "TABLE_TYPE": "BASE TABLE", "TABLE_ROWS": 10, "DATA_LENGTH": None,
+     "CREATE_TIME": None, "UPDATE_TIME": None, "TABLE_COMMENT": ""},
+    {"TABLE_NAME": "data_dictionary", "TABLE_TYPE": "BASE TABLE", "TABLE_ROWS": 1, "DATA_LENGTH": 1,
+     "CREATE_TIME": None, "UPDATE_TIME": None, "TABLE_COMMENT": ""},
+    {"TABLE_NAME": "orders__staging_1", "TABLE_TYPE": "BASE TABLE", "TABLE_ROWS": 0, "DATA_LENGTH": 0,
+     "CREATE_TIME": None, "UPDATE_TIME": None, "TABLE_COMMENT": ""},
+]
+COLUMNS = [
+    {"TABLE_NAME": "orders", "COLUMN_NAME": "id", "ORDINAL_POSITION": 1, "COLUMN_TYPE": "bigint",
+     "IS_NULLABLE": "NO", "COLUMN_KEY": "UNI", "COLUMN_DEFAULT": None, "COLUMN_COMMENT": ""},
+    {"TABLE_NAME": "orders", "COLUMN_NAME": "amount", "ORDINAL_POSITION": 2, "COLUMN_TYPE": "decimal(10,2)",
+     "IS_NULLABLE": "YES", "COLUMN_KEY": "", "COLUMN_DEFAULT": None, "COLUMN_COMMENT": "金额"},
+    {"TABLE_NAME": "users", "COLUMN_NAME": "name", "ORDINAL_POSITION": 1, "COLUMN_TYPE": "varchar(64)",
+     "IS_NULLABLE": "YES", "COLUMN_KEY": "", "COLUMN_DEFAULT": None, "COLUMN_COMMENT": ""},
+]
+
+
+@pytest.fixture
+def catalog_rows(fake_doris):
+    fake_doris.respond("SELECT TABLE_NAME, TABLE_TYPE", TABLES)
+    fake_doris.respond("SELECT TABLE_NAME, COLUMN_NAME", COLUMNS)
+    fake_doris.respond("SELECT table_name, column_name, description",
+                       [{"table_name": "orders", "column_name": "", "description": "订单"},
+                        {"table_name": "orders", "column_name": "id", "description": "订单号"}])
+
+
+def test_load_groups_columns_by_table():
+    catalog = MetadataCatalog()
+    catalog.load(TABLES, COLUMNS)
+
+    assert catalog.loaded
+    assert [info.name for info in catalog.tables()] == ["data_dictionary", "orders", "orders__staging_1", "users"]
+    orders = catalog.table("orders")
+    assert (orders.rows, orders.data_length, orders.comment) == (10, None, None)
+    assert [column["name"] for column in orders.columns] == ["id", "amount"]
+    assert orders.columns[1]["comment"] == "金额"
+    assert orders.columns[0]["comment"] is None
+    assert catalog.table("missing") is None
+
+
+def test_columns_without_table_row_still_load():
+    catalog = MetadataCatalog()
+    catalog.load([], COLUMNS[2:])
+
+    assert catalog.table("users").rows is None
+    assert [column["name"] for column in catalog.table("users").columns] == ["name"]
+
+
+def test_staleness():
+    catalog = MetadataCatalog()
+    assert catalog.is_stale(None)
+    catalog.load(TABLES, COLUMNS)
+    assert not catalog.is_stale(None)
+    assert not catalog.is_stale(300.0)
+    catalog.loaded_at -= 301
+    assert catalog.is_stale(300.0)
+    catalog.invalidate()
+    assert catalog.is_stale(None)
+
+
+@pytest.mark.parametrize("size, text", [
+    (None, ""),
+    (0, "0 B"),
+    (1023, "1023 B"),
+    (2048, "2.0 KB"),
+    (5 * 1024 ** 3, "5.0 GB"),
+    (3 * 1024 ** 5, "3072.0 TB"),
+])
+def test_format_size(size, text):
+    assert format_size(size) == text
+
+
+def test_describe_all_uses_two_queries(tools, fake_doris, catalog_rows):
+    result = tools.describe_all()
+
+    catalog_queries = [sql for sql in fake_doris.sqls() if "information_schema" in sql]
+    assert len(catalog_queries) == 2
+    assert not any(sql.startswith("DESC") for sql in fake_doris.sqls())
+
+    sections = result.split("\n\n=== 表信息: ")
+    assert sections[0].startswith("=== 表信息: orders ===\n描述: 订单\n行数(估计): 10")
+    assert sections[1].startswith("users ===\n描述: 用户表\n行数(估计): 2, 数据大小: 2.0 KB, 更新时间: 2024-01-02")
+    assert "订单号" in sections[0] and "金额" in sections[0]
+    assert "data_dictionary" not in result
+    assert "__staging_" not in result
+
+
+def test_describe_all_reuses_loaded_catalog(tools, fake_doris, catalog_rows):
+    tools.describe_all()
+    fake_doris.clear()
+
+    tools.describe_all()
+    tools.describe_table("orders")
+
+    assert not any("information_schema" in sql for sql in fake_doris.sqls())
+
+
+def test_ddl_invalidates_catalog(tools, fake_doris, catalog_rows):
+    tools.describe_all()
+    tools.execute_sql("ALTER TABLE orders ADD COLUMN note STRING")
+    fake_doris.clear()
+
+    tools.describe_all()
+
+    assert sum("information_schema" in sql for sql in fake_doris.sqls()) == 2
+
+
+def test_describe_all_without_catalog(tools, fake_doris):
+    fake_doris.respond("SELECT TABLE_NAME", pymysql.err.OperationalError(1105, "access denied"))
+
+    assert tools.describe_all() == "Metadata catalog unavailable. Use show_tables and describe_table instead."
+
+
+def test_describe_all_without_tables(tools, fake_doris):
+    fake_doris.respond("SELECT TABLE_NAME", [])
+
+    assert tools.describe_all() == "No tables found in database 'db'."
@@ -0,0 +1,135 @@
+import pymysql
+import pytest
+
+from src.tools.doris_dictionary import DataDictionaryIndex
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.fixture
+def index():
+    index = DataDictionaryIndex()
+    index.load([
+        ("orders", "", "Customer orders"),
+        ("orders", "amount", "订单金额"),
+        ("orders", "user_id", "Buyer id"),
+        ("users", "", "用户信息表"),
+        ("users", "name", None),
+    ])
+    return index
+
+
+def test_load_marks_loaded(index):
+    assert index.loaded
+    assert not index.is_stale(None)
+    assert DataDictionaryIndex().is_stale(None)
+
+
+@pytest.mark.parametrize("term, keys", [
+    ("order", [("orders", ""), ("orders", "amount"), ("orders", "user_id")]),
+    ("CUSTOMER", [("orders", "")]),
+    ("金额", [("orders", "amount")]),
+    ("用户", [("users", "")]),
+    ("name", [("users", "name")]),
+    ("表", [("users", "")]),
+    ("missing", []),
+])
+def test_search_is_substring(index, term, keys):
+    assert [(table, column) for table, column, _ in index.search(term)] == keys
+
+
+def test_search_does_not_match_across_fields(index):
+    # Fields are joined with \x00, so no bigram spans the table and column names
+    assert index.search("samount") == []
+    assert index.search("ordersamount") == []
+
+
+def test_search_returns_descriptions(index):
+    assert index.search("buyer") == [("orders", "user_id", "Buyer id")]
+    assert index.search("name") == [("users", "name", None)]
+
+
+def test_upsert_replaces_postings(index):
+    index.upsert("orders", "amount", "Total paid")
+
+    assert index.search("金额") == []
+    assert index.search("total paid") == [("orders", "amount", "Total paid")]
+    assert index.column_descriptions("orders")["amount"] == "Total paid"
+
+
+def test_upsert_adds_new_table(index):
+    index.upsert("events", "", "Click stream")
+
+    assert index.search("click") == [("events", "", "Click stream")]
+    assert index.table_description("events") == "Click stream"
+
+
+def test_tables_lists_described_tables(index):
+    index.upsert("logs", "level", "Log level")
+
+    assert index.tables() == [("orders", "Customer orders"), ("users", "用户信息表")]
+
+
+def test_load_replaces_contents(index):
+    index.load([("events", "", "Click stream")])
+
+    assert index.search("order") == []
+    assert index.tables() == [("events", "Click stream")]
+    assert index.column_descriptions("orders") == {}
+
+
+DUPLICATE_DDL = "CREATE TABLE `data_dictionary` (...) ENGINE=OLAP DUPLICATE KEY(`table_name`)"
+UNIQUE_DDL = "CREATE TABLE `data_dictionary` (...) ENGINE=OLAP UNIQUE KEY(`table_name`, `column_name`)"
+
+
+def test_migration_swaps_in_unique_key_table(tools, fake_doris):
+    fake_doris.respond("SHOW CREATE TABLE", [{"Table": "data_dictionary", "Create Table": DUPLICATE_DDL}])
+    fake_doris.respond("SELECT table_name", [{"table_name": "orders", "column_name": "", "description": "订单"}])
+    tools.search_dictionary("订单")
+    fake_doris.clear()
+
+    assert tools._migrate_data_dictionary()
+
+    sqls = [" ".join(sql.split()) for sql in fake_doris.sqls()]
+    assert sqls[0] == "SHOW CREATE TABLE `data_dictionary`"
+    assert sqls[1] == "DROP TABLE IF EXISTS `data_dictionary_migration`"
+    assert sqls[2].startswith("CREATE TABLE IF NOT EXISTS `data_dictionary_migration`")
+    assert "UNIQUE KEY(`table_name`, `column_name`)" in sqls[2]
+    assert sqls[3].startswith("INSERT INTO `data_dictionary_migration`")
+    assert "max_by(description, updated_at), max(updated_at)" in sqls[3]
+    assert "GROUP BY table_name, column_name" in sqls[3]
+    assert sqls[4] == ("ALTER TABLE `data_dictionary` REPLACE WITH TABLE `data_dictionary_migration` "
+                       "PROPERTIES('swap' = 'false')")
+    assert sqls[5] == "COMMIT"
+    # The in-memory dictionary is reloaded from the migrated table
+    assert tools._dictionary.is_stale(tools.dictionary_refresh_interval)
+
+
+def test_unique_key_table_is_not_migrated(tools, fake_doris):
+    fake_doris.respond("SHOW CREATE TABLE", [{"Table": "data_dictionary", "Create Table": UNIQUE_DDL}])
+
+    assert not tools._migrate_data_dictionary()
+    assert fake_doris.sqls() == ["SHOW CREATE TABLE `data_dictionary`"]
+
+
+def test_setup_migrates_old_dictionary(fake_doris):
+    from src.tools.doris import DorisTools
+
+    fake_doris.respond("SHOW CREATE TABLE", [{"Table": "data_dictionary", "Create Table": DUPLICATE_DDL}])
+    doris = DorisTools(host="fe", database="db")
+    try:
+        assert any("REPLACE WITH TABLE" in sql for sql in fake_doris.sqls())
+    finally:
+        doris.close()
+
+
+def test_failed_migration_leaves_dictionary_in_place(fake_doris):
+    from src.tools.doris import DorisTools
+
+    fake_doris.respond("SHOW CREATE TABLE", [{"Table": "data_dictionary", "Create Table": DUPLICATE_DDL}])
+    fake_doris.respond("INSERT INTO `data_dictionary_migration`", pymysql.err.OperationalError(1105, "boom"))
+    doris = DorisTools(host="fe", database="db")
+    try:
+        assert not any("REPLACE WITH TABLE" in sql for sql in fake_doris.sqls())
+    finally:
+        doris.close()
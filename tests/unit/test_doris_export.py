@@ -0,0 +1,124 @@
+import gzip
+import os
+import sys
+from decimal import Decimal
+
+import pandas as pd
+import pytest
+from pymysql.constants import FIELD_TYPE
+
+from src.tools.doris import DorisTools
+from src.tools.doris_columnar import build_column
+from src.tools.doris_export import infer_export_format, write_chunks
+
+pytestmark = pytest.mark.unit
+
+pq = pytest.importorskip("pyarrow.parquet")
+
+
+def described(df, description):
+    df.attrs["description"] = description
+    return df
+
+
+def test_infer_export_format():
+    assert infer_export_format("out.csv.gz") == "csv.gz"
+    assert infer_export_format("out.PARQUET") == "parquet"
+    assert infer_export_format("out.txt") == "csv"
+
+
+def test_csv_header_written_once(tmp_path):
+    path = str(tmp_path / "out.csv.gz")
+    chunks = [pd.DataFrame({"a": [1, 2]}), pd.DataFrame({"a": [3]})]
+    result = write_chunks(chunks, path, "csv.gz")
+    assert result["rows"] == 3 and result["chunks"] == 2
+    with gzip.open(path, "rt") as f:
+        assert f.read().splitlines() == ["a", "1", "2", "3"]
+
+
+def test_parquet_wider_decimals_in_later_chunk(tmp_path):
+    path = str(tmp_path / "out.parquet")
+    chunks = [
+        pd.DataFrame({"amount": [Decimal("1.50")]}),
+        pd.DataFrame({"amount": [Decimal("12345.25")]}),
+    ]
+    write_chunks(chunks, path, "parquet")
+    assert pq.read_table(path).column("amount").to_pylist() == [Decimal("1.50"), Decimal("12345.25")]
+
+
+def test_parquet_uses_cursor_types_for_all_null_first_chunk(tmp_path):
+    path = str(tmp_path / "out.parquet")
+    description = (
+        ("id", FIELD_TYPE.LONGLONG, None, None, None, None, True),
+        ("price", FIELD_TYPE.NEWDECIMAL, None, None, 10, 2, True),
+    )
+    chunks = [
+        described(pd.DataFrame({"id": [None], "price": [None]}, dtype=object), description),
+        described(pd.DataFrame({"id": [7], "price": [Decimal("3.25")]}), description),
+    ]
+    write_chunks(chunks, path, "parquet")
+    table = pq.read_table(path)
+    assert str(table.schema.field("id").type) == "int64"
+    assert str(table.schema.field("price").type) == "decimal128(38, 2)"
+    assert table.column("id").to_pylist() == [None, 7]
+
+
+def test_parquet_all_null_first_chunk_without_metadata(tmp_path):
+    path = str(tmp_path / "out.parquet")
+    chunks = [pd.DataFrame({"v": [None]}, dtype=object), pd.DataFrame({"v": [5]})]
+    write_chunks(chunks, path, "parquet")
+    assert pq.read_table(path).column("v").to_pylist() == [None, "5"]
+
+
+def test_partitioned_output_limits_open_files(tmp_path):
+    chunks = [
+        pd.DataFrame({"region": ["a", "b", "c"], "v": [1, 2, 3]}),
+        pd.DataFrame({"region": ["a", None], "v": [4, 5]}),
+    ]
+    result = write_chunks(chunks, str(tmp_path), "csv", partition_by="region", max_open_partitions=2)
+    files = sorted(os.path.relpath(path, tmp_path) for path in result["files"])
+    assert files == [
+        "region=__HIVE_DEFAULT_PARTITION__/part-00000.csv",
+        "region=a/part-00000.csv",
+        "region=a/part-00001.csv",
+        "region=b/part-00000.csv",
+        "region=c/part-00000.csv",
+    ]
+    rows = pd.concat(pd.read_csv(tmp_path / path) for path in files)
+    assert sorted(rows["v"]) == [1, 2, 3, 4, 5]
+
+
+def test_parquet_without_pyarrow_fails_before_reading(tmp_path, monkeypatch):
+    monkeypatch.setitem(sys.modules, "pyarrow", None)
+    monkeypatch.setitem(sys.modules, "pyarrow.parquet", None)
+    consumed = []
+
+    def chunks():
+        consumed.append(True)
+        yield pd.DataFrame({"id": [1]})
+
+    with pytest.raises(ImportError, match="Parquet export needs `pyarrow`.*'csv' or 'csv.gz'"):
+        write_chunks(chunks(), str(tmp_path / "out.parquet"), "parquet")
+    assert consumed == []
+    assert not (tmp_path / "out.parquet").exists()
+    # CSV does not need it
+    assert write_chunks(chunks(), str(tmp_path / "out.csv"), "csv")["rows"] == 1
+
+
+def test_export_data_reports_missing_pyarrow(fake_doris, tmp_path, monkeypatch):
+    monkeypatch.setitem(sys.modules, "pyarrow", None)
+    tools = DorisTools(host="fe", database="db")
+    try:
+        fake_doris.clear()
+        result = tools.export_data("SELECT * FROM t", str(tmp_path / "out.parquet"))
+        assert result.startswith("Export error: Parquet export needs `pyarrow`")
+        assert not any(sql.startswith("SELECT") for sql in fake_doris.sqls())
+    finally:
+        tools.close()
+
+
+def test_columnar_strings_without_pyarrow(monkeypatch):
+    monkeypatch.setitem(sys.modules, "pyarrow", None)
+    column = build_column(("a", "b", None), FIELD_TYPE.VAR_STRING, categorical_max_ratio=None)
+    assert column.dtype == object
+    assert list(column) == ["a", "b", None]
@@ -0,0 +1,93 @@
+import pytest
+
+from src.tools.doris_guard import CostGuard, add_limit, parse_explain, trailing_limit
+
+pytestmark = pytest.mark.unit
+
+SCAN_PLAN = [
+    "PLAN FRAGMENT 0",
+    "  0:VOlapScanNode",
+    "     TABLE: db.events(events), PREAGGREGATION: ON",
+    "     tablets=32/32, tabletList=1,2,3",
+    "     cardinality=50000000, avgRowSize=0.0, numNodes=1",
+]
+AGGREGATE_PLAN = ["  1:VAGGREGATE (update finalize)"] + SCAN_PLAN
+
+
+def explain_with(plan):
+    calls = []
+
+    def explain(sql):
+        calls.append(sql)
+        return plan
+
+    return explain, calls
+
+
+def test_parse_explain():
+    estimate = parse_explain(SCAN_PLAN)
+    assert (estimate.scan_rows, estimate.tablets, estimate.total_tablets, estimate.blocking) == (50000000, 32, 32, False)
+    assert parse_explain(AGGREGATE_PLAN).blocking
+
+
+@pytest.mark.parametrize("sql, expected", [
+    ("SELECT * FROM t", None),
+    ("SELECT * FROM t LIMIT 10", (0, 10)),
+    ("SELECT * FROM t LIMIT 5, 10", (5, 10)),
+    ("SELECT * FROM t LIMIT 10 OFFSET 5;", (5, 10)),
+    ("SELECT * FROM (SELECT * FROM t LIMIT 10) x", None),
+])
+def test_trailing_limit(sql, expected):
+    assert trailing_limit(sql) == expected
+
+
+def test_add_limit_lowers_existing_limit():
+    assert add_limit("SELECT * FROM t", 100) == "SELECT * FROM t LIMIT 100"
+    assert add_limit("SELECT * FROM t LIMIT 100000000", 100) == "SELECT * FROM t LIMIT 100"
+    assert add_limit("SELECT * FROM t LIMIT 10 OFFSET 20", 100) == "SELECT * FROM t LIMIT 10 OFFSET 20"
+
+
+def test_small_limit_passes():
+    guard = CostGuard(max_scan_rows=1000000)
+    explain, _ = explain_with(SCAN_PLAN)
+    assert guard.check("SELECT * FROM events LIMIT 100", explain).action == "allow"
+
+
+def test_large_limit_is_checked_like_no_limit():
+    guard = CostGuard(max_scan_rows=1000000, limit=1000)
+    explain, _ = explain_with(SCAN_PLAN)
+    decision = guard.check("SELECT * FROM events LIMIT 100000000", explain)
+    assert decision.action == "limit"
+    assert decision.sql == "SELECT * FROM events LIMIT 1000"
+    assert "LIMIT reads up to 100000000 rows" in decision.reason
+
+
+def test_large_limit_rejected_in_reject_mode():
+    guard = CostGuard(max_scan_rows=1000000, action="reject")
+    explain, _ = explain_with(SCAN_PLAN)
+    decision = guard.check("SELECT * FROM events LIMIT 100000000", explain)
+    assert decision.action == "reject"
+    assert "add a LIMIT of at most 1000000" in decision.message()
+
+
+def test_limit_over_blocking_plan_is_rejected():
+    guard = CostGuard(max_scan_rows=1000000)
+    explain, _ = explain_with(AGGREGATE_PLAN)
+    decision = guard.check("SELECT k, count(*) FROM events GROUP BY k LIMIT 10", explain)
+    assert decision.action == "reject"
+
+
+def test_tablet_budget_with_limit_uses_guard_limit():
+    guard = CostGuard(max_tablets=8, limit=1000)
+    explain, _ = explain_with(SCAN_PLAN)
+    assert guard.check("SELECT * FROM events LIMIT 500", explain).action == "allow"
+    assert guard.check("SELECT * FROM events LIMIT 5000", explain).action == "limit"
+
+
+def test_plans_cached_by_shape():
+    guard = CostGuard(max_scan_rows=100000000)
+    explain, calls = explain_with(SCAN_PLAN)
+    guard.check("SELECT * FROM events WHERE id = 1", explain)
+    guard.check("SELECT * FROM events WHERE id = 2", explain)
+    assert len(calls) == 1
+    assert guard.stats()["explains"] == 1
@@ -0,0 +1,82 @@
+import pymysql
+import pytest
+from pymysql.cursors import Cursor
+
+from src.tools.doris import DorisTools
+from tests.conftest import FakeConnection
+
+pytestmark = pytest.mark.unit
+
+
+class RenderingCursor(Cursor):
+    """PyMySQL's own cursor, so executemany splits statements by max_stmt_length as it would live."""
+
+    def execute(self, query, args=None):
+        if args is not None:
+            query = self.mogrify(query, args)
+        if isinstance(query, (bytes, bytearray)):
+            query = bytes(query).decode(self.connection.encoding)
+        self.connection.server.statements.append((self.connection.id, query, None))
+        return query.count("),(") + 1 if query.startswith("INSERT") else 0
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def rendering(monkeypatch):
+    monkeypatch.setattr(FakeConnection, "cursor", lambda self, cursor_class=None: RenderingCursor(self))
+
+
+def inserts(fake_doris):
+    return [sql for sql in fake_doris.sqls() if sql.startswith("INSERT")]
+
+
+def test_rows_are_grouped_by_column_set(tools, fake_doris):
+    result = tools.insert_data("t", [{"a": 1, "b": 2}, {"b": 3, "a": 4}, {"a": 5}, {"a": 6, "b": None}])
+    assert "Successfully inserted 4 rows into t" in result
+    assert "(`a`, `b`): 3" in result and "(`a`): 1" in result
+    statements = [(sql, args) for _, sql, args in fake_doris.statements if sql.startswith("INSERT")]
+    assert statements == [
+        ("INSERT INTO `t` (`a`, `b`) VALUES (%s, %s)", [(1, 2), (4, 3), (6, None)]),
+        ("INSERT INTO `t` (`a`) VALUES (%s)", [(5,)]),
+    ]
+
+
+def test_rows_per_statement_are_capped(fake_doris):
+    doris = DorisTools(host="fe", database="db", insert_max_rows_per_statement=2)
+    try:
+        fake_doris.clear()
+        doris.insert_data("t", [{"a": i} for i in range(5)])
+        batches = [args for _, sql, args in fake_doris.statements if sql.startswith("INSERT")]
+        assert batches == [[(0,), (1,)], [(2,), (3,)], [(4,)]]
+    finally:
+        doris.close()
+
+
+def test_statements_are_split_by_max_stmt_length(fake_doris, rendering):
+    doris = DorisTools(host="fe", database="db", insert_max_statement_bytes=60)
+    try:
+        fake_doris.clear()
+        doris.insert_data("t", [{"name": f"row-{i}"} for i in range(6)])
+        statements = inserts(fake_doris)
+        assert len(statements) > 1
+        assert all(len(sql.encode()) <= 60 for sql in statements)
+        assert "".join(statements).count("'row-") == 6
+        assert statements[0].startswith("INSERT INTO `t` (`name`) VALUES ('row-0'),('row-1')")
+    finally:
+        doris.close()
+
+
+def test_failed_group_commit_reset_keeps_insert_error_and_drops_connection(fake_doris):
+    doris = DorisTools(host="fe", database="db", group_commit="async_mode")
+    try:
+        lost = pymysql.err.OperationalError(2013, "Lost connection to MySQL server during query")
+        fake_doris.executemany_error = lambda sql, args: pymysql.err.ProgrammingError(1064, "bad insert")
+        fake_doris.respond("SET group_commit = off_mode", lost)
+        result = doris.insert_data("t", [{"a": 1}])
+        assert result == "Insert error: (1064, 'bad insert')"
+        assert doris.pool_stats()["idle"] == 0
+    finally:
+        fake_doris.executemany_error = None
+        doris.close()
@@ -0,0 +1,85 @@
+import datetime
+import decimal
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.tools.doris import DorisTools
+from src.tools.doris_merge import (
+    canonical_value, changed_rows, format_watermark, row_hashes, rows_since, unique_key_columns,
+)
+from src.tools.doris_schema import coerce_to_types, infer_schema
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.mark.parametrize("values", [
+    (3, 3.0, np.int8(3), decimal.Decimal("3.00")),
+    (1.5, np.float32(1.5), decimal.Decimal("1.50")),
+    (datetime.date(2024, 1, 2), datetime.datetime(2024, 1, 2), pd.Timestamp("2024-01-02").to_pydatetime()),
+    (True, 1),
+])
+def test_canonical_value_ignores_type(values):
+    assert len({canonical_value(value) for value in values}) == 1
+
+
+def test_canonical_value_keeps_distinct_values_apart():
+    assert canonical_value(None) is None
+    assert canonical_value("") == ""
+    assert canonical_value(datetime.datetime(2024, 1, 2, 3, 4, 5)) == "2024-01-02 03:04:05"
+    assert canonical_value(0.1) != canonical_value(0.10000001)
+
+
+def test_first_and_later_runs_hash_the_same():
+    df = pd.DataFrame({
+        "id": [1.0, 2.0], "amount": ["$1,000", "$2.50"], "day": ["2024-01-01", "2024-01-02"], "note": ["a", None],
+    })
+    first = infer_schema(df, key_columns=["id"]).frame
+    later = coerce_to_types(df, {"id": "bigint", "amount": "decimal(18,2)", "day": "date", "note": "varchar(16)"})
+    assert first["id"].dtype != later["id"].dtype
+    for first_hashes, later_hashes in zip(row_hashes(first, ["id"]), row_hashes(later, ["id"])):
+        assert (first_hashes == later_hashes).all()
+
+
+def test_changed_rows():
+    key_hashes = np.array([1, 2, 3, 3])
+    hashes = np.array([10, 20, 30, 31])
+    mask = changed_rows(key_hashes, hashes, stored_keys=np.array([1, 2]), stored_hashes=np.array([10, 21]))
+    # Row 2 changed, key 3 is new and only its last row is shipped
+    assert mask.tolist() == [False, True, False, True]
+
+
+def test_watermarks():
+    days = pd.to_datetime(pd.Series(["2024-01-01", "2024-01-03", None]))
+    assert rows_since(days, None).tolist() == [True, True, True]
+    assert rows_since(days, "2024-01-03 00:00:00").tolist() == [False, True, False]
+    assert rows_since(pd.Series([1, 5, 9]), "5").tolist() == [False, True, True]
+    assert format_watermark(days) == "2024-01-03 00:00:00"
+    assert format_watermark(pd.Series([1, 5, None])) == "5.0"
+    assert format_watermark(pd.Series([None, None])) is None
+
+
+def test_unique_key_columns():
+    assert unique_key_columns("CREATE TABLE t (...) UNIQUE KEY(`id`, `day`) DISTRIBUTED BY") == ["id", "day"]
+    assert unique_key_columns("CREATE TABLE t (...) DUPLICATE KEY(`id`)") is None
+
+
+def test_merge_delta_reads_only_hashes_of_its_keys(fake_doris, monkeypatch):
+    monkeypatch.setattr("src.tools.doris.HASH_LOOKUP_BATCH", 2)
+    tools = DorisTools(host="fe", database="db")
+    try:
+        df = pd.DataFrame({"id": [1, 2, 3], "v": ["a", "b", "c"]})
+        key_hashes, hashes = row_hashes(df, ["id"])
+        stored = [{"key_hash": int(key_hashes[0]), "row_hash": int(hashes[0])}]
+        # The fake doesn't evaluate the IN list; answer the stored row once
+        fake_doris.respond("SELECT key_hash, row_hash", lambda sql: [stored.pop()] if stored else [])
+        fake_doris.clear()
+        delta, _ = tools._merge_delta("t", df, ["id"], None)
+        assert delta["id"].tolist() == [2, 3]
+        lookups = [(sql, args) for _, sql, args in fake_doris.statements if sql.startswith("SELECT key_hash")]
+        assert len(lookups) == 2
+        assert all("key_hash IN (" in sql for sql, _ in lookups)
+        assert sorted(key for _, args in lookups for key in args[1:]) == sorted(key_hashes.tolist())
+    finally:
+        tools.close()
@@ -0,0 +1,57 @@
+import pandas as pd
+import pytest
+
+from src.tools.doris_partition import (
+    add_partition_statements,
+    auto_partition_column,
+    detect_partition_unit,
+    partition_clause,
+    partition_periods,
+    range_partition_column,
+)
+
+pytestmark = pytest.mark.unit
+
+
+def test_month_periods_in_order_with_null_partition():
+    values = pd.Series(pd.to_datetime(["2024-03-05", "2024-01-31", None, "2024-01-01"]))
+    periods = partition_periods(values, "month")
+    assert [(p.name, p.start, p.end) for p in periods] == [
+        ("p_null", "0000-01-01", "1000-01-01"),
+        ("p202401", "2024-01-01", "2024-02-01"),
+        ("p202403", "2024-03-01", "2024-04-01"),
+    ]
+
+
+def test_day_periods_cross_year():
+    periods = partition_periods(pd.Series(["2023-12-31", "2024-01-01"]), "day")
+    assert [(p.name, p.end) for p in periods] == [("p20231231", "2024-01-01"), ("p20240101", "2024-01-02")]
+
+
+def test_invalid_unit():
+    with pytest.raises(ValueError):
+        partition_periods(pd.Series(["2024-01-01"]), "week")
+
+
+def test_clause_and_add_statements():
+    periods = partition_periods(pd.Series(["2024-01-15", "2024-02-15"]), "month")
+    clause = partition_clause("dt", periods)
+    assert clause.startswith("PARTITION BY RANGE(`dt`) (PARTITION `p202401` VALUES [('2024-01-01'), ('2024-02-01'))")
+    statements = add_partition_statements("t", periods, ["p202401"])
+    assert statements == [
+        "ALTER TABLE `t` ADD PARTITION IF NOT EXISTS `p202402` VALUES [('2024-02-01'), ('2024-03-01'))"
+    ]
+
+
+def test_read_back_existing_table():
+    create = "CREATE TABLE `t` (...) DUPLICATE KEY(`id`, `dt`) PARTITION BY RANGE(`dt`) (PARTITION p202401 ...)"
+    assert range_partition_column(create) == "dt"
+    assert range_partition_column("CREATE TABLE `t` (...)") is None
+    assert detect_partition_unit(["p_null", "p202401", "p202402"]) == "month"
+    assert detect_partition_unit(["p20240101"]) == "day"
+    assert detect_partition_unit(["p_custom"]) is None
+
+
+def test_auto_partition_column():
+    assert auto_partition_column([("id", "INT"), ("day", "DATE"), ("ts", "DATETIME")]) == "day"
+    assert auto_partition_column([("id", "INT")]) is None
@@ -0,0 +1,128 @@
+import threading
+import time
+
+import pymysql
+import pytest
+
+from src.tools.doris_pool import DorisConnectionPool, PoolTimeoutError
+
+pytestmark = pytest.mark.unit
+
+
+class Conn:
+    def __init__(self):
+        self.open = True
+        self.pings = 0
+        self.ping_fails = False
+
+    def ping(self, reconnect=False):
+        self.pings += 1
+        if self.ping_fails:
+            raise pymysql.err.OperationalError(2006, "MySQL server has gone away")
+
+    def close(self):
+        self.open = False
+
+
+def make_pool(**kwargs):
+    created = []
+
+    def connect():
+        conn = Conn()
+        created.append(conn)
+        return conn
+
+    return DorisConnectionPool(connect, **kwargs), created
+
+
+def test_reuses_idle_connection():
+    pool, created = make_pool()
+    with pool.connection() as first:
+        pass
+    with pool.connection() as second:
+        pass
+    assert first is second
+    assert len(created) == 1
+    assert pool.stats()["created"] == 1
+
+
+def test_invalid_sizes():
+    with pytest.raises(ValueError):
+        make_pool(max_size=0)
+    with pytest.raises(ValueError):
+        make_pool(min_size=3, max_size=2)
+
+
+def test_acquire_times_out_when_exhausted():
+    pool, _ = make_pool(max_size=1, acquire_timeout=0.05)
+    with pool.connection():
+        with pytest.raises(PoolTimeoutError):
+            with pool.connection():
+                pass
+    assert pool.stats()["waits"] >= 1
+
+
+def test_waiter_gets_released_connection():
+    pool, created = make_pool(max_size=1, acquire_timeout=2)
+    got = []
+
+    def worker():
+        with pool.connection() as conn:
+            got.append(conn)
+
+    with pool.connection():
+        thread = threading.Thread(target=worker)
+        thread.start()
+        time.sleep(0.05)
+    thread.join()
+    assert got == created
+
+
+def test_connection_error_discards_connection():
+    pool, created = make_pool()
+    with pytest.raises(pymysql.err.OperationalError):
+        with pool.connection():
+            raise pymysql.err.OperationalError(2013, "Lost connection")
+    assert not created[0].open
+    assert pool.stats()["size"] == 0
+
+
+def test_sql_error_keeps_connection():
+    pool, created = make_pool()
+    with pytest.raises(pymysql.err.OperationalError):
+        with pool.connection():
+            raise pymysql.err.OperationalError(1105, "errCode = 2, detailMessage = Unknown table")
+    assert created[0].open
+    assert pool.stats()["idle"] == 1
+
+
+def test_stale_connection_replaced_after_failed_ping():
+    pool, created = make_pool(health_check_after=0)
+    with pool.connection():
+        pass
+    created[0].ping_fails = True
+    time.sleep(0.01)
+    with pool.connection() as conn:
+        assert conn is created[1]
+    assert pool.stats()["size"] == 1
+
+
+def test_max_lifetime_recycles():
+    pool, created = make_pool(max_lifetime=0)
+    with pool.connection():
+        pass
+    time.sleep(0.01)
+    with pool.connection() as conn:
+        assert conn is created[1]
+    assert not created[0].open
+
+
+def test_close_refuses_checkouts():
+    pool, created = make_pool()
+    with pool.connection():
+        pass
+    pool.close()
+    assert not created[0].open
+    with pytest.raises(PoolTimeoutError):
+        with pool.connection():
+            pass
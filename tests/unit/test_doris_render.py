@@ -0,0 +1,101 @@
+import re
+
+import pandas as pd
+import pytest
+
+from src.tools.doris_render import ResultRenderer, ResultStore
+
+pytestmark = pytest.mark.unit
+
+
+def frame(rows: int) -> pd.DataFrame:
+    return pd.DataFrame({"id": range(rows), "name": [f"n{i}" for i in range(rows)]})
+
+
+def retained_id(text: str) -> str:
+    return re.search(r"retained as '(\w+)'", text).group(1)
+
+
+def test_store_evicts_least_recently_used():
+    store = ResultStore(max_results=2)
+    first, second = store.put(frame(1)), store.put(frame(2))
+    store.get(first)
+    third = store.put(frame(3))
+
+    assert store.get(second) is None
+    assert len(store.get(first)) == 1
+    assert len(store.get(third)) == 3
+
+
+def test_store_evicts_by_bytes():
+    size = int(frame(100).memory_usage(deep=True).sum())
+    store = ResultStore(max_bytes=size * 2)
+    ids = [store.put(frame(100)) for _ in range(3)]
+
+    assert store.get(ids[0]) is None
+    assert all(store.get(result_id) is not None for result_id in ids[1:])
+    assert ResultStore(max_bytes=size - 1).put(frame(100)) is None
+    assert ResultStore(max_results=0).put(frame(1)) is None
+
+
+def test_small_result_is_rendered_whole():
+    store = ResultStore()
+    text = ResultRenderer().render(frame(3), store=store)
+
+    assert text == frame(3).astype(str).to_string(index=False)
+    assert not store._results
+
+
+def test_empty_result():
+    assert ResultRenderer().render(frame(0)) == "Empty result"
+
+
+def test_long_result_shows_head_and_tail():
+    store = ResultStore()
+    text = ResultRenderer(max_rows=4).render(frame(10), store=store)
+    lines = text.split("\n")
+
+    assert [line.split()[0] for line in lines[1:6]] == ["0", "1", "...", "8", "9"]
+    assert lines[3] == "... (6 rows omitted) ..."
+    assert lines[6].startswith("[Showing 4 of 10 rows, 6 rows omitted, ~")
+    assert "call fetch_result_page with offset=2" in lines[6]
+    assert len(store.get(retained_id(text))) == 10
+
+
+def test_wide_cells_are_truncated():
+    df = pd.DataFrame({"text": ["x" * 50]})
+    text = ResultRenderer(max_column_chars=10).render(df)
+
+    assert text.split("\n")[1].strip() == "x" * 9 + "…"
+
+
+def test_preview_shrinks_to_character_budget():
+    text = ResultRenderer(max_rows=50, max_chars=200).render(frame(40), store=ResultStore())
+    table, footer = text.rsplit("\n", 1)
+
+    assert len(table) <= 200
+    assert footer.startswith("[Showing ")
+    assert "of 40 rows" in footer
+
+
+def test_fetch_result_page(tools):
+    tools._renderer.max_rows = 4
+    text = tools._render(frame(10))
+    result_id = retained_id(text)
+
+    page = tools.fetch_result_page(result_id, offset=2)
+    assert [line.split()[0] for line in page.split("\n")[1:5]] == ["2", "3", "4", "5"]
+    assert "page rows 2-5" in page
+    assert "offset=6" in page
+
+    last = tools.fetch_result_page(result_id, offset=8)
+    assert "page rows 8-9" in last
+    assert "fetch_result_page" not in last
+
+
+def test_fetch_result_page_errors(tools):
+    tools._renderer.max_rows = 4
+    result_id = retained_id(tools._render(frame(10)))
+
+    assert tools.fetch_result_page("missing").startswith("Unknown or expired result")
+    assert tools.fetch_result_page(result_id, offset=10) == "Offset 10 is out of range. The result has 10 rows."
@@ -0,0 +1,200 @@
+import time
+from contextlib import contextmanager
+
+import pymysql
+import pytest
+
+from src.tools.doris_router import FrontendRouter, is_connection_failure, parse_frontends
+
+pytestmark = pytest.mark.unit
+
+
+class FakePool:
+    """Per-FE pool that fails to connect while its FE is down."""
+
+    def __init__(self, frontend):
+        self.frontend = frontend
+        self.down = False
+        self.checkouts = 0
+
+    @contextmanager
+    def connection(self):
+        if self.down:
+            raise pymysql.err.OperationalError(2003, f"Can't connect to MySQL server on '{self.frontend.host}'")
+        self.checkouts += 1
+        yield self.frontend.address
+
+    def stats(self):
+        return {"checkouts": self.checkouts}
+
+    def close(self):
+        pass
+
+
+def probe(frontend):
+    if frontend.pool.down:
+        raise pymysql.err.OperationalError(2003, "Can't connect")
+
+
+def make_router(*specs, **kwargs):
+    kwargs.setdefault("health_check_interval", None)
+    router = FrontendRouter(
+        parse_frontends(specs or ("fe1", "fe2", "fe3"), default_port=9030),
+        pool_factory=FakePool, probe=probe, **kwargs,
+    )
+    pools = {frontend.host: frontend.pool for frontend in router.frontends}
+    return router, pools
+
+
+def run(router, read=False):
+    with router.connection(read=read) as address:
+        return address.split(":")[0]
+
+
+def test_parse_frontends():
+    frontends = parse_frontends(["a", "b:9031", ("c", 9032, 2), {"host": "d", "weight": 3}, "a:9030"], 9030)
+    assert [(f.address, f.weight) for f in frontends] == [
+        ("a:9030", 1.0), ("b:9031", 1.0), ("c:9032", 2.0), ("d:9030", 3.0),
+    ]
+
+
+def test_is_connection_failure():
+    assert is_connection_failure(pymysql.err.OperationalError(2013, "Lost connection"))
+    assert is_connection_failure(ConnectionRefusedError())
+    assert not is_connection_failure(pymysql.err.OperationalError(1105, "errCode = 2, detailMessage = ..."))
+    assert not is_connection_failure(pymysql.err.ProgrammingError(1064, "syntax error"))
+
+
+def test_writes_fail_over_to_next_fe():
+    router, pools = make_router()
+    pools["fe1"].down = True
+    assert run(router) == "fe2"
+    stats = router.stats()
+    assert stats["failovers"] == 1 and stats["failures"] == 1
+    assert [fe["healthy"] for fe in stats["frontends"]] == [False, True, True]
+    # The down master is skipped without another failed connect
+    assert run(router) == "fe2"
+    assert router.stats()["failures"] == 1
+
+
+def test_all_down_raises_last_error():
+    router, pools = make_router()
+    for pool in pools.values():
+        pool.down = True
+    with pytest.raises(pymysql.err.OperationalError):
+        run(router)
+
+
+def test_failed_fe_rejoins_after_backoff():
+    router, pools = make_router(backoff_base=0.05)
+    pools["fe1"].down = True
+    assert run(router) == "fe2"
+    pools["fe1"].down = False
+    time.sleep(0.06)
+    assert run(router) == "fe1"
+    stats = router.stats()
+    assert stats["recoveries"] == 1
+    assert stats["frontends"][0]["failures"] == 0
+
+
+def test_backoff_doubles_up_to_max():
+    router, pools = make_router(backoff_base=1.0, backoff_max=3.0)
+    frontend = router.frontends[0]
+    for failures, ceiling in ((1, 1.0), (2, 2.0), (3, 3.0), (4, 3.0)):
+        before = time.monotonic()
+        router._mark_failure(frontend, OSError("down"))
+        assert frontend.failures == failures
+        # Jitter waits between half and all of the backoff
+        assert before + ceiling * 0.5 <= frontend.down_until <= time.monotonic() + ceiling
+
+
+def test_round_robin_follows_weights():
+    router, _ = make_router(("fe1", 9030, 2), ("fe2", 9030, 1), policy="round_robin")
+    picks = [run(router, read=True) for _ in range(6)]
+    assert picks.count("fe1") == 4 and picks.count("fe2") == 2
+    # Smooth: the heavier FE never gets all its turns in a row
+    assert picks[:3] == ["fe1", "fe2", "fe1"]
+
+
+def test_least_outstanding_prefers_idle_fe():
+    router, _ = make_router("fe1", "fe2")
+    with router.connection(read=True) as first:
+        with router.connection(read=True) as second:
+            assert first != second
+    assert {run(router, read=True) for _ in range(2)} == {"fe1", "fe2"}
+
+
+def test_reads_skip_down_fe():
+    router, pools = make_router(policy="round_robin")
+    pools["fe2"].down = True
+    run(router)  # writes go to fe1 and do not touch fe2
+    router._mark_failure(router.frontends[1], OSError("down"))
+    assert {run(router, read=True) for _ in range(6)} == {"fe1", "fe3"}
+
+
+def test_master_is_located_again_after_it_fails():
+    master = {"address": ("fe2", 9030)}
+    router, pools = make_router(locate_master=lambda: master["address"])
+    assert run(router) == "fe2"
+    pools["fe2"].down = True
+    master["address"] = ("fe3", 9030)
+    # The failed write falls over to a healthy FE, the next one asks for the master again
+    assert run(router) in ("fe1", "fe3")
+    assert run(router) == "fe3"
+    assert router.stats()["frontends"][2]["master"]
+
+
+def test_unknown_master_keeps_current():
+    router, _ = make_router(locate_master=lambda: None)
+    assert run(router) == "fe1"
+
+
+def test_health_loop_puts_fe_back():
+    router, pools = make_router(backoff_base=0.01, health_check_interval=0.02)
+    try:
+        pools["fe1"].down = True
+        assert run(router) == "fe2"
+        pools["fe1"].down = False
+        deadline = time.monotonic() + 2
+        while router.frontends[0].failures and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert router.frontends[0].failures == 0
+        assert router.stats()["recoveries"] == 1
+        # The checker stops once every FE is healthy
+        router._checker.join(1)
+        assert not router._checker.is_alive()
+    finally:
+        router.close()
+
+
+@pytest.mark.parametrize("error", [
+    pymysql.err.ProgrammingError(1064, "You have an error in your SQL syntax"),
+    pymysql.err.OperationalError(1105, "errCode = 2, detailMessage = Unknown table 't'"),
+    ValueError("bad value"),
+])
+def test_sql_errors_do_not_mark_fe_down(error):
+    router, _ = make_router()
+    with pytest.raises(type(error)):
+        with router.connection():
+            raise error
+    assert router.stats()["failures"] == 0
+    assert run(router) == "fe1"
+
+
+def test_lost_connection_marks_fe_down_without_retrying():
+    router, _ = make_router()
+    calls = []
+    with pytest.raises(pymysql.err.OperationalError):
+        with router.connection() as address:
+            calls.append(address)
+            raise pymysql.err.OperationalError(2013, "Lost connection to MySQL server during query")
+    assert calls == ["fe1:9030"]
+    assert not router.stats()["frontends"][0]["healthy"]
+
+
+def test_write_frontends_order():
+    router, pools = make_router(locate_master=lambda: ("fe3", 9030))
+    assert [f.host for f in router.write_frontends()] == ["fe3", "fe1", "fe2"]
+    router._mark_failure(router.frontends[2], OSError("down"))
+    router._master_located = True
+    assert [f.host for f in router.write_frontends()] == ["fe1", "fe2", "fe3"]
@@ -0,0 +1,63 @@
+import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.tools.doris_rows import dataframe_to_rows, iter_row_batches, partition_frame, to_db_value
+
+pytestmark = pytest.mark.unit
+
+
+def test_dataframe_to_rows_converts_missing_and_numpy_values():
+    df = pd.DataFrame({
+        "i": pd.array([1, None], dtype="Int64"),
+        "f": [1.5, np.nan],
+        "t": pd.to_datetime(["2024-01-02 03:04:05", None]),
+        "s": ["a", None],
+    })
+    rows = dataframe_to_rows(df)
+    assert rows[0] == (1, 1.5, datetime.datetime(2024, 1, 2, 3, 4, 5), "a")
+    assert rows[1] == (None, None, None, None)
+    assert type(rows[0][0]) is int
+
+
+def test_timezone_aware_keeps_wall_clock():
+    df = pd.DataFrame({"t": pd.to_datetime(["2024-01-02 03:04:05"]).tz_localize("Asia/Shanghai")})
+    assert dataframe_to_rows(df) == [(datetime.datetime(2024, 1, 2, 3, 4, 5),)]
+
+
+def test_iter_row_batches_covers_all_rows():
+    df = pd.DataFrame({"a": range(10)})
+    batches = list(iter_row_batches(df, batch_size=3, block_rows=4))
+    assert [len(batch) for batch in batches] == [3, 1, 3, 1, 2]
+    assert [row[0] for batch in batches for row in batch] == list(range(10))
+
+
+def test_partition_frame_by_key_keeps_keys_together():
+    df = pd.DataFrame({"k": np.arange(1000) % 13, "v": np.arange(1000)})
+    parts = partition_frame(df, 4, ["k"])
+    assert sum(len(part) for part in parts) == len(df)
+    for i, part in enumerate(parts):
+        assert part["v"].is_monotonic_increasing
+        for other in parts[i + 1:]:
+            assert set(part["k"]).isdisjoint(other["k"])
+
+
+def test_partition_frame_slices_without_keys():
+    df = pd.DataFrame({"v": range(10)})
+    parts = partition_frame(df, 3)
+    assert [len(part) for part in parts] == [3, 3, 4]
+    assert len(partition_frame(df.head(2), 8)) == 2
+
+
+@pytest.mark.parametrize("value, expected", [
+    (None, None),
+    (np.nan, None),
+    (pd.NaT, None),
+    (np.int64(3), 3),
+    (pd.Timestamp("2024-01-01"), datetime.datetime(2024, 1, 1)),
+    ("x", "x"),
+])
+def test_to_db_value(value, expected):
+    assert to_db_value(value) == expected
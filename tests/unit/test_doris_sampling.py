@@ -0,0 +1,26 @@
+import pymysql
+import pytest
+
+from src.tools.doris_sampling import is_histogram_unsupported, simple_scan_table, tablesample_sql
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.mark.parametrize("message, unsupported", [
+    ("errCode = 2, detailMessage = Can not found function 'histogram'", True),
+    ("errCode = 2, detailMessage = No matching function with signature: histogram(int, tinyint)", True),
+    ("errCode = 2, detailMessage = Unknown column 'x' in 'table list'", False),
+    ("errCode = 2, detailMessage = query timeout", False),
+])
+def test_is_histogram_unsupported(message, unsupported):
+    assert is_histogram_unsupported(pymysql.err.OperationalError(1105, message)) is unsupported
+
+
+def test_simple_scan_table():
+    assert simple_scan_table("SELECT a FROM db.t WHERE a > 1") is not None
+    assert simple_scan_table("SELECT * FROM t JOIN u ON t.id = u.id") is None
+
+
+def test_tablesample_sql_keeps_filter():
+    sql = tablesample_sql("SELECT a FROM t WHERE a > 1", 500, 42)
+    assert "TABLESAMPLE" in sql and "WHERE a > 1" in sql
@@ -0,0 +1,137 @@
+import threading
+
+import pandas as pd
+import pymysql
+import pytest
+
+pytestmark = pytest.mark.unit
+
+CREATE_T = (
+    "CREATE TABLE `t` (`id` BIGINT, `day` DATE, `v` VARCHAR(16)) ENGINE=OLAP DUPLICATE KEY(`id`, `day`) "
+    "PARTITION BY RANGE(`day`) (PARTITION p202401 VALUES [('2024-01-01'), ('2024-02-01'))) "
+    "DISTRIBUTED BY HASH(`id`) BUCKETS 1"
+)
+
+
+@pytest.fixture
+def existing_table(fake_doris):
+    fake_doris.respond("SHOW TABLES LIKE", [{"Tables_in_db": "t"}])
+    fake_doris.respond("SHOW CREATE TABLE", [{"Table": "t", "Create Table": CREATE_T}])
+    fake_doris.respond("SHOW PARTITIONS", [{"PartitionName": "p202401"}])
+    return fake_doris
+
+
+def frame(rows=6):
+    return pd.DataFrame({
+        "id": range(rows),
+        "day": pd.to_datetime(["2024-01-15"] * (rows - 1) + ["2024-02-03"]),
+        "v": [f"v{i}" for i in range(rows)],
+    })
+
+
+def writes(fake_doris):
+    """Statements that create, change or load tables, in order."""
+    prefixes = ("CREATE TABLE", "ALTER TABLE", "INSERT INTO", "DROP TABLE")
+    return [sql for sql in fake_doris.sqls() if sql.startswith(prefixes)]
+
+
+def staging_of(statements):
+    create = next(sql for sql in statements if sql.startswith("CREATE TABLE `t__staging_"))
+    return create.split("`")[1]
+
+
+# Replace through a staging table
+
+def test_replace_loads_staging_then_swaps(tools, existing_table):
+    result = tools.save("t", frame(), if_exists="replace", load_method="insert")
+    assert result.startswith("Successfully saved 6 rows to table 't'")
+    statements = writes(existing_table)
+    staging = staging_of(statements)
+    assert [sql.split("(")[0].strip() for sql in statements] == [
+        f"CREATE TABLE `{staging}`",
+        f"INSERT INTO `{staging}`",
+        f"ALTER TABLE `t` REPLACE WITH TABLE `{staging}` PROPERTIES",
+    ]
+    # The new table's layout comes from the DataFrame, not from the replaced one
+    assert "PARTITION BY" not in statements[0]
+    # Merge state of the replaced table is cleared after the swap
+    deletes = [sql for sql in existing_table.sqls() if sql.startswith("DELETE FROM")]
+    assert deletes and existing_table.sqls().index(deletes[0]) > existing_table.sqls().index(statements[-1])
+
+
+def test_failed_replace_drops_staging_and_keeps_target(tools, existing_table):
+    existing_table.executemany_error = lambda sql, args: pymysql.err.OperationalError(1105, "load failed")
+    result = tools.save("t", frame(), if_exists="replace", load_method="insert")
+    assert result.startswith("Error saving DataFrame:") and "load failed" in result
+    statements = writes(existing_table)
+    staging = staging_of(statements)
+    assert statements[-1] == f"DROP TABLE IF EXISTS `{staging}` FORCE"
+    assert not [sql for sql in statements if "`t`" in sql]
+
+
+def test_failed_swap_drops_staging(tools, existing_table):
+    existing_table.respond("ALTER TABLE `t` REPLACE WITH TABLE", pymysql.err.OperationalError(1105, "swap failed"))
+    result = tools.save("t", frame(), if_exists="replace", load_method="insert")
+    assert "swap failed" in result
+    staging = staging_of(writes(existing_table))
+    assert writes(existing_table)[-1] == f"DROP TABLE IF EXISTS `{staging}` FORCE"
+
+
+# Parallel partitioned save
+
+def test_parallel_append_loads_partitions_concurrently(tools, existing_table):
+    # Every worker waits for the others, which only works if they run at the same time
+    barrier = threading.Barrier(3, timeout=5)
+
+    def wait_for_others(sql, args):
+        barrier.wait()
+
+    existing_table.executemany_error = wait_for_others
+    result = tools.save("t", frame(30), parallel=3, load_method="insert")
+    assert result.startswith("Successfully saved 30 rows to table 't'")
+    statements = writes(existing_table)
+    staging = staging_of(statements)
+    loads = [(conn, args) for conn, sql, args in existing_table.statements if sql.startswith(f"INSERT INTO `{staging}`")]
+    assert len(loads) == 3
+    assert len({conn for conn, _ in loads}) == 3
+    assert sorted(row[0] for _, args in loads for row in args) == list(range(30))
+    # The existing table gets the staged rows in one statement, then staging is dropped
+    assert statements[-2].startswith("INSERT INTO `t` (`id`, `day`, `v`) SELECT `id`, `day`, `v` FROM")
+    assert statements[-1] == f"DROP TABLE IF EXISTS `{staging}` FORCE"
+
+
+def test_parallel_append_adds_missing_partitions_before_staging(tools, existing_table):
+    tools.save("t", frame(), parallel=2, load_method="insert")
+    statements = writes(existing_table)
+    add = "ALTER TABLE `t` ADD PARTITION IF NOT EXISTS `p202402` VALUES [('2024-02-01'), ('2024-03-01'))"
+    assert add in statements
+    assert not [sql for sql in statements if "`p202401`" in sql]
+    # CREATE TABLE ... LIKE copies the partitions, so they must exist first
+    assert statements.index(add) < statements.index(f"CREATE TABLE `{staging_of(statements)}` LIKE `t`")
+
+
+def test_failed_parallel_worker_leaves_target_unchanged(tools, existing_table):
+    calls = []
+
+    def fail_first(sql, args):
+        calls.append(args)
+        if len(calls) == 1:
+            return pymysql.err.OperationalError(1105, "worker failed")
+
+    existing_table.executemany_error = fail_first
+    result = tools.save("t", frame(30), parallel=3, load_method="insert")
+    assert result.startswith("Error saving DataFrame: 1 of 3 parallel loads failed, nothing was saved")
+    statements = writes(existing_table)
+    staging = staging_of(statements)
+    assert statements[-1] == f"DROP TABLE IF EXISTS `{staging}` FORCE"
+    assert not [sql for sql in statements if sql.startswith("INSERT INTO `t`")]
+
+
+def test_parallel_save_of_new_table_swaps_staging_in(tools, fake_doris):
+    result = tools.save("n", frame(), parallel=2, load_method="insert")
+    assert result.startswith("Successfully saved 6 rows to table 'n'")
+    statements = writes(fake_doris)
+    staging = next(sql for sql in statements if sql.startswith("CREATE TABLE `n__staging_")).split("`")[1]
+    assert statements[0].startswith("CREATE TABLE `n` (")
+    assert statements[-1].startswith(f"ALTER TABLE `n` REPLACE WITH TABLE `{staging}`")
+    assert not [sql for sql in statements if sql.startswith("DROP TABLE")]
@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.tools.doris_schema import (
+    bucket_count, coerce_to_types, infer_column, infer_schema, integer_type, is_id_column,
+)
+
+pytestmark = pytest.mark.unit
+
+
+def sql_type(values, name=None, key=False):
+    return infer_column(pd.Series(values, name=name), key=key)[0]
+
+
+def test_integers_start_at_int():
+    assert sql_type([1, 2, 3]) == "INT"
+    assert sql_type([1.0, 2.0, np.nan]) == "INT"
+    assert sql_type([3_000_000_000]) == "BIGINT"
+    assert sql_type([None, None], name="n") == "VARCHAR(255)"
+    assert integer_type(0, 100) == ("INT", 4)
+    assert integer_type(0, 100, smallest="TINYINT") == ("TINYINT", 1)
+    assert integer_type(0, 1 << 70) == ("LARGEINT", 16)
+
+
+@pytest.mark.parametrize("name, identifier", [
+    ("id", True), ("ID", True), ("order_id", True), ("customerId", True),
+    ("idle", False), ("paid", False), ("valid", False), ("width", False),
+])
+def test_is_id_column(name, identifier):
+    assert is_id_column(name) is identifier
+
+
+def test_key_and_id_columns_are_bigint():
+    assert sql_type([1, 2], name="order_id") == "BIGINT"
+    assert sql_type([1, 2], name="qty", key=True) == "BIGINT"
+    assert sql_type(["1", "2"], name="userId") == "BIGINT"
+    assert sql_type([1, 2], name="qty") == "INT"
+
+
+def test_decimals_get_wide_precision_and_observed_scale():
+    assert sql_type([1.5, 2.25, None]) == "DECIMAL(18, 2)"
+    assert sql_type([1.5, 1e17]) == "DECIMAL(38, 1)"
+    assert sql_type([0.1234567891234]) == "DOUBLE"
+    assert sql_type([1.5, float("inf")]) == "DOUBLE"
+
+
+def test_currency_strings():
+    assert sql_type(["(1,200.50)", "$3"]) == "DECIMAL(18, 2)"
+    assert sql_type(["1,200", "3"]) == "INT"
+    assert infer_column(pd.Series(["$1,000", "-$5"]))[1].tolist() == [1000, -5]
+    assert sql_type(["01234", "2"]).startswith("VARCHAR")
+
+
+def test_dates_strings_and_others():
+    assert sql_type(["2024-01-02 10:00:00", None]) == "DATETIME"
+    assert sql_type(["2024-01-02T00:00:00"]) == "DATE"
+    assert sql_type(["03-Jan-22", "15-Feb-22"]) == "DATE"
+    assert sql_type(["héllo" * 10]) == "VARCHAR(64)"
+    assert sql_type(["x" * 70000]) == "STRING"
+    assert sql_type(["x" * 70000], key=True) == "VARCHAR(65533)"
+    assert sql_type([True, False]) == "BOOLEAN"
+    assert sql_type(pd.Categorical(["a", "b"])) == "VARCHAR(16)"
+
+
+def test_infer_schema_and_buckets():
+    df = pd.DataFrame({"id": [1, 2], "amount": ["$1.50", "$2"], "day": ["2024-01-01", "2024-01-02"]})
+    schema = infer_schema(df, key_columns=["id"])
+    assert schema.columns == [("id", "BIGINT"), ("amount", "DECIMAL(18, 2)"), ("day", "DATE")]
+    assert schema.frame["amount"].tolist() == [1.5, 2.0]
+    assert schema.buckets == 1
+    assert bucket_count(5 << 30) == 5 and bucket_count(1 << 50) == 64
+
+
+def test_coerce_to_types():
+    df = pd.DataFrame({"day": ["2024-01-01"], "amount": ["$1,000.50"], "name": ["x"]})
+    coerced = coerce_to_types(df, {"day": "date", "amount": "decimal(18,2)", "name": "varchar(16)"})
+    assert coerced["amount"].tolist() == [1000.5]
+    assert str(coerced["day"].dtype).startswith("datetime64")
+    assert coerced["name"].tolist() == ["x"]
@@ -0,0 +1,79 @@
+import pytest
+
+from src.tools.doris_sql import DDL, OTHER, READ, WRITE, analyze_sql, fingerprint_sql, normalize_sql
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.mark.parametrize("sql, kind, is_query", [
+    ("SELECT 1", READ, True),
+    ("  -- comment\nselect * from t", READ, True),
+    ("SHOW TABLES", READ, False),
+    ("WITH x AS (SELECT 1) SELECT * FROM x", READ, True),
+    ("WITH x AS (SELECT 1) INSERT INTO t SELECT * FROM x", WRITE, False),
+    ("INSERT INTO t VALUES (1)", WRITE, False),
+    ("SELECT * FROM t INTO OUTFILE \"s3://bucket/out_\" FORMAT AS CSV", WRITE, False),
+    ("DROP TABLE t", DDL, False),
+    ("SET query_timeout = 10", OTHER, False),
+    ("SELECT 1; DROP TABLE t", DDL, False),
+    ("SELECT ';DROP TABLE t'", READ, True),
+])
+def test_kind(sql, kind, is_query):
+    info = analyze_sql(sql)
+    assert (info.kind, info.is_query) == (kind, is_query)
+
+
+@pytest.mark.parametrize("sql, tables", [
+    ("SELECT * FROM t1", {"t1"}),
+    ("SELECT * FROM t1, t2", {"t1", "t2"}),
+    ("SELECT * FROM t1 a, db.t2 AS b, `t3` c WHERE a.id = b.id", {"t1", "db.t2", "t3"}),
+    ("SELECT * FROM t1 PARTITION (p1, p2), t2", {"t1", "t2"}),
+    ("SELECT * FROM t1 JOIN t2 ON t1.id = t2.id", {"t1", "t2"}),
+    ("SELECT * FROM (SELECT a, b FROM t1) x, t2", {"t1", "t2"}),
+    ("SELECT a, b FROM t1 WHERE c IN (1, 2)", {"t1"}),
+    ("WITH x AS (SELECT * FROM t1) SELECT * FROM x, t2", {"t1", "t2"}),
+    ("SELECT * FROM t1 INTO OUTFILE \"hdfs://path/out_\"", {"t1"}),
+    ("DESC t1", {"t1"}),
+])
+def test_tables(sql, tables):
+    assert analyze_sql(sql).tables == frozenset(tables)
+
+
+@pytest.mark.parametrize("sql, deterministic", [
+    ("SELECT * FROM t WHERE d = '2024-01-01'", True),
+    ("SELECT * FROM t WHERE d = current_date", False),
+    ("SELECT * FROM t WHERE ts > CURRENT_TIMESTAMP - INTERVAL 1 HOUR", False),
+    ("SELECT * FROM t WHERE d = curdate()", False),
+    ("SELECT now()", False),
+    ("SELECT `current_date` FROM t", True),
+    ("SELECT * FROM t WHERE note = 'now()'", True),
+])
+def test_deterministic(sql, deterministic):
+    assert analyze_sql(sql).deterministic is deterministic
+
+
+def test_normalize_and_fingerprint():
+    normalized = normalize_sql("SELECT  *\n FROM t -- trailing\n WHERE s = 'a  b' AND id IN (1, 2, 3);")
+    assert normalized == "SELECT * FROM t WHERE s = 'a  b' AND id IN (1, 2, 3)"
+    assert fingerprint_sql(normalized) == "SELECT * FROM t WHERE s = ? AND id IN (?)"
+
+
+def test_qualified_tables():
+    assert analyze_sql("SELECT * FROM T1, other.t2").qualified_tables("db") == {"db.t1", "other.t2"}
+
+
+@pytest.mark.parametrize("sql, changes_session", [
+    ("SET exec_mem_limit = 1073741824", True),
+    ("set @@session.query_timeout = 60", True),
+    ("SET @x = 1", True),
+    ("USE other_db", True),
+    ("SWITCH hive_catalog", True),
+    ("SELECT 1; USE other_db", True),
+    ("SET GLOBAL query_timeout = 60", False),
+    ("SET @@global.query_timeout = 60", False),
+    ("SET PASSWORD FOR 'u' = PASSWORD('x')", False),
+    ("SELECT /*+ SET_VAR(query_timeout = 60) */ * FROM t", False),
+    ("UPDATE t SET a = 1", False),
+])
+def test_changes_session(sql, changes_session):
+    assert analyze_sql(sql).changes_session is changes_session
@@ -0,0 +1,140 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pandas as pd
+import pytest
+
+from src.tools.doris_stream_load import DorisStreamLoader, StreamLoadError
+
+pytestmark = pytest.mark.unit
+
+
+class StandIn:
+    """Local FE + BE pair: the FE redirects every load to the BE, which answers from `results`."""
+
+    def __init__(self):
+        self.requests = []
+        # label -> Stream Load response body; missing labels succeed
+        self.results = {}
+        stand_in = self
+
+        class BackendHandler(BaseHTTPRequestHandler):
+            def do_PUT(self):
+                body = self.rfile.read(int(self.headers["Content-Length"]))
+                label = self.headers["label"]
+                stand_in.requests.append({"path": self.path, "headers": dict(self.headers), "body": body})
+                result = stand_in.results.get(label, {"Status": "Success", "Label": label})
+                payload = json.dumps(result).encode()
+                self.send_response(200)
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        class FrontendHandler(BaseHTTPRequestHandler):
+            def do_PUT(self):
+                self.rfile.read(int(self.headers["Content-Length"]))
+                stand_in.redirects += 1
+                self.send_response(307)
+                self.send_header("Location", f"http://127.0.0.1:{stand_in.backend.server_port}{self.path}?be=1")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        self.redirects = 0
+        self.backend = ThreadingHTTPServer(("127.0.0.1", 0), BackendHandler)
+        self.frontend = ThreadingHTTPServer(("127.0.0.1", 0), FrontendHandler)
+        for server in (self.backend, self.frontend):
+            threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True).start()
+
+    def loader(self, **kwargs):
+        return DorisStreamLoader(
+            host="127.0.0.1", http_port=self.frontend.server_port, user="root", password="pw",
+            database="db", **kwargs,
+        )
+
+    def close(self):
+        for server in (self.backend, self.frontend):
+            server.shutdown()
+            server.server_close()
+
+
+@pytest.fixture
+def stand_in():
+    server = StandIn()
+    yield server
+    server.close()
+
+
+def test_follows_fe_redirect_to_be(stand_in):
+    df = pd.DataFrame({"id": [1, 2], "name": ["a", "b"]})
+    result = stand_in.loader().load_dataframe("t", df, label="job")
+    assert result["rows"] == 2
+    assert stand_in.redirects == 1
+    request, = stand_in.requests
+    assert request["path"] == "/api/db/t/_stream_load?be=1"
+    # Credentials survive the redirect
+    assert request["headers"]["Authorization"].startswith("Basic ")
+    assert [json.loads(line) for line in request["body"].splitlines()] == [
+        {"id": 1, "name": "a"}, {"id": 2, "name": "b"},
+    ]
+
+
+def test_chunks_get_numbered_labels(stand_in):
+    df = pd.DataFrame({"id": range(5)})
+    result = stand_in.loader().load_dataframe("t", df, label="job", chunk_rows=2)
+    assert result["labels"] == ["job_0", "job_1", "job_2"]
+    assert [request["headers"]["label"] for request in stand_in.requests] == ["job_0", "job_1", "job_2"]
+
+
+def test_label_already_exists_and_finished_is_skipped(stand_in):
+    stand_in.results["job_0"] = {"Status": "Label Already Exists", "ExistingJobStatus": "FINISHED"}
+    result = stand_in.loader().load_dataframe("t", pd.DataFrame({"id": [1]}), label="job")
+    assert result["rows"] == 1
+
+
+def test_label_already_exists_but_not_finished_fails(stand_in):
+    stand_in.results["job_0"] = {
+        "Status": "Label Already Exists", "ExistingJobStatus": "RUNNING", "Message": "label job_0 is running",
+    }
+    with pytest.raises(StreamLoadError, match="label job_0 is running"):
+        stand_in.loader().load_dataframe("t", pd.DataFrame({"id": [1]}), label="job")
+
+
+def test_failed_chunk_reports_loaded_rows_and_error_url(stand_in):
+    stand_in.results["job_1"] = {
+        "Status": "Fail", "Message": "too many filtered rows", "ErrorURL": "http://be/api/_load_error_log?x",
+    }
+    with pytest.raises(StreamLoadError) as excinfo:
+        stand_in.loader().load_dataframe("t", pd.DataFrame({"id": range(4)}), label="job", chunk_rows=2)
+    assert excinfo.value.loaded_rows == 2
+    assert "too many filtered rows" in str(excinfo.value)
+    assert "_load_error_log" in str(excinfo.value)
+    assert excinfo.value.response["Status"] == "Fail"
+
+
+def test_csv_format_sends_columns_header(stand_in):
+    df = pd.DataFrame({"id": [1], "name": [None]})
+    stand_in.loader(data_format="csv").load_dataframe("t", df, label="job")
+    request, = stand_in.requests
+    assert request["headers"]["columns"] == "`id`,`name`"
+    assert request["body"] == b"1\x01\\N\x02"
+
+
+def test_fails_over_to_next_frontend(stand_in):
+    # Nothing listens on 127.0.0.2 at the stand-in's port
+    loader = stand_in.loader(frontend_hosts=lambda: ["127.0.0.2", "127.0.0.1"], max_retries=0)
+    result = loader.load_dataframe("t", pd.DataFrame({"id": [1]}), label="job")
+    assert result["rows"] == 1
+    assert stand_in.redirects == 1
+
+
+def test_fails_when_every_frontend_is_down(stand_in):
+    loader = stand_in.loader(frontend_hosts=lambda: ["127.0.0.2", "127.0.0.3"], max_retries=0)
+    with pytest.raises(StreamLoadError, match="request failed for label job_0"):
+        loader.load_dataframe("t", pd.DataFrame({"id": [1]}), label="job")
@@ -0,0 +1,97 @@
+import pandas as pd
+import pymysql
+import pytest
+
+from src.tools.doris import DorisTools
+from src.tools.doris_cancel import CancelToken
+
+pytestmark = pytest.mark.unit
+
+
+def test_sample_summary_retries_only_without_histogram(tools, fake_doris):
+    fake_doris.respond("SELECT COUNT(*) AS `__rows`, SUM", lambda sql: (
+        pymysql.err.OperationalError(1105, "Can not found function 'histogram'") if "HISTOGRAM" in sql
+        else [{"__rows": 1}]
+    ))
+    with tools._cursor() as cursor:
+        assert tools._sample_summary(cursor, "SELECT x FROM t", [("x", 3)]) == {"__rows": 1}
+    assert sum("HISTOGRAM" in sql for sql in fake_doris.sqls()) == 1
+
+
+def test_sample_summary_does_not_retry_other_errors(tools, fake_doris):
+    fake_doris.respond("SELECT COUNT(*)", pymysql.err.OperationalError(1105, "query timeout"))
+    with tools._cursor() as cursor:
+        with pytest.raises(pymysql.err.OperationalError):
+            tools._sample_summary(cursor, "SELECT x FROM t", [("x", 3)])
+    assert len([sql for sql in fake_doris.sqls() if sql.startswith("SELECT COUNT(*)")]) == 1
+
+
+def test_unfetched_analysis_jobs_are_bounded(tools, monkeypatch):
+    monkeypatch.setattr(DorisTools, "MAX_ANALYSIS_JOBS", 3)
+    monkeypatch.setattr(tools, "analyze_data", lambda *args, **kwargs: "stats")
+    job_ids = [tools._submit_analysis("SELECT 1") for _ in range(5)]
+    assert len(tools._analysis_jobs) == 3
+    assert tools.get_analysis_result(job_ids[0]).startswith("Unknown or expired")
+    tools._analysis_executor.shutdown(wait=True)
+    assert tools.get_analysis_result(job_ids[-1]) == "stats"
+
+
+def test_finished_analysis_jobs_expire(tools, monkeypatch):
+    monkeypatch.setattr(DorisTools, "ANALYSIS_JOB_TTL", 0.0)
+    monkeypatch.setattr(tools, "analyze_data", lambda *args, **kwargs: "stats")
+    first = tools._submit_analysis("SELECT 1")
+    tools._analysis_jobs[first][0].result()
+    tools._submit_analysis("SELECT 2")
+    assert first not in tools._analysis_jobs
+
+
+def test_registered_tools_do_not_expose_cancel_token(tools):
+    for name, function in tools.functions.items():
+        assert "cancel_token" not in function.parameters["properties"], name
+
+
+def test_query_with_cancel_token_reports_cancellation(tools, fake_doris):
+    token = CancelToken()
+    token.cancel()
+    fake_doris.respond("SELECT * FROM slow", pymysql.err.OperationalError(1317, "Query execution was interrupted"))
+    assert tools._query("SELECT * FROM slow", cancel_token=token).startswith("Query error (cancelled)")
+    assert any(sql.startswith("KILL QUERY") for sql in fake_doris.sqls())
+
+
+def test_merge_requires_partition_column_in_key(tools, fake_doris):
+    df = pd.DataFrame({"id": [1, 2], "day": ["2024-01-01", "2024-01-02"]})
+    result = tools.save("events", df, if_exists="merge", key_columns=["id"], partition_column="day")
+    assert result.startswith("Error: Partition column 'day' must be one of the key columns ['id']")
+    assert not [sql for sql in fake_doris.sqls() if sql.startswith("CREATE TABLE")]
+
+
+def test_save_reports_partition_column_added_to_key(tools, fake_doris):
+    df = pd.DataFrame({"id": [1, 2], "day": ["2024-01-01", "2024-01-02"]})
+    result = tools.save("events", df, key_columns=["id"], partition_column="day", load_method="insert")
+    assert "Partition column 'day' was added to the key columns: ['id', 'day']" in result
+    create = next(sql for sql in fake_doris.sqls() if sql.startswith("CREATE TABLE"))
+    assert "DUPLICATE KEY(`id`, `day`)" in create
+
+
+def test_stream_load_follows_router_frontends(fake_doris):
+    doris = DorisTools(host="fe1", database="db", http_port=8030, frontends=["fe2:9030"])
+    try:
+        assert doris._stream_loader._hosts() == ["fe1", "fe2"]
+        doris._router._mark_failure(doris._router.frontends[0], OSError("down"))
+        assert doris._stream_loader._hosts() == ["fe2", "fe1"]
+    finally:
+        doris.close()
+
+
+@pytest.mark.parametrize("sql", ["SET query_timeout = 5", "USE other_db", "SWITCH hive"])
+def test_session_statements_are_rejected(tools, fake_doris, sql):
+    result = tools.execute_sql(sql)
+    assert result.startswith("Error: SET, USE and SWITCH statements are not supported")
+    assert fake_doris.sqls() == []
+
+
+def test_set_var_hint_and_global_set_still_run(tools, fake_doris):
+    assert tools.execute_sql("SET GLOBAL query_timeout = 60").startswith("Query executed successfully")
+    tools.query("SELECT /*+ SET_VAR(query_timeout = 60) */ 1", as_pandas=False)
+    assert "SET GLOBAL query_timeout = 60" in fake_doris.sqls()
+    assert any("SET_VAR" in sql for sql in fake_doris.sqls())